@@ -0,0 +1,277 @@
+"""Headless HTTP API for the recipe pipeline.
+
+Runs the same graph as the Streamlit app without a UI session per user.
+Every search starts a new thread ID that the client sends back with its
+feedback; checkpoints and favorites live in the cache backend, so any
+server process can handle any request. Run it with:
+
+    python -m recipe_app.api [--host HOST] [--port PORT]
+
+Endpoints:
+
+    POST   /search                        {"query": ...} -> results and thread_id
+    POST   /threads/{thread_id}/feedback  {"feedback": ...} -> refined results or the selection
+    GET    /threads/{thread_id}           current results of a thread
+    GET    /recipes/{recipe_id}           full recipe
+    GET    /users/{user_id}/favorites     saved recipes
+    PUT    /users/{user_id}/favorites/{recipe_id}
+    DELETE /users/{user_id}/favorites/{recipe_id}
+    GET    /healthz, /metrics
+
+Search and feedback stream node progress as server-sent events when the
+request sends ``Accept: text/event-stream``.
+"""
+import sys
+import json
+import time
+import uuid
+import logging
+import argparse
+import dataclasses
+from contextlib import asynccontextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from langchain_core.messages import HumanMessage
+from starlette.applications import Starlette
+from starlette.concurrency import run_in_threadpool
+from starlette.requests import Request
+from starlette.responses import JSONResponse, StreamingResponse
+from starlette.routing import Route
+
+from recipe_app.config.config import API_HOST, API_PORT
+from recipe_app.config.settings import settings
+from recipe_app.services.cache import dumps, get_cache_backend, loads, make_key
+from recipe_app.services.checkpointer import CacheCheckpointSaver
+from recipe_app.services.graph import build_graph
+from recipe_app.services.metrics import rss_bytes
+from recipe_app.services.recipe_store import recipe_store
+from recipe_app.services.structured_logging import configure_logging, stop_logging
+
+logger = logging.getLogger(__name__)
+
+# Graph output keys returned to clients, as in the Streamlit app
+RESULT_KEYS = ("recipes", "key_features", "feature_source", "budget_exhausted")
+
+_graph = None
+
+
+def get_graph():
+    """Return the process-wide graph; its checkpoints live in the cache backend."""
+    global _graph
+    if _graph is None:
+        _graph = build_graph(CacheCheckpointSaver())
+    return _graph
+
+
+def _config(thread_id: str) -> Dict[str, Any]:
+    return {"configurable": {"thread_id": thread_id}}
+
+
+def _jsonable(value: Any) -> Any:
+    """Convert feature records and models in graph output into JSON data."""
+    if dataclasses.is_dataclass(value) and not isinstance(value, type):
+        return dataclasses.asdict(value)
+    if hasattr(value, "model_dump"):
+        return value.model_dump()
+    if isinstance(value, dict):
+        return {key: _jsonable(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_jsonable(item) for item in value]
+    return value
+
+
+def _result(thread_id: str) -> Dict[str, Any]:
+    """Describe a thread: its current results, or the recipe the user selected."""
+    graph = get_graph()
+    snapshot = graph.get_state(_config(thread_id))
+    values = snapshot.values or {}
+    result: Dict[str, Any] = {"thread_id": thread_id, "awaiting_feedback": bool(snapshot.next)}
+    result.update({key: _jsonable(values[key]) for key in RESULT_KEYS if key in values})
+    index = values.get("recipes_index", -1)
+    if not snapshot.next and index is not None and 0 <= index < len(values.get("recipes") or []):
+        result["selected"] = {
+            "recipe": recipe_store.resolve(values["recipes"][index]),
+            "feature": _jsonable(values["key_features"][index]),
+        }
+    return result
+
+
+def _run(thread_id: str, graph_input: Optional[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+    """Run the graph for a thread, yielding one progress event per node and a final result."""
+    graph = get_graph()
+    started = time.perf_counter()
+    try:
+        for update in graph.stream(graph_input, _config(thread_id), stream_mode="updates"):
+            for node in update:
+                if not node.startswith("__"):
+                    yield {"event": "node", "data": {"node": node, "elapsed": round(time.perf_counter() - started, 3)}}
+        yield {"event": "result", "data": _result(thread_id)}
+    except Exception as e:
+        logger.error("Graph run failed for thread %s: %s", thread_id, e)
+        yield {"event": "error", "data": {"thread_id": thread_id, "error": str(e)}}
+
+
+def _sse(events: Iterator[Dict[str, Any]]) -> Iterator[str]:
+    for event in events:
+        yield f"event: {event['event']}\ndata: {json.dumps(event['data'])}\n\n"
+
+
+async def _respond(request: Request, thread_id: str, graph_input: Optional[Dict[str, Any]]):
+    """Stream progress as server-sent events if asked to, otherwise return the final result."""
+    if "text/event-stream" in request.headers.get("accept", ""):
+        # Starlette iterates sync generators in its thread pool
+        return StreamingResponse(_sse(_run(thread_id, graph_input)), media_type="text/event-stream")
+    events = await run_in_threadpool(lambda: list(_run(thread_id, graph_input)))
+    final = events[-1]
+    return JSONResponse(final["data"], status_code=500 if final["event"] == "error" else 200)
+
+
+async def _body(request: Request) -> Dict[str, Any]:
+    try:
+        body = await request.json()
+    except ValueError:
+        return {}
+    return body if isinstance(body, dict) else {}
+
+
+async def search(request: Request):
+    query = str((await _body(request)).get("query") or "").strip()
+    if not query:
+        return JSONResponse({"error": "query is required"}, status_code=400)
+    # A new thread per search: nothing about the conversation is kept in this process
+    thread_id = uuid.uuid4().hex
+    return await _respond(request, thread_id, {"messages": [HumanMessage(content=query)]})
+
+
+async def feedback(request: Request):
+    thread_id = request.path_params["thread_id"]
+    text = str((await _body(request)).get("feedback") or "").strip()
+    if not text:
+        return JSONResponse({"error": "feedback is required"}, status_code=400)
+    graph = get_graph()
+    snapshot = await run_in_threadpool(graph.get_state, _config(thread_id))
+    if not snapshot.values:
+        return JSONResponse({"error": "unknown thread"}, status_code=404)
+    if not snapshot.next:
+        return JSONResponse({"error": "thread is not waiting for feedback"}, status_code=409)
+    # Resume the paused thread at the feedback step, as the Streamlit app does
+    await run_in_threadpool(graph.update_state, _config(thread_id), {"feedback": text})
+    return await _respond(request, thread_id, None)
+
+
+async def get_thread(request: Request):
+    thread_id = request.path_params["thread_id"]
+    snapshot = await run_in_threadpool(get_graph().get_state, _config(thread_id))
+    if not snapshot.values:
+        return JSONResponse({"error": "unknown thread"}, status_code=404)
+    return JSONResponse(await run_in_threadpool(_result, thread_id))
+
+
+async def get_recipe(request: Request):
+    recipe = await run_in_threadpool(recipe_store.get, request.path_params["recipe_id"])
+    if recipe is None:
+        return JSONResponse({"error": "unknown recipe"}, status_code=404)
+    return JSONResponse(recipe)
+
+
+def _favorites_key(user_id: str) -> str:
+    return make_key("favorites", user_id)
+
+
+def _load_favorites(user_id: str) -> List[Dict[str, Any]]:
+    data = get_cache_backend().get(_favorites_key(user_id))
+    return loads(data) if data is not None else []
+
+
+def _update_favorites(user_id: str, change: Callable[[List[Dict[str, Any]]], Optional[List[Dict[str, Any]]]]) -> List[Dict[str, Any]]:
+    """Apply ``change`` to a user's favorites atomically and return them.
+
+    change returns the new list, or None to leave it as it is. Concurrent
+    requests, also on other server processes, each see the other's writes.
+    """
+    current = settings()
+
+    def apply(data: Optional[bytes]) -> Optional[bytes]:
+        favorites = change(loads(data) if data is not None else [])
+        return None if favorites is None else dumps(favorites[-current.max_favorites:])
+
+    data = get_cache_backend().update(_favorites_key(user_id), apply, current.favorites_ttl_seconds)
+    return loads(data) if data is not None else []
+
+
+async def list_favorites(request: Request):
+    favorites = await run_in_threadpool(_load_favorites, request.path_params["user_id"])
+    return JSONResponse({"favorites": favorites})
+
+
+async def add_favorite(request: Request):
+    user_id, recipe_id = request.path_params["user_id"], request.path_params["recipe_id"]
+    recipe = await run_in_threadpool(recipe_store.get, recipe_id)
+    if recipe is None:
+        return JSONResponse({"error": "unknown recipe"}, status_code=404)
+    # Favorites keep references; clients fetch bodies from /recipes/{id}
+    reference = {"id": recipe_id, "name": recipe.get("name"), "url": recipe.get("url")}
+
+    def add(favorites):
+        return None if any(favorite["id"] == recipe_id for favorite in favorites) else favorites + [reference]
+
+    favorites = await run_in_threadpool(_update_favorites, user_id, add)
+    return JSONResponse({"favorites": favorites})
+
+
+async def remove_favorite(request: Request):
+    user_id, recipe_id = request.path_params["user_id"], request.path_params["recipe_id"]
+
+    def remove(favorites):
+        remaining = [favorite for favorite in favorites if favorite["id"] != recipe_id]
+        return remaining if len(remaining) != len(favorites) else None
+
+    favorites = await run_in_threadpool(_update_favorites, user_id, remove)
+    return JSONResponse({"favorites": favorites})
+
+
+async def healthz(request: Request):
+    return JSONResponse({"status": "ok"})
+
+
+async def metrics(request: Request):
+    return JSONResponse({"rss_bytes": rss_bytes(), "recipes_in_store": len(recipe_store)})
+
+
+@asynccontextmanager
+async def lifespan(app):
+    # Each server process writes its logs from a background thread
+    configure_logging()
+    # Invalid runtime settings fail the start instead of the first request
+    settings()
+    yield
+    stop_logging()
+
+
+app = Starlette(lifespan=lifespan, routes=[
+    Route("/search", search, methods=["POST"]),
+    Route("/threads/{thread_id}/feedback", feedback, methods=["POST"]),
+    Route("/threads/{thread_id}", get_thread, methods=["GET"]),
+    Route("/recipes/{recipe_id}", get_recipe, methods=["GET"]),
+    Route("/users/{user_id}/favorites", list_favorites, methods=["GET"]),
+    Route("/users/{user_id}/favorites/{recipe_id}", add_favorite, methods=["PUT"]),
+    Route("/users/{user_id}/favorites/{recipe_id}", remove_favorite, methods=["DELETE"]),
+    Route("/healthz", healthz, methods=["GET"]),
+    Route("/metrics", metrics, methods=["GET"]),
+])
+
+
+def main(argv: List[str] = None) -> int:
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Serve the recipe pipeline over HTTP.")
+    parser.add_argument("--host", default=API_HOST)
+    parser.add_argument("--port", type=int, default=API_PORT)
+    parser.add_argument("--workers", type=int, default=1, help="Processes; use a shared cache backend with more than one")
+    args = parser.parse_args(argv)
+    uvicorn.run("recipe_app.api:app", host=args.host, port=args.port, workers=args.workers)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,17 +1,17 @@
+import uuid
+
 import streamlit as st
-from langgraph.graph import StateGraph, START, END
-from langgraph.checkpoint.memory import MemorySaver
 from langchain_core.messages import HumanMessage
 
 from recipe_app.config.config import PAGE_TITLE, PAGE_ICON
-from recipe_app.models.recipe_models import RecipeState
-from recipe_app.services.recipe_services import (
-    QueryTranslator, 
-    RecipeRetriever, 
-    RecipeKeyFeatures, 
-    HumanFeedback,
-    Satisfaction
-)
+from recipe_app.config.settings import settings
+from recipe_app.services.graph import build_graph
+from recipe_app.services.jobs import FAILED, fingerprint, job_runner
+from recipe_app.services.recipe_services import RecipeKeyFeatures
+from recipe_app.services.recipe_store import REFERENCE_FIELDS
+from recipe_app.services.recommender import recommender
+from recipe_app.services.session_memory import JOB_KEY, SNAPSHOT_KEY, ensure_graph, track_current_session
+from recipe_app.services.structured_logging import configure_logging
 from recipe_app.ui.components import (
     apply_custom_css,
     display_recipe_card,
@@ -23,38 +23,109 @@ from recipe_app.ui.components import (
 
 def initialize_graph():
     """Initialize the recipe processing graph."""
-    builder = StateGraph(RecipeState)
+    # Each session keeps its checkpoints in memory; the UI resumes the same
+    # thread with the user's answer at the feedback step
+    return build_graph()
+
+GRAPH_CONFIG = {"configurable": {"thread_id": "1"}}
+
+# Graph output keys the UI renders; the rest of the state stays in the checkpointer
+DISPLAY_KEYS = ("recipes", "key_features", "feature_source", "feature_upgrade", "budget_exhausted")
+
+# What the user sees while a graph run is on each node
+JOB_STEPS = {
+    "translate_query": "Understanding your request",
+    "retrieve_recipes": "Searching for recipes",
+    "extract_key_features": "Reading the recipes",
+    "human_feedback": "Processing your feedback",
+    "refine_results": "Refining the suggestions",
+}
 
-    # Add nodes
-    builder.add_node("translate_query", QueryTranslator.translate)
-    builder.add_node("retrieve_recipes", RecipeRetriever.retrieve)
-    builder.add_node("extract_key_features", RecipeKeyFeatures.extract)
-    builder.add_node("human_feedback", HumanFeedback.refine)
+def compact_output(output: dict) -> dict:
+    """Keep only the references the UI needs from a graph output."""
+    return {key: output[key] for key in DISPLAY_KEYS if key in output}
 
-    # Add edges
-    builder.add_edge(START, "translate_query")
-    builder.add_edge("translate_query", "retrieve_recipes")
-    builder.add_edge("retrieve_recipes", "extract_key_features")
-    builder.add_edge("extract_key_features", "human_feedback")
+def run_graph(graph, graph_input, feedback: str = None):
+    """Return a job that runs the session's graph and reports the node it is on."""
+    # Log records of the run carry the session ID
+    config = {"configurable": {**GRAPH_CONFIG["configurable"], "session": st.session_state.session_id}}
+
+    def run(job):
+        if feedback is not None:
+            # Resume the paused thread at the feedback step
+            graph.update_state(GRAPH_CONFIG, {"feedback": feedback})
+        for task in graph.stream(graph_input, config, stream_mode="tasks"):
+            if "input" in task:
+                job.progress(task["name"])
+        state = graph.get_state(GRAPH_CONFIG)
+        return {"values": state.values, "paused": bool(state.next)}
+    return run
+
+def start_graph_job(kind: str, run, *payload):
+    """Submit a graph run for this session; repeated submissions attach to the same job."""
+    key = fingerprint(st.session_state.session_id, kind, *payload)
+    job_runner.submit(key, run, kind)
+    st.session_state[JOB_KEY] = key
+
+def collect_graph_job() -> bool:
+    """Apply the session's finished graph run; returns False while it is still running."""
+    job = job_runner.get(st.session_state[JOB_KEY])
+    if job is not None and not job.done:
+        return False
+    del st.session_state[JOB_KEY]
+    if job is None:
+        # Expired before this session came back; the step is submitted again
+        return True
+    if job.status == FAILED:
+        raise job.error
+    output, paused = job.result["values"], job.result["paused"]
+    selected_index = output.get('recipes_index', -1)
+    
+    # Check if user selected a recipe (the run ended instead of pausing again)
+    if selected_index >= 0 and not paused:
+        st.session_state.current_recipe = output['recipes'][selected_index]
+        st.session_state.current_feature = output['key_features'][selected_index]
+        st.session_state.has_final_recipe = True
+        # Clear the current output
+        st.session_state.current_output = None
+    else:
+        # New or refined results, paused for the next round of feedback
+        st.session_state.current_output = compact_output(output)
+        st.session_state.new_search = False
+    return True
 
-    # Add conditional edges for feedback loop
-    builder.add_conditional_edges(
-        "human_feedback",
-        Satisfaction.recipe_satisfaction,
-        {
-            "translate_query": "translate_query",
-            END: END
-        }
-    )
+# Streamlit runs this file on every rerun, so a changed poll interval applies to the next one
+@st.fragment(run_every=settings().job_poll_seconds)
+def show_job_progress():
+    """Show what the pending graph run is doing; rerun the page once it has finished."""
+    job = job_runner.get(st.session_state.get(JOB_KEY))
+    if job is None or job.done:
+        st.rerun()
+    st.info(f"⏳ {JOB_STEPS.get(job.step, 'Getting started')}... feel free to keep browsing.")
 
-    # Compile with memory checkpointer
-    memory = MemorySaver()
-    return builder.compile(checkpointer=memory)
+@st.fragment(run_every=settings().job_poll_seconds)
+def show_feature_upgrade():
+    """Swap in the LLM features once the background extraction has finished."""
+    output = st.session_state.current_output
+    result = RecipeKeyFeatures.upgraded(output['recipes'], output['key_features'], output['feature_upgrade'])
+    if result is None:
+        st.caption("Quick overview extracted locally - a more detailed one is on the way.")
+        return
+    features, source = result
+    update = {"key_features": features, "feature_source": source, "feature_upgrade": None}
+    # The paused thread resumes with the upgraded features
+    st.session_state.graph.update_state(GRAPH_CONFIG, update)
+    st.session_state.current_output = {**output, **update}
+    st.rerun()
 
 def reset_chat():
     """Reset the chat state."""
     if "graph" in st.session_state:
         del st.session_state.graph
+    if JOB_KEY in st.session_state:
+        del st.session_state[JOB_KEY]
+    if SNAPSHOT_KEY in st.session_state:
+        del st.session_state[SNAPSHOT_KEY]
     if "current_output" in st.session_state:
         del st.session_state.current_output
     if "current_recipe" in st.session_state:
@@ -74,7 +145,7 @@ def reset_chat():
         st.session_state.chat_counter = 0
     st.session_state.chat_counter += 1
 
-def save_to_favorites(recipe: dict):
+def save_to_favorites(recipe: dict, feature=None):
     """Save a recipe to favorites."""
     if "favorites" not in st.session_state:
         st.session_state.favorites = []
@@ -82,6 +153,9 @@ def save_to_favorites(recipe: dict):
     # Check if recipe is already in favorites
     if recipe not in st.session_state.favorites:
         st.session_state.favorites.append(recipe)
+        if feature is not None:
+            # Index it with its features, in case it was extracted in another process
+            recommender.add(recipe, feature)
         display_success("Recipe saved to favorites!")
     else:
         st.warning("This recipe is already in your favorites!")
@@ -96,13 +170,35 @@ def display_favorites():
                 if st.button("Remove from Favorites", key=f"remove_{i}"):
                     st.session_state.favorites.remove(recipe)
                     st.rerun()
+        display_recommendations(st.session_state.favorites)
     else:
         st.sidebar.info("No favorite recipes yet!")
 
+def display_recommendations(favorites: list):
+    """Show recipes similar to the favorites, ranked locally without a search."""
+    suggestions = recommender.recommend(favorites, settings().recommend_count)
+    if not suggestions:
+        return
+    st.sidebar.header("🍽️ More Like Your Favorites")
+    for i, recipe in enumerate(suggestions):
+        with st.sidebar.expander(f"✨ {recipe['name']}", expanded=False):
+            display_recipe_card(recipe)
+            if st.button("⭐ Save to Favorites", key=f"save_suggestion_{i}"):
+                save_to_favorites({key: recipe[key] for key in REFERENCE_FIELDS})
+                st.rerun()
+
 def main():
     """Main Streamlit application."""
     st.set_page_config(page_title=PAGE_TITLE, page_icon=PAGE_ICON, layout="wide")
     
+    # Queue log records for a background writer (once per process)
+    configure_logging()
+    # Invalid runtime settings stop the app here rather than mid-search
+    settings()
+    
+    # Account for this session's memory and evict idle sessions' graphs if needed
+    track_current_session()
+    
     # Apply custom CSS styling
     apply_custom_css()
     
@@ -138,9 +234,8 @@ def main():
     left_col, right_col = st.columns([2, 1])
 
     with left_col:
-        # Initialize session state
-        if "graph" not in st.session_state:
-            st.session_state.graph = initialize_graph()
+        # Initialize session state; an evicted graph is rebuilt from its snapshot
+        ensure_graph(st.session_state, initialize_graph)
         
         # Initialize chat counter if not exists
         if "chat_counter" not in st.session_state:
@@ -153,21 +248,28 @@ def main():
             placeholder="e.g., 'I have eggs, flour, tomatoes and cheese'"
         )
 
+        # Graph runs are fingerprinted per session, so a new chat never reuses an old job
+        if "session_id" not in st.session_state:
+            st.session_state.session_id = uuid.uuid4().hex
+
         if user_input:
             try:
-                # Store current output in session state
-                if 'current_output' not in st.session_state or st.session_state.get('new_search'):
+                # Pick up a graph run started on an earlier rerun
+                pending = JOB_KEY in st.session_state and not collect_graph_job()
+                if not pending and ('current_output' not in st.session_state or st.session_state.get('new_search')):
                     input_message = HumanMessage(content=user_input)
-                    
-                    with st.spinner("Searching for recipes..."):
-                        output = st.session_state.graph.invoke(
-                            {"messages": [input_message]},
-                            {"configurable": {"thread_id": "1"}}
-                        )
-                        st.session_state.current_output = output
-                        st.session_state.new_search = False
+                    start_graph_job(
+                        "search",
+                        run_graph(st.session_state.graph, {"messages": [input_message], "early_features": True}),
+                        st.session_state.chat_counter,
+                        user_input
+                    )
+                    # A finished job for the same search is applied right away
+                    pending = not collect_graph_job()
+                if pending:
+                    show_job_progress()
 
-                output = st.session_state.current_output
+                output = st.session_state.get('current_output')
 
                 # Check if a recipe has been selected
                 if "has_final_recipe" in st.session_state and st.session_state.has_final_recipe:
@@ -191,14 +293,22 @@ def main():
                     
                     # Add save to favorites button for selected recipe
                     if st.button("⭐ Save to Favorites", key="save_selected_main"):
-                        save_to_favorites(st.session_state.current_recipe)
+                        save_to_favorites(st.session_state.current_recipe, st.session_state.get("current_feature"))
                 
                 # Display results - ONLY key ingredients initially (if no recipe selected)
                 elif output and 'key_features' in output and len(output['key_features']) > 0:
                     st.subheader("🍳 Recipe Suggestions")
                     
+                    # Let the user know when the feedback loop stopped early
+                    if output.get('budget_exhausted'):
+                        st.info("These are the best matches found so far. Try rephrasing or start a new chat for a fresh search.")
+                    
                     # Display ONLY the key ingredients for each recipe
                     display_recipe_features(output['key_features'])
+                    if output.get('feature_upgrade') and not pending:
+                        show_feature_upgrade()
+                    elif output.get('feature_source') == "heuristic":
+                        st.caption("Quick overview extracted locally - ingredient lists may be less precise.")
                     
                     st.markdown("---")
                     
@@ -206,58 +316,14 @@ def main():
                     feedback = get_user_feedback()
                     
                     # Add a submit button for feedback
-                    submit_feedback = st.button("Submit Feedback", type="primary")
+                    submit_feedback = st.button("Submit Feedback", type="primary", disabled=pending)
                     
-                    if submit_feedback and feedback:
-                        with st.spinner("Processing your feedback..."):
-                            from recipe_app.services.recipe_services import HumanFeedback
-                            from langchain_openai import ChatOpenAI
-                            from langchain.schema import SystemMessage
-                            from recipe_app.models.recipe_models import HumanSelection
-                            from recipe_app.config.config import MODEL_NAME, TEMPERATURE
-                            
-                            # Process feedback directly
-                            llm = ChatOpenAI(model=MODEL_NAME, temperature=TEMPERATURE)
-                            system_message = SystemMessage(content=f"""
-                            Process the user feedback on the suggested recipes:
-                            Current recipes: {output.get('key_features', [])}
-                            User feedback: {feedback}
-
-                            Instructions:
-                            1. If the user expresses satisfaction with any recipe, return its index (0, 1, or 2).
-                            2. If the user wants modifications or different recipes, explain why in the dislike field.
-                            3. Be strict about recipe selection - only set 'like' if there's clear positive feedback.
-                            """)
-
-                            structured_llm = llm.with_structured_output(HumanSelection)
-                            classification = structured_llm.invoke([system_message])
-                            
-                            # Check if user selected a recipe
-                            if classification.like is not None:
-                                selected_index = classification.like
-                                selected_recipe = output['recipes'][selected_index]
-                                selected_feature = output['key_features'][selected_index]
-                                st.session_state.current_recipe = selected_recipe
-                                st.session_state.current_feature = selected_feature
-                                st.session_state.has_final_recipe = True
-                                # Clear the current output
-                                st.session_state.current_output = None
-                                st.success(f"Great! You selected: {selected_feature.dish_name}")
-                                st.rerun()
-                            else:
-                                # User wants different recipes - create new query from dislike reason
-                                st.info(f"Searching for: {classification.dislike}")
-                                # Create a new input message with the refined request
-                                input_message = HumanMessage(content=classification.dislike)
-                                
-                                with st.spinner("Searching for better recipes..."):
-                                    output = st.session_state.graph.invoke(
-                                        {"messages": [input_message]},
-                                        {"configurable": {"thread_id": "1"}}
-                                    )
-                                    st.session_state.current_output = output
-                                    st.session_state.new_search = False
-                                    st.rerun()
+                    if submit_feedback and feedback and not pending:
+                        graph = st.session_state.graph
+                        # Keyed by the checkpoint it resumes, so a double submit runs once
+                        checkpoint_id = graph.get_state(GRAPH_CONFIG).config["configurable"].get("checkpoint_id")
+                        start_graph_job("feedback", run_graph(graph, None, feedback=feedback), checkpoint_id, feedback)
+                        st.rerun()
 
             except Exception as e:
                 display_error(str(e))
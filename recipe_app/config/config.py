@@ -1,18 +1,197 @@
 import os
-from dotenv import load_dotenv
 
-# Load environment variables
-load_dotenv()
+_environment_loaded = False
 
-# API Keys
-OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
-TAVILY_API_KEY = os.getenv("TAVILY_API_KEY")
-LANGCHAIN_API_KEY = os.getenv("LANGCHAIN_API_KEY")
+def load_environment():
+    """Load environment variables from a .env file, once per process.
+
+    Called on first use of an API key rather than at import, so importing the
+    configuration stays cheap for the app, scripts and worker processes.
+    """
+    global _environment_loaded
+    if not _environment_loaded:
+        from dotenv import load_dotenv
+        load_dotenv()
+        _environment_loaded = True
+
+# API Keys, resolved from the environment when accessed
+API_KEY_NAMES = ("OPENAI_API_KEY", "TAVILY_API_KEY", "LANGCHAIN_API_KEY")
+
+def __getattr__(name):
+    if name in API_KEY_NAMES:
+        load_environment()
+        return os.getenv(name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+# Runtime Settings (recipe_app.config.settings)
+# Performance knobs below can be overridden from a JSON or TOML file and RECIPE_<NAME>
+# variables, and are reloaded when the file changes. Set RECIPE_SETTINGS_FILE to use a file.
+SETTINGS_FILE = None
+SETTINGS_CHECK_SECONDS = 2  # How often the settings file is checked for changes
 
 # Model Configuration
 MODEL_NAME = "gpt-4"
+FAST_MODEL_NAME = "gpt-4o-mini"
 TEMPERATURE = 0
 MAX_SEARCH_RESULTS = 3
+RECIPE_POOL_SIZE = 20  # Recipes kept per conversation for local refinement
+
+# Model Routing
+# Per-node model and call parameters; missing keys fall back to DEFAULT_MODEL_ROUTE.
+# "escalate_to" retries once on a larger model when structured output fails validation.
+DEFAULT_MODEL_ROUTE = {
+    "model": MODEL_NAME,
+    "temperature": TEMPERATURE,
+    "max_tokens": None,
+    "timeout": 30,
+    "escalate_to": None,
+}
+MODEL_ROUTES = {
+    "translate_query": {"model": FAST_MODEL_NAME, "max_tokens": 50, "timeout": 10},
+    "extract_key_features": {"model": MODEL_NAME, "max_tokens": 1500, "timeout": 30},
+    "extract_key_features_batch": {"model": MODEL_NAME, "max_tokens": 6000, "timeout": 45},
+    "human_feedback": {"model": FAST_MODEL_NAME, "max_tokens": 300, "timeout": 10, "escalate_to": MODEL_NAME},
+}
+
+# Feedback Loop Budget
+MAX_FEEDBACK_LOOPS = 3  # Searches triggered by feedback per search
+TURN_DEADLINE_SECONDS = 45  # Wall-clock deadline for a single graph run
+CONVERSATION_TOKEN_BUDGET = 30000  # Total LLM tokens per search, including its feedback rounds
+DEFAULT_CYCLE_SECONDS = 10  # Estimated search cycle duration before one is measured
+DEFAULT_CYCLE_TOKENS = 2500  # Estimated search cycle token cost before one is measured
+
+# Conversation History
+# Older turns are folded into a summary of constraints; the translator sees the summary,
+# the last HISTORY_KEEP_TURNS turns verbatim and never more than HISTORY_MAX_TOKENS.
+HISTORY_KEEP_TURNS = 3
+HISTORY_MAX_TOKENS = 1200
+HISTORY_TOPIC_CHARS = 200  # Length of the earlier request kept in the summary
+
+# Caching
+# Search and extraction results go through a pluggable backend: "memory" (per process),
+# "sqlite" (CACHE_URL is a file path on a local disk, shared by processes on one host) or
+# "redis" (CACHE_URL is redis://host:port/db). Overridden by the RECIPE_CACHE_BACKEND and RECIPE_CACHE_URL variables.
+CACHE_BACKEND = "memory"
+CACHE_URL = None
+CACHE_MAX_ENTRIES = 1024
+CACHE_TTL_SECONDS = 3600  # Entries are fresh this long...
+CACHE_STALE_SECONDS = 24 * 3600  # ...then served stale this long while one background call refreshes them
+CACHE_NEGATIVE_TTL_SECONDS = 300  # Empty results
+CACHE_ERROR_TTL_SECONDS = 30  # Provider errors, so a failing provider is not retried on every request
+CACHE_REFRESH_WORKERS = 2  # Background refreshes running at once per process
+RECIPE_STORE_MAX_ENTRIES = 5000  # Recipe bodies kept per process; older ones are re-read from the cache
+RECIPE_STORE_TTL_SECONDS = 7 * 24 * 3600  # How long recipe bodies stay in the shared cache
+
+# Recipe Corpus Snapshot (recipe_app.services.corpus)
+# Recipes and their extracted features are published as read-only, memory-mapped
+# generations that every process on a host shares; the recipe store falls back to the
+# snapshot before the cache backend. Set RECIPE_CORPUS_DIR to move it.
+CORPUS_DIR = os.path.join(".cache", "corpus")
+CORPUS_CHECK_SECONDS = 5  # How often a reader looks for a newer generation
+CORPUS_MAX_SEGMENTS = 8  # Segments are merged into one when a commit adds more
+CORPUS_KEEP_GENERATIONS = 3  # Older generations, and segments only they use, are deleted
+
+# Recommendations
+# "More like this" suggestions rank the recipes this process has seen (and the corpus
+# snapshot) by TF-IDF similarity of their ingredients and names to the user's favorites.
+RECOMMEND_COUNT = 5  # Suggestions shown under the favorites
+RECOMMEND_INGREDIENT_WEIGHT = 2.0  # Term frequency of a whole ingredient; single words count 1
+RECOMMEND_MAX_RECIPES = 20000  # Recipes indexed per process; the oldest are dropped first
+
+# Session Memory
+# Sessions' compiled graphs are swapped for a snapshot of their latest checkpoints when
+# idle, and rebuilt transparently when the user returns.
+SESSION_IDLE_SECONDS = 600  # Idle sessions are always evicted after this long
+SESSION_PRESSURE_IDLE_SECONDS = 60  # Over a budget, sessions idle this long are evicted, oldest first
+SESSION_MEMORY_BUDGET_MB = 512  # Tracked session state per process
+PROCESS_MEMORY_BUDGET_MB = 1536  # Process RSS; None to only use the session budget
+SESSION_MAX_MB = 32  # A larger session has its checkpoint history dropped on its next rerun
+SESSION_CHECK_SECONDS = 5  # How often a rerun checks the budgets
+MEMORY_LOG_SECONDS = 60  # How often a rerun logs process RSS and session memory
+
+# Background Jobs
+# Graph runs execute on a process-wide pool instead of the Streamlit script thread; a
+# submission is keyed by its session, step and input, so reruns and repeated clicks
+# attach to the job already running instead of starting another.
+JOB_WORKERS = 8  # Graph runs in progress at once across all sessions
+JOB_POLL_SECONDS = 0.5  # How often a waiting page checks its job
+JOB_TTL_SECONDS = 600  # Finished jobs are kept this long for the session to pick up
+
+# Search Result Deduplication
+# Syndicated copies and tracking-parameter URLs of a recipe are merged before extraction.
+# DEDUP_OVERFETCH extra results are requested so duplicates can be replaced.
+DEDUP_ENABLED = True
+DEDUP_OVERFETCH = 2
+DEDUP_MIN_SIMILARITY = 0.7  # Estimated word-pair overlap at which two snippets count as copies
+DEDUP_MIN_WORDS = 12  # Shorter snippets are only compared by URL
+TRACKING_PARAMS = {"fbclid", "gclid", "dclid", "msclkid", "yclid", "igshid", "mc_cid", "mc_eid", "ref", "ref_src"}
+TRACKING_PARAM_PREFIXES = ("utm_", "_ga", "_gl", "pk_", "hsa_")
+
+# Page Fetching
+# Result pages are downloaded concurrently so recipe cards can show the full recipe.
+# Off by default, since it adds up to PAGE_FETCH_DEADLINE_SECONDS to each search;
+# set RECIPE_PAGE_FETCH=on to enable it. Only public addresses are fetched.
+PAGE_FETCH_ENABLED = False
+PAGE_FETCH_WORKERS = 8  # Pages downloaded at once per process
+PAGE_FETCH_PER_HOST = 2  # Concurrent requests to any one site
+PAGE_FETCH_TIMEOUT_SECONDS = 5  # Per request
+PAGE_FETCH_DEADLINE_SECONDS = 6  # For the whole fetch stage; late pages only fill the cache
+PAGE_MAX_BYTES = 2 * 1024 * 1024  # Download cap per page
+PAGE_MAX_REDIRECTS = 5  # Each hop is checked before it is followed
+PAGE_TEXT_MAX_CHARS = 12000  # Text kept per page
+PAGE_CACHE_PATH = os.path.join(".cache", "pages.sqlite3")
+PAGE_CACHE_MAX_ENTRIES = 2000
+PAGE_CACHE_FRESH_SECONDS = 3600  # Served without asking the site; older pages are revalidated
+PAGE_CACHE_TTL_SECONDS = 7 * 24 * 3600
+
+# LLM Response Cache
+# Deterministic (temperature 0) model calls are answered from a local SQLite file when the
+# model, parameters, output schema and messages match. Set RECIPE_LLM_CACHE=off to bypass.
+LLM_CACHE_ENABLED = True
+LLM_CACHE_PATH = os.path.join(".cache", "llm_responses.sqlite3")
+LLM_CACHE_MAX_ENTRIES = 5000
+LLM_CACHE_TTL_SECONDS = 7 * 24 * 3600
+
+# Record/Replay
+# "record" saves OpenAI and Tavily traffic to a cassette file, "replay" answers from it
+# offline. Overridden by RECIPE_RECORD_MODE, RECIPE_CASSETTE and RECIPE_REPLAY_LATENCY.
+RECORD_MODE = "off"
+CASSETTE_DIR = os.path.join("tests", "cassettes")
+REPLAY_LATENCY = "original"  # or "zero"
+
+# Feature Extraction
+EXTRACTION_TIMEOUT_SECONDS = 15  # Deadline for the LLM before falling back to local extraction
+EXTRACTION_WORKERS = 8  # Threads running LLM extractions with a deadline
+HEURISTIC_ONLY_CONFIDENCE = None  # e.g. 0.9 to skip the LLM when local extraction is this confident
+# Micro-batching merges extractions from concurrent sessions into one LLM call, for
+# when the provider's request rate (not token rate) is the limit
+EXTRACTION_BATCHING = False
+EXTRACTION_BATCH_WINDOW_SECONDS = 0.2  # How long the first request waits for others
+EXTRACTION_BATCH_MAX_SIZE = 4  # Extraction requests per batch
+
+# Logging
+# Records are queued on the calling thread and formatted and written by a background
+# listener, as JSON lines carrying the session and graph node. Overridden by the
+# RECIPE_LOG_LEVEL, RECIPE_LOG_FORMAT ("json" or "text") and RECIPE_LOG_FILE variables.
+LOG_LEVEL = "INFO"
+LOG_FORMAT = "json"
+LOG_FILE = None  # None writes to stderr
+LOG_QUEUE_SIZE = 10000  # Records waiting for the listener; further records are dropped and counted
+LOG_SAMPLE_BURST = 20  # Repeats of one line per second that are always kept...
+LOG_SAMPLE_EVERY = {"DEBUG": 100, "INFO": 10}  # ...beyond that, 1 in N per level (warnings and errors are never sampled)
+
+# Cache Pre-warming (recipe_app.tools.prewarm)
+PREWARM_CONCURRENCY = 4  # Queries warmed at once, to stay inside provider rate limits
+PREWARM_TOP_QUERIES = 50  # Most frequent search queries taken from an app log
+
+# HTTP API (recipe_app.api)
+# Threads and favorites are kept in the cache backend; use a shared one when running
+# several API processes.
+API_HOST = "127.0.0.1"
+API_PORT = 8000
+CHECKPOINT_TTL_SECONDS = 24 * 3600  # Paused threads can be resumed this long after their last step
+FAVORITES_TTL_SECONDS = None  # Favorites do not expire
+MAX_FAVORITES = 200  # Per user; the oldest are dropped first
 
 # UI Configuration
 PAGE_TITLE = "Recipe Assistant"
@@ -35,7 +214,7 @@ Instructions:
 Example input: "I want to make a vegetarian pasta dish with mushrooms for dinner"
 Example output: vegetarian mushroom pasta recipe"""
 
-RECIPE_FEATURES_INSTRUCTIONS = """You will receive the top 3 recipes from a web search. For each recipe, extract and structure the following information:
+RECIPE_FEATURES_INSTRUCTIONS = """You will receive the top recipes from a web search. For each recipe, extract and structure the following information:
 1. dish_name: The name of the dish
 2. key_ingredients: A list of the main ingredients used in the recipe
 3. cooking_style: (Optional) The style or method of cooking (e.g., baked, grilled, stir-fried)
@@ -47,4 +226,4 @@ Format the information according to the following structure for each recipe:
     "cooking_style": "Style of cooking"
 }
 
-Return exactly 3 recipes in this format.""" 
\ No newline at end of file
+Return exactly one entry per recipe, in the same order as the recipes were given.""" 
\ No newline at end of file
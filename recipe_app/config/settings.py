@@ -0,0 +1,311 @@
+"""Typed performance settings that can be changed while the app is running.
+
+The constants in ``config.py`` are the defaults. A settings file (JSON, or
+TOML by extension) named by RECIPE_SETTINGS_FILE overrides them, and
+``RECIPE_<NAME>`` environment variables override both, e.g.
+``RECIPE_MAX_SEARCH_RESULTS=5`` or ``RECIPE_MODEL_ROUTES='{"translate_query":
+{"model": "gpt-4o"}}'``. Settings are validated when first read, and the
+file is re-read when it changes, at most every SETTINGS_CHECK_SECONDS.
+Code reads ``settings().<name>`` where it needs a value rather than
+importing the constant, so a reload applies to the next request.
+
+Check a file before deploying it with:
+
+    python -m recipe_app.config.settings path/to/settings.toml
+"""
+import os
+import sys
+import json
+import time
+import logging
+import threading
+from typing import Any, Callable, Dict, List, Optional
+
+from pydantic import BaseModel, Field, ValidationError, model_validator
+
+from recipe_app.config import config
+
+logger = logging.getLogger(__name__)
+
+ENV_PREFIX = "RECIPE_"
+
+
+class SettingsError(ValueError):
+    """A settings file or variable that does not validate."""
+
+
+class ModelRoute(BaseModel, extra="forbid"):
+    """Model and call parameters for one graph node."""
+
+    model: str
+    temperature: float = Field(ge=0, le=2)
+    max_tokens: Optional[int] = Field(None, gt=0)
+    timeout: Optional[float] = Field(None, gt=0)
+    escalate_to: Optional[str] = None
+
+
+def _restart(default: Any, **constraints: Any) -> Any:
+    """A field that only takes effect in a new process (e.g. a thread pool size)."""
+    return Field(default, json_schema_extra={"restart": True}, **constraints)
+
+
+class Settings(BaseModel, extra="forbid", frozen=True):
+    """Every performance knob, with its default from config.py."""
+
+    # Result counts
+    max_search_results: int = Field(config.MAX_SEARCH_RESULTS, ge=1, le=20)
+    recipe_pool_size: int = Field(config.RECIPE_POOL_SIZE, ge=1)
+    dedup_enabled: bool = config.DEDUP_ENABLED
+    dedup_overfetch: int = Field(config.DEDUP_OVERFETCH, ge=0)
+    recommend_max_recipes: int = Field(config.RECOMMEND_MAX_RECIPES, ge=1)
+    recommend_count: int = Field(config.RECOMMEND_COUNT, ge=0)
+    max_favorites: int = Field(config.MAX_FAVORITES, ge=1)
+    prewarm_top_queries: int = Field(config.PREWARM_TOP_QUERIES, ge=1)
+
+    # Models
+    model_routes: Dict[str, ModelRoute] = Field(default_factory=lambda: {
+        node: ModelRoute(**{**config.DEFAULT_MODEL_ROUTE, **route}) for node, route in config.MODEL_ROUTES.items()
+    })
+    default_model_route: ModelRoute = Field(default_factory=lambda: ModelRoute(**config.DEFAULT_MODEL_ROUTE))
+
+    # Cache sizes and TTLs
+    cache_max_entries: int = Field(config.CACHE_MAX_ENTRIES, ge=1)
+    cache_ttl_seconds: float = Field(config.CACHE_TTL_SECONDS, gt=0)
+    cache_stale_seconds: float = Field(config.CACHE_STALE_SECONDS, ge=0)
+    cache_negative_ttl_seconds: float = Field(config.CACHE_NEGATIVE_TTL_SECONDS, gt=0)
+    cache_error_ttl_seconds: float = Field(config.CACHE_ERROR_TTL_SECONDS, gt=0)
+    llm_cache_ttl_seconds: float = Field(config.LLM_CACHE_TTL_SECONDS, gt=0)
+    page_cache_fresh_seconds: float = Field(config.PAGE_CACHE_FRESH_SECONDS, ge=0)
+    page_cache_ttl_seconds: float = Field(config.PAGE_CACHE_TTL_SECONDS, gt=0)
+    llm_cache_max_entries: int = _restart(config.LLM_CACHE_MAX_ENTRIES, ge=1)
+    page_cache_max_entries: int = _restart(config.PAGE_CACHE_MAX_ENTRIES, ge=1)
+    recipe_store_max_entries: int = Field(config.RECIPE_STORE_MAX_ENTRIES, ge=1)
+    recipe_store_ttl_seconds: float = Field(config.RECIPE_STORE_TTL_SECONDS, gt=0)
+    checkpoint_ttl_seconds: float = Field(config.CHECKPOINT_TTL_SECONDS, gt=0)
+    job_ttl_seconds: float = Field(config.JOB_TTL_SECONDS, ge=0)
+    favorites_ttl_seconds: Optional[float] = Field(config.FAVORITES_TTL_SECONDS, gt=0)
+    corpus_max_segments: int = Field(config.CORPUS_MAX_SEGMENTS, ge=1)
+    corpus_keep_generations: int = Field(config.CORPUS_KEEP_GENERATIONS, ge=1)
+
+    # Timeouts and budgets
+    extraction_timeout_seconds: float = Field(config.EXTRACTION_TIMEOUT_SECONDS, gt=0)
+    page_fetch_timeout_seconds: float = Field(config.PAGE_FETCH_TIMEOUT_SECONDS, gt=0)
+    page_fetch_deadline_seconds: float = Field(config.PAGE_FETCH_DEADLINE_SECONDS, gt=0)
+    turn_deadline_seconds: float = Field(config.TURN_DEADLINE_SECONDS, gt=0)
+    max_feedback_loops: int = Field(config.MAX_FEEDBACK_LOOPS, ge=0)
+    conversation_token_budget: int = Field(config.CONVERSATION_TOKEN_BUDGET, gt=0)
+    heuristic_only_confidence: Optional[float] = Field(config.HEURISTIC_ONLY_CONFIDENCE, ge=0, le=1)
+    history_max_tokens: int = Field(config.HISTORY_MAX_TOKENS, gt=0)
+    page_max_bytes: int = Field(config.PAGE_MAX_BYTES, gt=0)
+    page_max_redirects: int = Field(config.PAGE_MAX_REDIRECTS, ge=0)
+    page_text_max_chars: int = Field(config.PAGE_TEXT_MAX_CHARS, gt=0)
+
+    # Polling intervals
+    job_poll_seconds: float = Field(config.JOB_POLL_SECONDS, gt=0)
+    corpus_check_seconds: float = Field(config.CORPUS_CHECK_SECONDS, ge=0)
+    session_check_seconds: float = Field(config.SESSION_CHECK_SECONDS, ge=0)
+    memory_log_seconds: float = Field(config.MEMORY_LOG_SECONDS, gt=0)
+
+    # Session memory
+    session_idle_seconds: float = Field(config.SESSION_IDLE_SECONDS, gt=0)
+    session_pressure_idle_seconds: float = Field(config.SESSION_PRESSURE_IDLE_SECONDS, ge=0)
+    session_memory_budget_mb: int = Field(config.SESSION_MEMORY_BUDGET_MB, gt=0)
+    process_memory_budget_mb: Optional[int] = Field(config.PROCESS_MEMORY_BUDGET_MB, gt=0)
+    session_max_mb: int = Field(config.SESSION_MAX_MB, gt=0)
+
+    # Concurrency
+    page_fetch_per_host: int = Field(config.PAGE_FETCH_PER_HOST, ge=1)
+    extraction_workers: int = _restart(config.EXTRACTION_WORKERS, ge=1)
+    page_fetch_workers: int = _restart(config.PAGE_FETCH_WORKERS, ge=1)
+    cache_refresh_workers: int = _restart(config.CACHE_REFRESH_WORKERS, ge=1)
+    job_workers: int = _restart(config.JOB_WORKERS, ge=1)
+    prewarm_concurrency: int = Field(config.PREWARM_CONCURRENCY, ge=1)
+    extraction_batching: bool = config.EXTRACTION_BATCHING
+    extraction_batch_window_seconds: float = Field(config.EXTRACTION_BATCH_WINDOW_SECONDS, ge=0)
+    extraction_batch_max_size: int = Field(config.EXTRACTION_BATCH_MAX_SIZE, ge=1)
+
+    @model_validator(mode="after")
+    def _check_deadlines(self) -> "Settings":
+        if self.page_fetch_deadline_seconds < self.page_fetch_timeout_seconds:
+            raise ValueError("page_fetch_deadline_seconds must be at least page_fetch_timeout_seconds")
+        if self.turn_deadline_seconds < self.extraction_timeout_seconds:
+            raise ValueError("turn_deadline_seconds must be at least extraction_timeout_seconds")
+        if self.session_idle_seconds < self.session_pressure_idle_seconds:
+            raise ValueError("session_idle_seconds must be at least session_pressure_idle_seconds")
+        return self
+
+    def route(self, node: str) -> Dict[str, Any]:
+        """Model route of a node as a dict, falling back to the default route."""
+        return (self.model_routes.get(node) or self.default_model_route).model_dump()
+
+    @classmethod
+    def restart_fields(cls) -> List[str]:
+        return [name for name, field in cls.model_fields.items() if (field.json_schema_extra or {}).get("restart")]
+
+
+def read_settings_file(path: str) -> Dict[str, Any]:
+    """Read overrides from a JSON or TOML (``.toml``) file."""
+    with open(path, "rb") as f:
+        if path.endswith(".toml"):
+            import tomllib
+            data = tomllib.load(f)
+        else:
+            data = json.loads(f.read().decode("utf-8"))
+    if not isinstance(data, dict):
+        raise SettingsError(f"{path}: expected a table of settings")
+    return data
+
+
+def environment_overrides(environ: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+    """Read ``RECIPE_<NAME>`` variables for settings fields; values may be JSON."""
+    environ = os.environ if environ is None else environ
+    overrides = {}
+    for name in Settings.model_fields:
+        raw = environ.get(ENV_PREFIX + name.upper())
+        if raw is None:
+            continue
+        try:
+            overrides[name] = json.loads(raw)
+        except ValueError:
+            overrides[name] = raw
+    return overrides
+
+
+def load_settings(path: Optional[str] = None, environ: Optional[Dict[str, str]] = None) -> Settings:
+    """Validate defaults, file overrides and environment overrides, in that order."""
+    overrides: Dict[str, Any] = {}
+    try:
+        if path:
+            overrides.update(read_settings_file(path))
+        overrides.update(environment_overrides(environ))
+        # A route given for a node only needs the keys it changes
+        routes = overrides.get("model_routes")
+        if isinstance(routes, dict):
+            merged = {node: route.model_dump() for node, route in Settings().model_routes.items()}
+            for node, route in routes.items():
+                merged[node] = {**merged.get(node, config.DEFAULT_MODEL_ROUTE), **route} if isinstance(route, dict) else route
+            overrides["model_routes"] = merged
+        return Settings(**overrides)
+    except ValidationError as e:
+        problems = "; ".join(f"{'.'.join(str(part) for part in error['loc']) or 'settings'}: {error['msg']}"
+                             for error in e.errors())
+        raise SettingsError(f"Invalid settings{f' in {path}' if path else ''}: {problems}") from None
+    except SettingsError:
+        raise
+    except (OSError, ValueError) as e:
+        raise SettingsError(f"Could not read settings from {path}: {e}") from None
+
+
+class SettingsManager:
+    """Holds the current settings and reloads them when the settings file changes.
+
+    The first read validates and raises SettingsError, so a bad deploy fails
+    at startup. Later reloads that fail validation are logged and the
+    previous settings stay in force. Subscribers are called with the old
+    and new settings after each change.
+    """
+
+    def __init__(self, path: Optional[str] = None, check_seconds: float = config.SETTINGS_CHECK_SECONDS):
+        self._path = path
+        self.check_seconds = check_seconds
+        self._settings: Optional[Settings] = None
+        self._mtime: Optional[float] = None
+        self._last_check = 0.0
+        # Reentrant, so subscribers may read the settings
+        self._lock = threading.RLock()
+        self._subscribers: List[Callable[[Settings, Settings], None]] = []
+
+    @property
+    def path(self) -> Optional[str]:
+        return self._path or os.getenv("RECIPE_SETTINGS_FILE", config.SETTINGS_FILE)
+
+    def _file_mtime(self) -> Optional[float]:
+        try:
+            return os.stat(self.path).st_mtime if self.path else None
+        except OSError:
+            return None
+
+    def get(self) -> Settings:
+        """Current settings; re-reads the file if it changed since the last check."""
+        current = self._settings
+        if current is not None and time.monotonic() - self._last_check < self.check_seconds:
+            return current
+        with self._lock:
+            if self._settings is None:
+                self._mtime = self._file_mtime()
+                self._settings = load_settings(self.path)
+                self._last_check = time.monotonic()
+                return self._settings
+            if time.monotonic() - self._last_check >= self.check_seconds:
+                self._last_check = time.monotonic()
+                mtime = self._file_mtime()
+                if mtime != self._mtime:
+                    self._mtime = mtime
+                    self._reload_locked()
+            return self._settings
+
+    def reload(self) -> Settings:
+        """Re-read the file and environment now."""
+        with self._lock:
+            self._mtime = self._file_mtime()
+            self._last_check = time.monotonic()
+            if self._settings is None:
+                self._settings = load_settings(self.path)
+            else:
+                self._reload_locked()
+            return self._settings
+
+    def _reload_locked(self) -> None:
+        try:
+            new = load_settings(self.path)
+        except SettingsError as e:
+            logger.error("%s; keeping the current settings", e)
+            return
+        old, self._settings = self._settings, new
+        changed = [name for name in Settings.model_fields if getattr(old, name) != getattr(new, name)]
+        if not changed:
+            return
+        logger.info("Reloaded settings: %s", ", ".join(changed))
+        restart = [name for name in changed if name in Settings.restart_fields()]
+        if restart:
+            logger.warning("Settings only applied after a restart: %s", ", ".join(restart))
+        for subscriber in list(self._subscribers):
+            try:
+                subscriber(old, new)
+            except Exception as e:
+                logger.error("Settings subscriber %s failed: %s", getattr(subscriber, "__name__", subscriber), e)
+
+    def subscribe(self, callback: Callable[[Settings, Settings], None]) -> None:
+        """Call ``callback(old, new)`` after every change."""
+        self._subscribers.append(callback)
+
+    def override(self, settings: Optional[Settings]) -> None:
+        """Replace the current settings (None to load them again on next read); for tests."""
+        with self._lock:
+            self._settings = settings
+            self._last_check = time.monotonic() if settings is not None else 0.0
+            self._mtime = self._file_mtime()
+
+
+# Process-wide settings shared by every session
+settings_manager = SettingsManager()
+
+
+def settings() -> Settings:
+    """The settings in force for this request."""
+    return settings_manager.get()
+
+
+def main(argv: List[str] = None) -> int:
+    argv = sys.argv[1:] if argv is None else argv
+    try:
+        loaded = load_settings(argv[0] if argv else None)
+    except SettingsError as e:
+        print(e, file=sys.stderr)
+        return 1
+    print(json.dumps(loaded.model_dump(), indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
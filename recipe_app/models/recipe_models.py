@@ -1,11 +1,19 @@
+from dataclasses import dataclass
 from pydantic import BaseModel, Field, field_validator
-from typing import List, Dict, Optional, Union
+from typing import List, Dict, Optional, Tuple, Union, TypedDict
 try:
     from typing import Annotated
 except ImportError:
     from typing_extensions import Annotated
-from langgraph.graph import MessagesState, add_messages
-from langchain_core.messages import AnyMessage
+
+def add_messages(left, right):
+    """Message reducer for graph state, importing langgraph only when a graph runs."""
+    from langgraph.graph.message import add_messages as langgraph_add_messages
+    return langgraph_add_messages(left, right)
+
+class MessagesState(TypedDict):
+    """Same shape as langgraph's MessagesState, without importing langgraph at load time."""
+    messages: Annotated[List, add_messages]  # List of langchain_core AnyMessage
 
 class SearchQuery(BaseModel):
     """Model for search queries."""
@@ -17,13 +25,55 @@ class RecipeFeature(BaseModel):
     key_ingredients: List[str] = Field(default_factory=list, description="List of key ingredients")
     cooking_style: Optional[str] = Field(None, description="Style of cooking (if applicable)")
 
+@dataclass(frozen=True, slots=True)
+class FeatureRecord:
+    """Lightweight, immutable recipe features kept in graph and session state."""
+    dish_name: str
+    key_ingredients: Tuple[str, ...] = ()
+    cooking_style: Optional[str] = None
+
+    def __post_init__(self):
+        # Checkpoint deserialization hands back lists
+        object.__setattr__(self, "key_ingredients", tuple(self.key_ingredients))
+
+    @classmethod
+    def from_feature(cls, feature: "RecipeFeature") -> "FeatureRecord":
+        if isinstance(feature, cls):
+            return feature
+        return cls(feature.dish_name, tuple(feature.key_ingredients), feature.cooking_style)
+
 class RecipeState(MessagesState):
     """State model for recipe processing."""
     query: str = ""  # Search query
-    recipes: List[Dict] = []  # List of found recipes
-    key_features: List = []  # Key features of recipes (List[RecipeFeature])
+    recipes: List[Dict] = []  # Found recipes as {"id", "name", "url"} references into the recipe store
+    key_features: List = []  # Key features of recipes (List[FeatureRecord])
     recipes_index: int = -1  # Selected recipe index, defaults to -1 (no selection)
     feedback: Optional[str] = None  # User feedback on recipes
+    refinement: Optional[str] = None  # Pending constraint-style feedback to apply
+    recipe_pool: List[Dict] = []  # Session buffer of {"recipe", "feature"} pairs seen so far
+    kept_results: List[Dict] = []  # Pool entries that already satisfy the refinement
+    search_limit: int = 0  # Max results for the next search (0 = MAX_SEARCH_RESULTS)
+    loop_iterations: int = 0  # Searches triggered by feedback since the current search began
+    tokens_used: int = 0  # LLM tokens used since the current search began
+    turn_started_at: Optional[float] = None  # Start time of the current graph run
+    cycle_started_at: Optional[float] = None  # Start time of the current search cycle
+    cycle_start_tokens: int = 0  # tokens_used when the current search cycle started
+    cycle_seconds: Optional[float] = None  # Duration of the last search cycle
+    cycle_tokens: Optional[int] = None  # Tokens used by the last search cycle
+    budget_exhausted: Optional[str] = None  # Why the last turn stopped early, if it did
+    feature_source: Optional[str] = None  # "llm", "heuristic" or "structured" extraction of key_features
+    early_features: bool = False  # Return local features at once and extract with the LLM in the background
+    feature_upgrade: Optional[Dict] = None  # Pending background extraction as {"job", "urls"}
+    history_summary: Optional[Dict] = None  # Constraints from older turns folded out of messages
+
+class RecipeConstraints(BaseModel):
+    """Model for constraints parsed from refinement feedback."""
+    diets: List[str] = Field(default_factory=list, description="Dietary labels such as vegetarian or vegan")
+    excluded: List[str] = Field(default_factory=list, description="Ingredient terms that must not appear")
+    required: List[str] = Field(default_factory=list, description="Ingredient terms that must appear")
+
+    def is_empty(self) -> bool:
+        return not (self.diets or self.excluded or self.required)
 
 class ResponseRecipeKeyFeatures(BaseModel):
     """Model for recipe key features response."""
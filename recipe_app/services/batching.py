@@ -0,0 +1,75 @@
+import time
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class MicroBatcher:
+    """Merges calls submitted from many threads into batches.
+
+    The first pending item opens a collection window of ``window_seconds``;
+    the batch is dispatched when the window closes or ``max_batch_size``
+    items are waiting, whichever comes first. ``batch_fn`` receives the list
+    of items and must return one result per item, in order. Batches run on
+    a small pool, so a slow batch does not hold up the next window.
+    """
+
+    def __init__(self, batch_fn: Callable[[List[Any]], List[Any]], window_seconds: float,
+                 max_batch_size: int, workers: int = 4, name: str = "batch"):
+        self.batch_fn = batch_fn
+        self.window_seconds = window_seconds
+        self.max_batch_size = max_batch_size
+        self.name = name
+        self._pending: List[Tuple[Any, Future]] = []
+        self._opened_at: Optional[float] = None
+        self._condition = threading.Condition()
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix=name)
+        self._collector: Optional[threading.Thread] = None
+
+    def submit(self, item: Any) -> Future:
+        """Queue an item for the next batch and return a future for its result."""
+        future: Future = Future()
+        with self._condition:
+            if not self._pending:
+                self._opened_at = time.monotonic()
+            self._pending.append((item, future))
+            if self._collector is None:
+                self._collector = threading.Thread(target=self._collect, name=f"{self.name}-collector", daemon=True)
+                self._collector.start()
+            self._condition.notify()
+        return future
+
+    def _collect(self) -> None:
+        """Dispatch a batch whenever the window closes or the batch is full."""
+        while True:
+            with self._condition:
+                while not self._pending:
+                    self._condition.wait()
+                while len(self._pending) < self.max_batch_size:
+                    remaining = self._opened_at + self.window_seconds - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._condition.wait(remaining)
+                batch = self._pending[:self.max_batch_size]
+                self._pending = self._pending[self.max_batch_size:]
+                # Leftover items open the next window straight away
+                self._opened_at = time.monotonic()
+            self._executor.submit(self._run, batch)
+
+    def _run(self, batch: List[Tuple[Any, Future]]) -> None:
+        """Run one batch and hand each caller its own result."""
+        items = [item for item, _ in batch]
+        logger.info("Running %s batch of %s", self.name, len(items))
+        try:
+            results = self.batch_fn(items)
+            if len(results) != len(items):
+                raise ValueError(f"{self.name} batch returned {len(results)} results for {len(items)} items")
+        except Exception as e:
+            for _, future in batch:
+                future.set_exception(e)
+            return
+        for (_, future), result in zip(batch, results):
+            future.set_result(result)
@@ -0,0 +1,111 @@
+import time
+import logging
+import contextvars
+from contextlib import contextmanager
+from typing import Iterator, List, Optional
+
+from recipe_app.models.recipe_models import RecipeState
+from recipe_app.config.config import DEFAULT_CYCLE_SECONDS, DEFAULT_CYCLE_TOKENS
+from recipe_app.config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+# Tokens charged by calls made on other threads for the innermost track_tokens block
+_charged_tokens: contextvars.ContextVar[Optional[List[int]]] = contextvars.ContextVar("charged_tokens", default=None)
+
+class TurnBudget:
+    """Tracks loop iterations, turn latency and token usage for a search.
+
+    A "search" is a new request and the feedback rounds that follow it; a
+    "turn" is one graph run (a new search or one round of feedback); a
+    "cycle" is one translate -> retrieve -> extract pass. Iterations and
+    tokens are counted per search, as a session keeps one thread across
+    searches. Costs of the last cycle are used to estimate whether another
+    one still fits the budget.
+    """
+
+    @staticmethod
+    def begin_search(state: RecipeState) -> None:
+        """Reset the loop and token counters for a new search, and start its turn."""
+        state['loop_iterations'] = 0
+        state['tokens_used'] = 0
+        TurnBudget.begin_turn(state)
+
+    @staticmethod
+    def begin_turn(state: RecipeState) -> None:
+        """Start the wall-clock deadline for a new turn."""
+        state['turn_started_at'] = time.time()
+        state['budget_exhausted'] = None
+
+    @staticmethod
+    def begin_cycle(state: RecipeState) -> None:
+        """Mark the start of a search cycle."""
+        state['cycle_started_at'] = time.time()
+        state['cycle_start_tokens'] = state.get('tokens_used', 0)
+
+    @staticmethod
+    def end_cycle(state: RecipeState) -> None:
+        """Record how long and how many tokens the last search cycle took."""
+        started_at = state.get('cycle_started_at')
+        if started_at:
+            state['cycle_seconds'] = time.time() - started_at
+            state['cycle_tokens'] = state.get('tokens_used', 0) - state.get('cycle_start_tokens', 0)
+
+    @staticmethod
+    @contextmanager
+    def track_tokens(state: RecipeState) -> Iterator[None]:
+        """Charge the tokens of every chat model call made inside the block."""
+        # Imported here; langchain_core.callbacks pulls in the tracing stack
+        from langchain_core.callbacks import get_usage_metadata_callback
+        charged = [0]
+        token = _charged_tokens.set(charged)
+        with get_usage_metadata_callback() as callback:
+            try:
+                yield
+            finally:
+                _charged_tokens.reset(token)
+                used = sum(
+                    usage.get("total_tokens", 0)
+                    for usage in callback.usage_metadata.values()
+                )
+                state['tokens_used'] = state.get('tokens_used', 0) + used + charged[0]
+
+    @staticmethod
+    def charge_tokens(tokens: int) -> None:
+        """Charge tokens spent on this caller's behalf by a call on another thread.
+
+        Used for shared calls (e.g. batched extraction) whose usage callbacks do
+        not run in the caller's context. Outside track_tokens this does nothing.
+        """
+        charged = _charged_tokens.get()
+        if charged is not None:
+            charged[0] += tokens
+
+    @staticmethod
+    def exhausted(state: RecipeState) -> Optional[str]:
+        """Return why another search cycle would not fit the budget, or None if it would."""
+        current = settings()
+        if state.get('loop_iterations', 0) >= current.max_feedback_loops:
+            return "iterations"
+
+        cycle_tokens = state.get('cycle_tokens') or DEFAULT_CYCLE_TOKENS
+        if state.get('tokens_used', 0) + cycle_tokens > current.conversation_token_budget:
+            return "tokens"
+
+        started_at = state.get('turn_started_at')
+        if started_at:
+            cycle_seconds = state.get('cycle_seconds') or DEFAULT_CYCLE_SECONDS
+            if time.time() - started_at + cycle_seconds > current.turn_deadline_seconds:
+                return "deadline"
+        return None
+
+    @staticmethod
+    def allow_cycle(state: RecipeState) -> bool:
+        """Check the budget before starting another cycle, counting it if allowed."""
+        reason = TurnBudget.exhausted(state)
+        if reason:
+            state['budget_exhausted'] = reason
+            logger.warning("Budget exhausted (%s) - returning best results so far", reason)
+            return False
+        state['loop_iterations'] = state.get('loop_iterations', 0) + 1
+        return True
@@ -0,0 +1,570 @@
+import os
+import json
+import time
+import random
+import socket
+import hashlib
+import logging
+import sqlite3
+import threading
+import contextvars
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator, Optional, Tuple
+from urllib.parse import urlparse
+
+from recipe_app.models.recipe_models import RecipeFeature
+from recipe_app.config.config import (
+    CACHE_BACKEND,
+    CACHE_URL,
+    LLM_CACHE_ENABLED,
+    LLM_CACHE_PATH,
+    load_environment
+)
+from recipe_app.config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+# Tries of an optimistic RedisCache.update before giving up under contention
+REDIS_UPDATE_ATTEMPTS = 20
+
+# Models that can round-trip through the cache, tagged by class name
+SERIALIZABLE_MODELS = {"RecipeFeature": RecipeFeature}
+
+
+def _encode(value: Any) -> Any:
+    """Convert a value into JSON-compatible data, tagging known models."""
+    if hasattr(value, "model_dump") and type(value).__name__ in SERIALIZABLE_MODELS:
+        return {"__model__": type(value).__name__, "data": value.model_dump()}
+    if isinstance(value, dict):
+        return {key: _encode(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_encode(item) for item in value]
+    return value
+
+
+def _decode(value: Any) -> Any:
+    """Rebuild values produced by _encode."""
+    if isinstance(value, dict):
+        if "__model__" in value and set(value) == {"__model__", "data"}:
+            return SERIALIZABLE_MODELS[value["__model__"]](**value["data"])
+        return {key: _decode(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_decode(item) for item in value]
+    return value
+
+
+def dumps(value: Any) -> bytes:
+    """Serialize a cache value; every backend stores the same bytes."""
+    return json.dumps(_encode(value), separators=(",", ":")).encode("utf-8")
+
+
+def loads(data: bytes) -> Any:
+    """Deserialize a cache value written by dumps."""
+    return _decode(json.loads(data.decode("utf-8")))
+
+
+def make_key(namespace: str, *args: Any) -> str:
+    """Build a stable cache key from a namespace and JSON-serializable arguments."""
+    payload = json.dumps(_encode(list(args)), sort_keys=True, separators=(",", ":"))
+    return f"{namespace}:{hashlib.sha256(payload.encode('utf-8')).hexdigest()}"
+
+
+class CacheBackend(ABC):
+    """Byte-oriented key/value store with per-entry expiry."""
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[bytes]:
+        """Return the stored bytes, or None if missing or expired."""
+
+    @abstractmethod
+    def set(self, key: str, value: bytes, ttl: Optional[float] = None) -> None:
+        """Store bytes, expiring after ttl seconds if given."""
+
+    @abstractmethod
+    def delete(self, key: str) -> None:
+        """Remove a key if present."""
+
+    @abstractmethod
+    def update(self, key: str, fn: Callable[[Optional[bytes]], Optional[bytes]],
+               ttl: Optional[float] = None) -> Optional[bytes]:
+        """Atomically replace a value with ``fn(current)`` and return the stored value.
+
+        When fn returns None the entry is left as it is. Concurrent updates,
+        also from other processes sharing the backend, are never lost.
+        """
+
+
+class InMemoryCache(CacheBackend):
+    """Per-process LRU cache."""
+
+    def __init__(self, max_entries: Optional[int] = None):
+        # None follows the cache_max_entries setting
+        self._max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[bytes, Optional[float]]]" = OrderedDict()
+        # Reentrant so update can read and write under one hold
+        self._lock = threading.RLock()
+
+    @property
+    def max_entries(self) -> int:
+        return self._max_entries or settings().cache_max_entries
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at is not None and expires_at <= time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: bytes, ttl: Optional[float] = None) -> None:
+        expires_at = time.time() + ttl if ttl else None
+        max_entries = self.max_entries
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def update(self, key: str, fn: Callable[[Optional[bytes]], Optional[bytes]],
+               ttl: Optional[float] = None) -> Optional[bytes]:
+        with self._lock:
+            current = self.get(key)
+            value = fn(current)
+            if value is None:
+                return current
+            self.set(key, value, ttl)
+            return value
+
+
+class SQLiteCache(CacheBackend):
+    """Cache in a SQLite file, shareable by processes on the same host.
+
+    WAL mode relies on shared memory, so the file must be on a local disk,
+    not a network filesystem; use RedisCache across hosts.
+    """
+
+    def __init__(self, path: str, max_entries: Optional[int] = None):
+        self.path = path
+        self.max_entries = max_entries
+        self._local = threading.local()
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        with self._connection() as connection:
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS cache ("
+                "key TEXT PRIMARY KEY, value BLOB NOT NULL, expires_at REAL, accessed_at REAL NOT NULL)"
+            )
+            connection.execute("CREATE INDEX IF NOT EXISTS cache_accessed_at ON cache (accessed_at)")
+
+    def _connection(self) -> sqlite3.Connection:
+        """Return this thread's connection, opening it on first use."""
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            # WAL lets readers in other processes proceed while one process writes
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        return connection
+
+    def get(self, key: str) -> Optional[bytes]:
+        now = time.time()
+        connection = self._connection()
+        row = connection.execute("SELECT value, expires_at FROM cache WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        value, expires_at = row
+        if expires_at is not None and expires_at <= now:
+            connection.execute("DELETE FROM cache WHERE key = ? AND expires_at <= ?", (key, now))
+            return None
+        if self.max_entries:
+            connection.execute("UPDATE cache SET accessed_at = ? WHERE key = ?", (now, key))
+        return bytes(value)
+
+    def set(self, key: str, value: bytes, ttl: Optional[float] = None) -> None:
+        now = time.time()
+        expires_at = now + ttl if ttl else None
+        connection = self._connection()
+        connection.execute(
+            "INSERT OR REPLACE INTO cache (key, value, expires_at, accessed_at) VALUES (?, ?, ?, ?)",
+            (key, sqlite3.Binary(value), expires_at, now)
+        )
+        if self.max_entries:
+            self._evict(connection, now)
+
+    def _evict(self, connection: sqlite3.Connection, now: float) -> None:
+        """Drop expired entries, then the least recently used ones over max_entries."""
+        connection.execute("DELETE FROM cache WHERE expires_at IS NOT NULL AND expires_at <= ?", (now,))
+        connection.execute(
+            "DELETE FROM cache WHERE key IN ("
+            "SELECT key FROM cache ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+            (self.max_entries,)
+        )
+
+    def delete(self, key: str) -> None:
+        self._connection().execute("DELETE FROM cache WHERE key = ?", (key,))
+
+    def update(self, key: str, fn: Callable[[Optional[bytes]], Optional[bytes]],
+               ttl: Optional[float] = None) -> Optional[bytes]:
+        connection = self._connection()
+        # Takes the write lock up front, so other processes wait instead of overwriting
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            current = self.get(key)
+            value = fn(current)
+            if value is not None:
+                self.set(key, value, ttl)
+            connection.execute("COMMIT")
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        return current if value is None else value
+
+
+class RedisCache(CacheBackend):
+    """Cache on a Redis-protocol server (Redis, Valkey, KeyDB, ...), using RESP over a socket."""
+
+    def __init__(self, url: str = "redis://localhost:6379/0", timeout: float = 2.0):
+        parsed = urlparse(url)
+        self.host = parsed.hostname or "localhost"
+        self.port = parsed.port or 6379
+        self.db = int(parsed.path.lstrip("/") or 0)
+        self.password = parsed.password
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def _connect(self):
+        sock = socket.create_connection((self.host, self.port), timeout=self.timeout)
+        stream = sock.makefile("rwb")
+        self._local.sock, self._local.stream = sock, stream
+        if self.password:
+            self._command("AUTH", self.password)
+        if self.db:
+            self._command("SELECT", str(self.db))
+        return stream
+
+    def _close(self) -> None:
+        """Close this thread's connection so the next command opens a new one."""
+        for name in ("stream", "sock"):
+            resource = getattr(self._local, name, None)
+            setattr(self._local, name, None)
+            if resource is not None:
+                try:
+                    resource.close()
+                except OSError:
+                    pass
+
+    def _read_reply(self, stream):
+        line = stream.readline()
+        if not line:
+            raise ConnectionError("Connection closed by cache server")
+        prefix, body = line[:1], line[1:-2]
+        if prefix == b"+":
+            return body.decode()
+        if prefix == b"-":
+            raise RuntimeError(f"Cache server error: {body.decode()}")
+        if prefix == b":":
+            return int(body)
+        if prefix == b"$":
+            length = int(body)
+            if length == -1:
+                return None
+            data = stream.read(length + 2)
+            return data[:-2]
+        if prefix == b"*":
+            count = int(body)
+            return None if count == -1 else [self._read_reply(stream) for _ in range(count)]
+        raise RuntimeError(f"Unexpected reply from cache server: {line!r}")
+
+    def _command(self, *parts, retry: bool = True):
+        """Send one command and return its reply, reconnecting once on a dropped connection.
+
+        Without ``retry`` a dropped connection raises instead, for commands
+        that only make sense on the connection that sent the ones before.
+        """
+        for attempt in range(2 if retry else 1):
+            stream = getattr(self._local, "stream", None) or self._connect()
+            payload = [f"*{len(parts)}\r\n".encode()]
+            for part in parts:
+                data = part if isinstance(part, bytes) else str(part).encode()
+                payload.append(f"${len(data)}\r\n".encode() + data + b"\r\n")
+            try:
+                stream.write(b"".join(payload))
+                stream.flush()
+                return self._read_reply(stream)
+            except (ConnectionError, OSError):
+                self._close()
+                if attempt or not retry:
+                    raise
+
+    def get(self, key: str) -> Optional[bytes]:
+        return self._command("GET", key)
+
+    def set(self, key: str, value: bytes, ttl: Optional[float] = None) -> None:
+        if ttl:
+            self._command("SET", key, value, "PX", str(int(ttl * 1000)))
+        else:
+            self._command("SET", key, value)
+
+    def delete(self, key: str) -> None:
+        self._command("DEL", key)
+
+    def update(self, key: str, fn: Callable[[Optional[bytes]], Optional[bytes]],
+               ttl: Optional[float] = None) -> Optional[bytes]:
+        """Optimistic update: WATCH the key and retry when another client wrote it first.
+
+        WATCH and MULTI only hold on the connection that sent them, so a
+        dropped connection restarts the whole attempt from WATCH on a new
+        one. A connection lost after EXEC was sent may have committed;
+        the retry then applies ``fn`` to the committed value.
+        """
+        for attempt in range(REDIS_UPDATE_ATTEMPTS):
+            if attempt:
+                # Back off a little so contending writers do not keep colliding
+                time.sleep(random.uniform(0, 0.002 * attempt))
+            try:
+                self._command("WATCH", key, retry=False)
+                try:
+                    current = self._command("GET", key, retry=False)
+                    value = fn(current)
+                except (ConnectionError, OSError):
+                    raise
+                except BaseException:
+                    self._command("UNWATCH", retry=False)
+                    raise
+                if value is None:
+                    self._command("UNWATCH", retry=False)
+                    return current
+                self._command("MULTI", retry=False)
+                if ttl:
+                    self._command("SET", key, value, "PX", str(int(ttl * 1000)), retry=False)
+                else:
+                    self._command("SET", key, value, retry=False)
+                # EXEC returns nil when the watched key changed since WATCH
+                if self._command("EXEC", retry=False) is not None:
+                    return value
+            except (ConnectionError, OSError) as e:
+                if attempt == REDIS_UPDATE_ATTEMPTS - 1:
+                    raise
+                logger.warning("Connection lost while updating %s, retrying: %s", key, e)
+        raise RuntimeError(f"Update of {key} kept conflicting with other writers")
+
+
+_backend: Optional[CacheBackend] = None
+_backend_lock = threading.Lock()
+
+
+def create_cache_backend(kind: str, url: Optional[str] = None) -> CacheBackend:
+    """Create a backend by name: "memory", "sqlite" (url is a file path) or "redis"."""
+    if kind == "memory":
+        return InMemoryCache()
+    if kind == "sqlite":
+        return SQLiteCache(url or os.path.join(".cache", "recipe_cache.sqlite3"), max_entries=settings().cache_max_entries)
+    if kind == "redis":
+        return RedisCache(url or "redis://localhost:6379/0")
+    raise ValueError(f"Unknown cache backend: {kind}")
+
+
+def get_cache_backend() -> CacheBackend:
+    """Return the process-wide cache backend, configured from RECIPE_CACHE_BACKEND/RECIPE_CACHE_URL."""
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                load_environment()
+                kind = os.getenv("RECIPE_CACHE_BACKEND", CACHE_BACKEND)
+                url = os.getenv("RECIPE_CACHE_URL", CACHE_URL)
+                _backend = create_cache_backend(kind, url)
+                logger.info("Using %s cache backend", kind)
+    return _backend
+
+
+def set_cache_backend(backend: Optional[CacheBackend]) -> Optional[CacheBackend]:
+    """Replace the process-wide cache backend and return the previous one.
+
+    None re-opens the configured backend on next use.
+    """
+    global _backend
+    previous, _backend = _backend, backend
+    return previous
+
+
+@contextmanager
+def using_cache_backend(backend: CacheBackend) -> Iterator[CacheBackend]:
+    """Use a cache backend inside the block, e.g. in tests, then put the previous one back."""
+    previous = set_cache_backend(backend)
+    try:
+        yield backend
+    finally:
+        set_cache_backend(previous)
+
+
+class CachedError(RuntimeError):
+    """A provider error remembered for cache_error_ttl_seconds instead of retried."""
+
+
+# Keys being refreshed by this process, so each stale entry gets one refresh
+_refreshing: set = set()
+_refreshing_lock = threading.Lock()
+_refresh_executor: Optional[ThreadPoolExecutor] = None
+
+
+def _store(backend: CacheBackend, namespace: str, key: str, entry: dict, ttl: Optional[float]) -> None:
+    """Write a cache entry, logging instead of raising on backend failures."""
+    try:
+        backend.set(key, dumps(entry), ttl)
+    except Exception as e:
+        logger.warning("Cache write failed for %s: %s", namespace, e)
+
+
+def _put(backend: CacheBackend, namespace: str, key: str, value: Any,
+         ttl: Optional[float], stale_ttl: float) -> None:
+    """Store a result with its freshness time; empty results are only kept briefly."""
+    if not ttl:
+        _store(backend, namespace, key, {"__value__": value, "fresh_until": None}, None)
+    elif not value:
+        # Empty results may just be a provider hiccup, so they are neither kept long nor served stale
+        negative_ttl = settings().cache_negative_ttl_seconds
+        _store(backend, namespace, key, {"__value__": value, "fresh_until": time.time() + negative_ttl}, negative_ttl)
+    else:
+        _store(backend, namespace, key, {"__value__": value, "fresh_until": time.time() + ttl}, ttl + stale_ttl)
+
+
+def _refresh(backend: CacheBackend, namespace: str, key: str, fn: Callable, args: tuple,
+             ttl: float, stale_ttl: float, stale: Any) -> None:
+    """Recompute a stale entry; on failure keep serving it and retry after cache_error_ttl_seconds."""
+    try:
+        value = fn(*args)
+        if not value and stale:
+            raise ValueError("refresh returned no results")
+        _put(backend, namespace, key, value, ttl, stale_ttl)
+    except Exception as e:
+        logger.warning("Background refresh failed for %s, serving stale entry: %s", namespace, e)
+        error_ttl = settings().cache_error_ttl_seconds
+        _store(backend, namespace, key, {"__value__": stale, "fresh_until": time.time() + error_ttl},
+               error_ttl + stale_ttl)
+    finally:
+        with _refreshing_lock:
+            _refreshing.discard(key)
+
+
+def _schedule_refresh(*refresh_args: Any) -> None:
+    """Start a background refresh of a stale entry unless one is already running."""
+    global _refresh_executor
+    key = refresh_args[2]
+    with _refreshing_lock:
+        if key in _refreshing:
+            return
+        _refreshing.add(key)
+        if _refresh_executor is None:
+            _refresh_executor = ThreadPoolExecutor(max_workers=settings().cache_refresh_workers, thread_name_prefix="cache-refresh")
+    _refresh_executor.submit(_refresh, *refresh_args)
+
+
+def cached_call(namespace: str, fn: Callable, *args: Any, ttl: Optional[float] = None,
+                stale_ttl: Optional[float] = None) -> Any:
+    """Return fn(*args) from the shared cache, computing and storing it on a miss.
+
+    Entries are fresh for ``ttl`` seconds and may then be served stale for
+    ``stale_ttl`` more while one background call refreshes them. Empty
+    results are kept for cache_negative_ttl_seconds and provider errors for
+    cache_error_ttl_seconds (raised again as CachedError). Backend failures
+    are logged and treated as misses so a cache outage never breaks a request.
+    """
+    if stale_ttl is None:
+        stale_ttl = settings().cache_stale_seconds
+    backend = get_cache_backend()
+    key = make_key(namespace, *args)
+    try:
+        data = backend.get(key)
+    except Exception as e:
+        logger.warning("Cache read failed for %s: %s", namespace, e)
+        data = None
+
+    if data is not None:
+        entry = loads(data)
+        if isinstance(entry, dict) and "__error__" in entry:
+            raise CachedError(entry["__error__"])
+        fresh_until = entry.get("fresh_until")
+        if fresh_until is not None and fresh_until <= time.time():
+            _schedule_refresh(backend, namespace, key, fn, args, ttl, stale_ttl, entry["__value__"])
+        return entry["__value__"]
+
+    try:
+        value = fn(*args)
+    except Exception as e:
+        _store(backend, namespace, key, {"__error__": f"{type(e).__name__}: {e}"}, settings().cache_error_ttl_seconds)
+        raise
+    _put(backend, namespace, key, value, ttl, stale_ttl)
+    return value
+
+
+_response_cache: Optional[CacheBackend] = None
+_response_cache_lock = threading.Lock()
+_bypass_responses = contextvars.ContextVar("bypass_llm_response_cache", default=False)
+
+# Values of RECIPE_LLM_CACHE that turn the response cache off
+DISABLED_VALUES = {"0", "off", "false", "no"}
+
+
+def response_cache_enabled() -> bool:
+    """Check the config switch, the RECIPE_LLM_CACHE variable and any active bypass."""
+    if _bypass_responses.get() or not LLM_CACHE_ENABLED:
+        return False
+    load_environment()
+    return os.getenv("RECIPE_LLM_CACHE", "on").strip().lower() not in DISABLED_VALUES
+
+
+@contextmanager
+def bypass_response_cache() -> Iterator[None]:
+    """Send every LLM call made inside the block to the provider, e.g. for benchmarks."""
+    token = _bypass_responses.set(True)
+    try:
+        yield
+    finally:
+        _bypass_responses.reset(token)
+
+
+def get_response_cache() -> Optional[CacheBackend]:
+    """Return the LLM response cache, or None when it is switched off."""
+    global _response_cache
+    if not response_cache_enabled():
+        return None
+    if _response_cache is None:
+        with _response_cache_lock:
+            if _response_cache is None:
+                path = os.getenv("RECIPE_LLM_CACHE_PATH", LLM_CACHE_PATH)
+                _response_cache = SQLiteCache(path, max_entries=settings().llm_cache_max_entries)
+                logger.info("Caching LLM responses in %s", path)
+    return _response_cache
+
+
+def set_response_cache(backend: Optional[CacheBackend]) -> Optional[CacheBackend]:
+    """Replace the LLM response cache backend and return the previous one.
+
+    None re-opens the configured file on next use.
+    """
+    global _response_cache
+    previous, _response_cache = _response_cache, backend
+    return previous
+
+
+@contextmanager
+def using_response_cache(backend: CacheBackend) -> Iterator[CacheBackend]:
+    """Use an LLM response cache inside the block, then put the previous one back."""
+    previous = set_response_cache(backend)
+    try:
+        yield backend
+    finally:
+        set_response_cache(previous)
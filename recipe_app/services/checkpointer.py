@@ -0,0 +1,162 @@
+import json
+import base64
+import random
+import logging
+from typing import Any, Dict, Iterator, Optional, Sequence, Tuple
+
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import (
+    WRITES_IDX_MAP,
+    BaseCheckpointSaver,
+    ChannelVersions,
+    Checkpoint,
+    CheckpointMetadata,
+    CheckpointTuple,
+    get_checkpoint_id,
+    get_checkpoint_metadata
+)
+
+from recipe_app.config.settings import settings
+from recipe_app.services.cache import CacheBackend, get_cache_backend, make_key
+
+logger = logging.getLogger(__name__)
+
+
+def _pack(typed: Tuple[str, bytes]) -> list:
+    return [typed[0], base64.b64encode(typed[1]).decode("ascii")]
+
+
+def _unpack(packed: list) -> Tuple[str, bytes]:
+    return packed[0], base64.b64decode(packed[1])
+
+
+class CacheCheckpointSaver(BaseCheckpointSaver):
+    """LangGraph checkpointer that keeps each thread's latest checkpoint in a cache backend.
+
+    With a shared backend (sqlite or redis) any process can resume any
+    thread, so API servers need no sticky sessions. Only the latest
+    checkpoint and its pending writes are kept, which is all a paused run
+    needs; threads expire after checkpoint_ttl_seconds without activity.
+    """
+
+    def __init__(self, backend: Optional[CacheBackend] = None, ttl: Optional[float] = None):
+        super().__init__()
+        self._backend = backend
+        # None follows the checkpoint_ttl_seconds setting
+        self._ttl = ttl
+
+    @property
+    def backend(self) -> CacheBackend:
+        return self._backend if self._backend is not None else get_cache_backend()
+
+    @property
+    def ttl(self) -> float:
+        return self._ttl if self._ttl is not None else settings().checkpoint_ttl_seconds
+
+    @staticmethod
+    def _key(thread_id: str, checkpoint_ns: str) -> str:
+        return make_key("checkpoint", thread_id, checkpoint_ns)
+
+    def _load(self, thread_id: str, checkpoint_ns: str) -> Optional[Dict[str, Any]]:
+        data = self.backend.get(self._key(thread_id, checkpoint_ns))
+        return json.loads(data.decode("utf-8")) if data is not None else None
+
+    def _save(self, thread_id: str, checkpoint_ns: str, record: Dict[str, Any]) -> None:
+        self.backend.set(self._key(thread_id, checkpoint_ns), json.dumps(record).encode("utf-8"), self.ttl)
+
+    def get_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        record = self._load(thread_id, checkpoint_ns)
+        checkpoint_id = get_checkpoint_id(config)
+        if record is None or (checkpoint_id and checkpoint_id != record["id"]):
+            return None
+
+        checkpoint = self.serde.loads_typed(_unpack(record["checkpoint"]))
+        channel_values = {}
+        for channel, version in checkpoint["channel_versions"].items():
+            stored = record["channels"].get(channel)
+            if stored and stored[0] == version:
+                channel_values[channel] = self.serde.loads_typed(_unpack(stored[1]))
+        parent_id = record.get("parent")
+        return CheckpointTuple(
+            config={"configurable": {"thread_id": thread_id, "checkpoint_ns": checkpoint_ns, "checkpoint_id": record["id"]}},
+            checkpoint={**checkpoint, "channel_values": channel_values},
+            metadata=self.serde.loads_typed(_unpack(record["metadata"])),
+            pending_writes=[
+                (task_id, channel, self.serde.loads_typed(_unpack(value)))
+                for task_id, channel, value, _, _ in record["writes"]
+            ],
+            parent_config=(
+                {"configurable": {"thread_id": thread_id, "checkpoint_ns": checkpoint_ns, "checkpoint_id": parent_id}}
+                if parent_id else None
+            )
+        )
+
+    def list(self, config: Optional[RunnableConfig], *, filter: Optional[Dict[str, Any]] = None,
+             before: Optional[RunnableConfig] = None, limit: Optional[int] = None) -> Iterator[CheckpointTuple]:
+        """Yield the thread's latest checkpoint (earlier ones are not kept)."""
+        if config is None or limit == 0:
+            return
+        saved = self.get_tuple(config)
+        if saved is None or (before and get_checkpoint_id(before) and saved.config["configurable"]["checkpoint_id"] >= get_checkpoint_id(before)):
+            return
+        if filter and any(saved.metadata.get(key) != value for key, value in filter.items()):
+            return
+        yield saved
+
+    def put(self, config: RunnableConfig, checkpoint: Checkpoint, metadata: CheckpointMetadata,
+            new_versions: ChannelVersions) -> RunnableConfig:
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        previous = self._load(thread_id, checkpoint_ns)
+        channels = dict(previous["channels"]) if previous else {}
+
+        stored = checkpoint.copy()
+        values = stored.pop("channel_values")
+        for channel, version in new_versions.items():
+            if channel in values:
+                channels[channel] = [version, _pack(self.serde.dumps_typed(values[channel]))]
+            else:
+                channels.pop(channel, None)
+        # Channels that are no longer part of the checkpoint are dropped with the old checkpoint
+        channels = {channel: value for channel, value in channels.items() if channel in checkpoint["channel_versions"]}
+
+        self._save(thread_id, checkpoint_ns, {
+            "id": checkpoint["id"],
+            "parent": config["configurable"].get("checkpoint_id"),
+            "checkpoint": _pack(self.serde.dumps_typed(stored)),
+            "metadata": _pack(self.serde.dumps_typed(get_checkpoint_metadata(config, metadata))),
+            "channels": channels,
+            "writes": [],
+        })
+        return {"configurable": {"thread_id": thread_id, "checkpoint_ns": checkpoint_ns, "checkpoint_id": checkpoint["id"]}}
+
+    def put_writes(self, config: RunnableConfig, writes: Sequence[Tuple[str, Any]], task_id: str,
+                   task_path: str = "") -> None:
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        record = self._load(thread_id, checkpoint_ns)
+        if record is None or record["id"] != config["configurable"]["checkpoint_id"]:
+            logger.warning("Dropping writes for a superseded checkpoint of thread %s", thread_id)
+            return
+        existing = {(write[0], write[3]) for write in record["writes"]}
+        for idx, (channel, value) in enumerate(writes):
+            write_idx = WRITES_IDX_MAP.get(channel, idx)
+            if write_idx >= 0 and (task_id, write_idx) in existing:
+                continue
+            record["writes"].append([task_id, channel, _pack(self.serde.dumps_typed(value)), write_idx, task_path])
+        self._save(thread_id, checkpoint_ns, record)
+
+    def delete_thread(self, thread_id: str) -> None:
+        self.backend.delete(self._key(thread_id, ""))
+
+    def get_next_version(self, current: Optional[str], channel: None) -> str:
+        # Same scheme as LangGraph's in-memory saver: a counter plus a random tiebreak
+        if current is None:
+            current_v = 0
+        elif isinstance(current, int):
+            current_v = current
+        else:
+            current_v = int(current.split(".")[0])
+        return f"{current_v + 1:032}.{random.random():016}"
@@ -0,0 +1,222 @@
+import re
+from typing import Dict, List, Optional
+
+from recipe_app.models.recipe_models import RecipeConstraints
+from recipe_app.services.feature_heuristics import INGREDIENT_LEXICON
+from recipe_app.services.recipe_store import recipe_store
+
+# Ingredient groups used to expand dietary labels and "no <group>" feedback
+MEAT = [
+    "meat", "beef", "steak", "pork", "bacon", "ham", "sausage", "chorizo", "pancetta",
+    "prosciutto", "salami", "pepperoni", "lamb", "veal", "chicken", "turkey", "duck",
+    "goose", "venison", "mince", "gelatin", "lard",
+]
+SEAFOOD = [
+    "fish", "salmon", "tuna", "cod", "haddock", "trout", "anchovy", "anchovies", "sardine",
+    "sardines", "shrimp", "prawn", "prawns", "crab", "lobster", "clam", "clams", "mussel",
+    "mussels", "oyster", "oysters", "scallop", "scallops", "squid", "octopus", "seafood",
+]
+DAIRY = [
+    "milk", "cheese", "butter", "cream", "yogurt", "yoghurt", "ghee", "parmesan", "mozzarella",
+    "cheddar", "feta", "ricotta", "mascarpone", "buttermilk", "dairy", "paneer",
+]
+EGGS = ["egg", "eggs", "mayonnaise", "mayo"]
+GLUTEN = [
+    "flour", "wheat", "bread", "pasta", "spaghetti", "noodles", "couscous", "barley", "rye",
+    "breadcrumbs", "tortilla", "gluten", "semolina", "seitan",
+]
+NUTS = [
+    "nut", "nuts", "almond", "almonds", "walnut", "walnuts", "pecan", "pecans", "cashew",
+    "cashews", "hazelnut", "hazelnuts", "pistachio", "pistachios", "peanut", "peanuts",
+]
+
+INGREDIENT_GROUPS: Dict[str, List[str]] = {
+    "meat": MEAT,
+    "seafood": SEAFOOD,
+    "fish": SEAFOOD,
+    "shellfish": SEAFOOD,
+    "dairy": DAIRY,
+    "lactose": DAIRY,
+    "egg": EGGS,
+    "eggs": EGGS,
+    "gluten": GLUTEN,
+    "wheat": GLUTEN,
+    "nut": NUTS,
+    "nuts": NUTS,
+}
+
+DIET_EXCLUSIONS: Dict[str, List[str]] = {
+    "vegetarian": MEAT + SEAFOOD,
+    "vegan": MEAT + SEAFOOD + DAIRY + EGGS + ["honey"],
+    "pescatarian": MEAT,
+    "dairy-free": DAIRY,
+    "gluten-free": GLUTEN,
+    "nut-free": NUTS,
+}
+
+DIET_PATTERNS = {
+    "vegetarian": r"\bveggie\b|\bvegetarian\b|\bmeat[- ]?less\b|\bmeat[- ]free\b",
+    "vegan": r"\bvegan\b|\bplant[- ]based\b",
+    "pescatarian": r"\bpescatarian\b|\bpescetarian\b",
+    "dairy-free": r"\bdairy[- ]free\b|\blactose[- ]free\b",
+    "gluten-free": r"\bgluten[- ]free\b|\bceliac\b|\bcoeliac\b",
+    "nut-free": r"\bnut[- ]free\b",
+}
+
+# Terms that can become hard constraints; anything else after "no" or "with" is ordinary
+# speech ("no thanks", "with a twist") rather than an ingredient
+INGREDIENTS = set(INGREDIENT_LEXICON) | set(INGREDIENT_GROUPS) | {
+    term for group in INGREDIENT_GROUPS.values() for term in group
+} | {
+    "onion", "mushroom", "mushrooms", "olives", "capers", "anchovies", "chili", "chilli",
+    "chilies", "peppers", "pineapple", "coconut", "cilantro", "tofu", "soy", "sesame",
+    "beans", "lentils", "chickpeas", "corn", "peas", "potato", "eggplant", "aubergine",
+    "courgette", "zucchini", "spinach", "kale", "garlic", "ginger", "lemon", "lime",
+}
+
+# Phrases introducing something the user does not want, e.g. "no dairy", "without onions"
+EXCLUDE_PATTERN = re.compile(
+    r"\b(?:no|without|exclude|excluding|avoid|skip|minus|hold the|allergic to|"
+    r"(?:do not|don't|dont|doesn't|does not) (?:want|like|eat|have))\s+"
+)
+# Phrases introducing something the user wants included, e.g. "with chicken", "include spinach"
+REQUIRE_PATTERN = re.compile(r"\b(?:with|include|including|add|using|use|contains?)\s+")
+# Words allowed between a phrase and its ingredients, e.g. "use fresh tomatoes"
+MODIFIERS = {
+    "a", "an", "the", "some", "any", "more", "extra", "less", "fresh", "frozen", "dried",
+    "canned", "ground", "chopped", "whole", "raw", "cooked", "my", "of",
+}
+# Words joining several ingredients, e.g. "no onions, garlic or leeks"
+CONNECTORS = {",", "or", "and", "nor"}
+TOKEN = re.compile(r"[a-z]+(?:-[a-z]+)?|,")
+# Tokens looked at after each phrase
+PHRASE_TOKENS = 8
+
+
+def _ingredient(term: str) -> Optional[str]:
+    """Return the term if it names an ingredient (in either number), else None."""
+    stems = {term, term[:-1] if term.endswith("s") else term + "s", term[:-2] if term.endswith("es") else term + "es"}
+    return term if stems & INGREDIENTS else None
+
+
+def _ingredients_after(text: str) -> List[str]:
+    """Read the ingredients listed at the start of text, stopping at the first other word."""
+    tokens = TOKEN.findall(text)[:PHRASE_TOKENS]
+    found: List[str] = []
+    index = 0
+    while index < len(tokens):
+        token = tokens[index]
+        pair = f"{token} {tokens[index + 1]}" if index + 1 < len(tokens) else None
+        if pair and _ingredient(pair):
+            found.append(pair)
+            index += 2
+            continue
+        if _ingredient(token):
+            found.append(token)
+        elif token in CONNECTORS:
+            if not found:
+                break
+        elif token not in MODIFIERS:
+            break
+        index += 1
+    return found
+
+
+def _expand(term: str) -> List[str]:
+    """Expand an ingredient group name into its member terms."""
+    return INGREDIENT_GROUPS.get(term, [term])
+
+
+def extract_terms(text: Optional[str]) -> Dict[str, List[str]]:
+    """Return the diets, excluded and required terms named in free text, without expanding groups."""
+    terms: Dict[str, List[str]] = {"diets": [], "excluded": [], "required": []}
+    if not text:
+        return terms
+
+    lowered = text.lower()
+    for diet, pattern in DIET_PATTERNS.items():
+        if re.search(pattern, lowered):
+            terms["diets"].append(diet)
+
+    # "<group>-free" without a dedicated diet label, e.g. "egg-free"
+    for group in re.findall(r"\b([a-z]+)[- ]free\b", lowered):
+        if _ingredient(group):
+            terms["excluded"].append(group)
+
+    for match in EXCLUDE_PATTERN.finditer(lowered):
+        terms["excluded"].extend(_ingredients_after(lowered[match.end():]))
+
+    for match in REQUIRE_PATTERN.finditer(lowered):
+        terms["required"].extend(_ingredients_after(lowered[match.end():]))
+
+    return {key: list(dict.fromkeys(values)) for key, values in terms.items()}
+
+
+def parse_constraints(text: Optional[str]) -> RecipeConstraints:
+    """Parse dietary labels, exclusions and inclusions out of free-text feedback."""
+    terms = extract_terms(text)
+    excluded: List[str] = []
+    for diet in terms["diets"]:
+        excluded.extend(DIET_EXCLUSIONS[diet])
+    for term in terms["excluded"]:
+        excluded.extend(_expand(term))
+    excluded = list(dict.fromkeys(excluded))
+
+    return RecipeConstraints(
+        diets=terms["diets"],
+        excluded=excluded,
+        required=[term for term in terms["required"] if term not in excluded]
+    )
+
+
+def _feature_terms(feature) -> str:
+    """Return the searchable text of a feature (dish name and key ingredients)."""
+    if feature is None:
+        return ""
+    ingredients = " ".join(feature.key_ingredients or [])
+    return f"{feature.dish_name} {ingredients}".lower()
+
+
+def _mentions(text: str, term: str) -> bool:
+    """Check whether a term appears as a word, in either number, in text."""
+    stem = term[:-2] if term.endswith(("oes", "ches", "shes")) else term[:-1] if term.endswith("s") else term
+    return re.search(rf"\b{re.escape(stem)}(?:s|es)?\b", text) is not None
+
+
+def satisfies(entry: Dict, constraints: RecipeConstraints) -> bool:
+    """Check whether a pool entry ({"recipe", "feature"}) satisfies the constraints.
+
+    Exclusions are checked against the extracted dish name and key ingredients only,
+    since snippet content often mentions optional swaps ("or use chicken stock").
+    Entries without extracted ingredients never satisfy an exclusion.
+    """
+    feature = entry.get("feature")
+    terms = _feature_terms(feature)
+    if constraints.excluded:
+        if not feature or not feature.key_ingredients:
+            return False
+        if any(_mentions(terms, term) for term in constraints.excluded):
+            return False
+    if constraints.required:
+        content = recipe_store.resolve(entry.get("recipe", {})).get("content", "").lower()
+        haystack = f"{terms} {content}"
+        if not all(_mentions(haystack, term) for term in constraints.required):
+            return False
+    return True
+
+
+def rank(entries: List[Dict], constraints: RecipeConstraints) -> List[Dict]:
+    """Filter entries by the constraints, ranking by how well they match.
+
+    Required ingredients found among the key ingredients rank above those only
+    mentioned in the content; ties keep their original order.
+    """
+    matches = [entry for entry in entries if satisfies(entry, constraints)]
+    if not constraints.required:
+        return matches
+
+    def score(entry: Dict) -> int:
+        terms = _feature_terms(entry.get("feature"))
+        return sum(1 for term in constraints.required if _mentions(terms, term))
+
+    return sorted(matches, key=score, reverse=True)
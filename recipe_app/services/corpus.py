@@ -0,0 +1,452 @@
+import os
+import sys
+import json
+import time
+import uuid
+import fcntl
+import shutil
+import logging
+import string
+import argparse
+import threading
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from recipe_app.config.config import CORPUS_DIR
+from recipe_app.config.settings import settings
+from recipe_app.models.recipe_models import FeatureRecord
+from recipe_app.services.recipe_store import recipe_id
+
+logger = logging.getLogger(__name__)
+
+# Strings stored for every row, in order
+TEXT_FIELDS = ("name", "url", "content", "dish_name", "cooking_style")
+ID_DTYPE = "S16"
+CURRENT_FILE = "CURRENT"
+ID_CHARS = frozenset(string.hexdigits)
+
+
+def _corpus_dir() -> str:
+    return os.getenv("RECIPE_CORPUS_DIR", CORPUS_DIR)
+
+
+def _load(path: str) -> np.ndarray:
+    """Memory-map an array file; empty arrays cannot be mapped and are read."""
+    try:
+        return np.load(path, mmap_mode="r")
+    except ValueError:
+        return np.load(path)
+
+
+def _blob(path: str) -> np.ndarray:
+    return np.memmap(path, dtype=np.uint8, mode="r") if os.path.getsize(path) else np.zeros(0, dtype=np.uint8)
+
+
+def _write_atomic(path: str, data: str) -> None:
+    tmp = f"{path}.{uuid.uuid4().hex}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+class Vocabulary:
+    """Ingredient terms by ID, memory-mapped; IDs never change between generations."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.text = _blob(os.path.join(path, "terms.bin"))
+        self.offsets = _load(os.path.join(path, "offsets.npy"))
+        # Term IDs ordered by term, for lookups without building a dict
+        self.order = _load(os.path.join(path, "order.npy"))
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def term(self, term_id: int) -> str:
+        return self.text[self.offsets[term_id]:self.offsets[term_id + 1]].tobytes().decode("utf-8")
+
+    def id(self, term: str) -> Optional[int]:
+        index = bisect_left(self.order, term, key=lambda term_id: self.term(int(term_id)))
+        if index < len(self.order) and self.term(int(self.order[index])) == term:
+            return int(self.order[index])
+        return None
+
+    def terms(self) -> List[str]:
+        return [self.term(term_id) for term_id in range(len(self))]
+
+    @staticmethod
+    def write(path: str, terms: List[str]) -> None:
+        os.makedirs(path)
+        encoded = [term.encode("utf-8") for term in terms]
+        with open(os.path.join(path, "terms.bin"), "wb") as f:
+            f.write(b"".join(encoded))
+        np.save(os.path.join(path, "offsets.npy"), np.cumsum([0] + [len(term) for term in encoded], dtype=np.int64))
+        np.save(os.path.join(path, "order.npy"), np.array(sorted(range(len(terms)), key=terms.__getitem__), dtype=np.int32))
+
+
+class Segment:
+    """One immutable batch of rows, sorted by recipe ID."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.ids = _load(os.path.join(path, "ids.npy"))
+        self.text = _blob(os.path.join(path, "text.bin"))
+        self.text_offsets = _load(os.path.join(path, "text_offsets.npy"))
+        self.ingredients = _load(os.path.join(path, "ingredients.npy"))
+        self.ingredient_offsets = _load(os.path.join(path, "ingredient_offsets.npy"))
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def find(self, rid: str) -> int:
+        """Row of a recipe ID, or -1 (also for IDs that are not hex, e.g. from a request path)."""
+        if len(rid) > 16 or not ID_CHARS.issuperset(rid):
+            return -1
+        key = np.array(rid.encode("ascii"), dtype=ID_DTYPE)
+        row = int(np.searchsorted(self.ids, key))
+        return row if row < len(self.ids) and self.ids[row] == key else -1
+
+    def field(self, row: int, index: int) -> str:
+        position = row * len(TEXT_FIELDS) + index
+        start, end = self.text_offsets[position], self.text_offsets[position + 1]
+        return self.text[start:end].tobytes().decode("utf-8")
+
+    def ingredient_ids(self, row: int) -> np.ndarray:
+        return self.ingredients[self.ingredient_offsets[row]:self.ingredient_offsets[row + 1]]
+
+    @staticmethod
+    def write(path: str, rows: List[Tuple[str, Dict[str, str], List[int]]]) -> None:
+        """Write rows of (recipe ID, text fields, ingredient IDs), sorted by ID."""
+        os.makedirs(path)
+        rows = sorted(rows, key=lambda row: row[0])
+        texts = [(fields.get(name) or "").encode("utf-8") for _, fields, _ in rows for name in TEXT_FIELDS]
+        with open(os.path.join(path, "text.bin"), "wb") as f:
+            f.write(b"".join(texts))
+        np.save(os.path.join(path, "ids.npy"), np.array([rid.encode("ascii") for rid, _, _ in rows], dtype=ID_DTYPE))
+        np.save(os.path.join(path, "text_offsets.npy"), np.cumsum([0] + [len(text) for text in texts], dtype=np.int64))
+        np.save(os.path.join(path, "ingredients.npy"),
+                np.array([term_id for _, _, term_ids in rows for term_id in term_ids], dtype=np.int32))
+        np.save(os.path.join(path, "ingredient_offsets.npy"),
+                np.cumsum([0] + [len(term_ids) for _, _, term_ids in rows], dtype=np.int64))
+
+
+class CorpusSnapshot:
+    """One published generation of the corpus, memory-mapped and read-only.
+
+    A corpus directory holds immutable segments and numbered generations:
+
+        CURRENT                 name of the published generation manifest
+        gen-000007.json         segments (oldest first) and vocabulary of a generation,
+                                and the segments each merged segment was copied from
+        vocab-000007/           ingredient terms; IDs are kept across generations
+        seg-<hex>/ids.npy       sorted 16-byte recipe IDs
+                  text.bin      UTF-8 strings of every row, back to back
+                  text_offsets.npy
+                                int64 offsets into text.bin, TEXT_FIELDS per row
+                  ingredients.npy
+                                int32 term IDs of every row, back to back
+                  ingredient_offsets.npy
+                                int64 offsets into ingredients.npy, one per row
+
+    Every process on a host maps the same files and so shares their pages,
+    and opening a snapshot costs the same at any corpus size. Rows in newer
+    segments replace older rows with the same ID.
+    """
+
+    def __init__(self, directory: str, manifest_name: str):
+        with open(os.path.join(directory, manifest_name), encoding="utf-8") as f:
+            self.manifest = json.load(f)
+        self.name = manifest_name
+        self.generation = self.manifest["generation"]
+        self.vocabulary = Vocabulary(os.path.join(directory, self.manifest["vocab"]))
+        self.segments = [Segment(os.path.join(directory, name)) for name in self.manifest["segments"]]
+
+    def __len__(self) -> int:
+        return self.manifest["count"]
+
+    def locate(self, rid: str) -> Optional[Tuple[Segment, int]]:
+        """Newest segment and row holding a recipe ID."""
+        for segment in reversed(self.segments):
+            row = segment.find(rid)
+            if row >= 0:
+                return segment, row
+        return None
+
+    def get(self, rid: str) -> Optional[Dict[str, str]]:
+        """Full recipe ({"id", "name", "url", "content"}) for an ID, or None."""
+        found = self.locate(rid)
+        if found is None:
+            return None
+        segment, row = found
+        return {"id": rid, "name": segment.field(row, 0), "url": segment.field(row, 1), "content": segment.field(row, 2)}
+
+    def feature(self, rid: str) -> Optional[FeatureRecord]:
+        """Extracted features of a recipe, or None if it has none."""
+        found = self.locate(rid)
+        if found is None:
+            return None
+        segment, row = found
+        dish_name = segment.field(row, 3)
+        if not dish_name:
+            return None
+        ingredients = tuple(self.vocabulary.term(int(term_id)) for term_id in segment.ingredient_ids(row))
+        return FeatureRecord(dish_name, ingredients, segment.field(row, 4) or None)
+
+    def rows(self) -> Iterator[Tuple[str, Segment, int]]:
+        """Every current row as (recipe ID, segment, row), skipping replaced ones."""
+        seen = set()
+        for segment in reversed(self.segments):
+            for row, raw in enumerate(segment.ids):
+                rid = raw.decode("ascii")
+                if rid not in seen:
+                    seen.add(rid)
+                    yield rid, segment, row
+
+
+class Corpus:
+    """Process-wide reader that swaps in newly published generations.
+
+    ``current()`` re-reads CURRENT at most every corpus_check_seconds. A new
+    snapshot is opened before it replaces the old one, so a reader always
+    sees one whole generation; callers holding the old one keep using it.
+    """
+
+    def __init__(self, directory: Optional[str] = None, check_seconds: Optional[float] = None):
+        self._directory = directory
+        # None follows the corpus_check_seconds setting
+        self._check_seconds = check_seconds
+        self._snapshot: Optional[CorpusSnapshot] = None
+        self._last_check: Optional[float] = None
+        self._lock = threading.Lock()
+
+    @property
+    def directory(self) -> str:
+        return self._directory or _corpus_dir()
+
+    @property
+    def check_seconds(self) -> float:
+        return self._check_seconds if self._check_seconds is not None else settings().corpus_check_seconds
+
+    def current(self) -> Optional[CorpusSnapshot]:
+        """The latest published snapshot, or None if nothing was published."""
+        check_seconds = self.check_seconds
+        if self._last_check is not None and time.monotonic() - self._last_check < check_seconds:
+            return self._snapshot
+        with self._lock:
+            if self._last_check is not None and time.monotonic() - self._last_check < check_seconds:
+                return self._snapshot
+            self._last_check = time.monotonic()
+            try:
+                with open(os.path.join(self.directory, CURRENT_FILE), encoding="utf-8") as f:
+                    name = f.read().strip()
+            except OSError:
+                return self._snapshot
+            if self._snapshot is None or self._snapshot.name != name:
+                try:
+                    self._snapshot = CorpusSnapshot(self.directory, name)
+                    logger.info("Opened recipe corpus generation %s (%s recipes)", self._snapshot.generation, len(self._snapshot))
+                except (OSError, ValueError, KeyError) as e:
+                    logger.warning("Could not open recipe corpus generation %s: %s", name, e)
+            return self._snapshot
+
+
+def _ingredient_terms(feature: Any) -> List[str]:
+    terms = getattr(feature, "key_ingredients", None) or (feature.get("key_ingredients") if isinstance(feature, dict) else None) or []
+    return list(dict.fromkeys(term.strip().lower() for term in terms if term and term.strip()))
+
+
+def _feature_field(feature: Any, name: str) -> Optional[str]:
+    if isinstance(feature, dict):
+        return feature.get(name)
+    return getattr(feature, name, None)
+
+
+class CorpusWriter:
+    """Adds recipes to a corpus and publishes them as a new generation.
+
+    A commit writes one segment holding only the queued rows, then replaces
+    CURRENT atomically; readers pick the generation up on their next check.
+    Writers on one host are serialized with a lock file, so several
+    processes may commit to the same directory.
+    """
+
+    def __init__(self, directory: Optional[str] = None, max_segments: Optional[int] = None,
+                 keep_generations: Optional[int] = None):
+        self.directory = directory or _corpus_dir()
+        # None follows the corpus_max_segments and corpus_keep_generations settings
+        self.max_segments = max_segments if max_segments is not None else settings().corpus_max_segments
+        self.keep_generations = keep_generations if keep_generations is not None else settings().corpus_keep_generations
+        self._pending: Dict[str, Tuple[Dict[str, Any], Any]] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def add(self, recipe: Dict[str, Any], feature: Any = None) -> str:
+        """Queue a full recipe and its features (RecipeFeature, FeatureRecord or dict)."""
+        rid = recipe.get("id") or recipe_id(recipe["url"])
+        with self._lock:
+            self._pending[rid] = ({**recipe, "id": rid}, feature)
+        return rid
+
+    def add_all(self, entries: Iterable[Tuple[Dict[str, Any], Any]]) -> None:
+        for recipe, feature in entries:
+            self.add(recipe, feature)
+
+    @contextmanager
+    def _exclusive(self) -> Iterator[None]:
+        os.makedirs(self.directory, exist_ok=True)
+        with open(os.path.join(self.directory, ".lock"), "w") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def commit(self, compact: bool = False) -> Optional[int]:
+        """Publish the queued recipes as a new generation; returns its number.
+
+        With nothing queued, nothing is published unless ``compact`` asks
+        for the segments to be merged.
+        """
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        if not pending and not compact:
+            return None
+        with self._exclusive():
+            previous = Corpus(self.directory, check_seconds=0).current()
+            terms = previous.vocabulary.terms() if previous else []
+            known_terms = len(terms)
+            term_ids = {term: index for index, term in enumerate(terms)}
+
+            rows = []
+            for rid, (recipe, feature) in pending.items():
+                ids = []
+                for term in _ingredient_terms(feature):
+                    if term not in term_ids:
+                        term_ids[term] = len(terms)
+                        terms.append(term)
+                    ids.append(term_ids[term])
+                fields = {
+                    "name": recipe.get("name"), "url": recipe.get("url"), "content": recipe.get("content"),
+                    "dish_name": _feature_field(feature, "dish_name"), "cooking_style": _feature_field(feature, "cooking_style"),
+                }
+                rows.append((rid, fields, ids))
+
+            generation = (previous.generation if previous else 0) + 1
+            segments = list(previous.manifest["segments"]) if previous else []
+            merged = {name: sources for name, sources in previous.manifest.get("merged", {}).items()
+                      if name in segments} if previous else {}
+            if previous and segments and (compact or len(segments) + bool(rows) > self.max_segments):
+                # Readers that indexed the sources can skip the copy
+                merged = {self._merge(previous, pending): segments}
+                segments = list(merged)
+            if rows:
+                segments.append(self._write_segment(rows))
+            if previous and len(terms) == known_terms:
+                vocab = previous.manifest["vocab"]
+            else:
+                vocab = f"vocab-{generation:06d}"
+                Vocabulary.write(os.path.join(self.directory, vocab), terms)
+
+            manifest = {
+                "generation": generation,
+                "segments": segments,
+                "merged": merged,
+                "vocab": vocab,
+                "count": self._count(segments),
+                "created_at": time.time(),
+            }
+            name = f"gen-{generation:06d}.json"
+            _write_atomic(os.path.join(self.directory, name), json.dumps(manifest))
+            _write_atomic(os.path.join(self.directory, CURRENT_FILE), name)
+            self._prune(generation)
+        logger.info("Published recipe corpus generation %s (%s recipes, %s segments)",
+                    generation, manifest["count"], len(segments))
+        return generation
+
+    def _write_segment(self, rows: List[Tuple[str, Dict[str, str], List[int]]]) -> str:
+        name = f"seg-{uuid.uuid4().hex[:12]}"
+        Segment.write(os.path.join(self.directory, name), rows)
+        return name
+
+    def _merge(self, previous: CorpusSnapshot, replaced: Dict[str, Any]) -> str:
+        """Copy the previous generation's current rows into one segment."""
+        rows = []
+        for rid, segment, row in previous.rows():
+            if rid in replaced:
+                continue
+            fields = {name: segment.field(row, index) for index, name in enumerate(TEXT_FIELDS)}
+            rows.append((rid, fields, [int(term_id) for term_id in segment.ingredient_ids(row)]))
+        return self._write_segment(rows)
+
+    def _count(self, segments: List[str]) -> int:
+        ids = [np.asarray(Segment(os.path.join(self.directory, name)).ids) for name in segments]
+        return int(len(np.unique(np.concatenate(ids)))) if ids else 0
+
+    def _prune(self, generation: int) -> None:
+        """Delete generations older than the kept ones, and files only they used.
+
+        Readers may still map deleted files; the data stays readable until they
+        swap to a newer generation.
+        """
+        kept = {f"gen-{number:06d}.json" for number in range(generation - self.keep_generations + 1, generation + 1)}
+        used = set()
+        for name in kept:
+            try:
+                with open(os.path.join(self.directory, name), encoding="utf-8") as f:
+                    manifest = json.load(f)
+            except OSError:
+                continue
+            used.update(manifest["segments"])
+            used.add(manifest["vocab"])
+        for name in os.listdir(self.directory):
+            if name.startswith("gen-") and name.endswith(".json") and name not in kept:
+                os.remove(os.path.join(self.directory, name))
+            elif name.startswith(("seg-", "vocab-")) and name not in used:
+                shutil.rmtree(os.path.join(self.directory, name), ignore_errors=True)
+
+
+# Process-wide reader shared by every session
+corpus = Corpus()
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Inspect or update the recipe corpus snapshot.")
+    parser.add_argument("command", choices=("stats", "add", "compact"))
+    parser.add_argument("files", nargs="*", help="For add: JSON lines of {\"recipe\": ..., \"feature\": ...}")
+    parser.add_argument("--dir", default=None, help="Corpus directory (default: RECIPE_CORPUS_DIR or CORPUS_DIR)")
+    args = parser.parse_args(argv)
+
+    writer = CorpusWriter(args.dir)
+    if args.command == "add":
+        for path in args.files:
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        entry = json.loads(line)
+                        writer.add(entry["recipe"], entry.get("feature"))
+        print(f"Published {len(writer)} recipes as generation {writer.commit()}")
+    elif args.command == "compact":
+        print(f"Published generation {writer.commit(compact=True)}")
+
+    snapshot = Corpus(writer.directory, check_seconds=0).current()
+    if snapshot is None:
+        print(f"No corpus published in {writer.directory}", file=sys.stderr)
+        return 1
+    print(json.dumps({
+        "generation": snapshot.generation,
+        "recipes": len(snapshot),
+        "segments": [len(segment) for segment in snapshot.segments],
+        "ingredients": len(snapshot.vocabulary),
+    }))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
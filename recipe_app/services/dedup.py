@@ -0,0 +1,102 @@
+import re
+import random
+import hashlib
+import logging
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from recipe_app.config.config import (
+    DEDUP_MIN_SIMILARITY,
+    DEDUP_MIN_WORDS,
+    TRACKING_PARAMS,
+    TRACKING_PARAM_PREFIXES
+)
+
+logger = logging.getLogger(__name__)
+
+SHINGLE_SIZE = 2  # Words per shingle; search snippets are too short for longer ones
+MINHASH_PERMUTATIONS = 64
+_MERSENNE_PRIME = (1 << 61) - 1
+# Fixed seed so fingerprints are comparable across processes
+_rng = random.Random(0)
+_PERMUTATIONS = [
+    (_rng.randrange(1, _MERSENNE_PRIME), _rng.randrange(_MERSENNE_PRIME))
+    for _ in range(MINHASH_PERMUTATIONS)
+]
+
+
+def canonical_url(url: str) -> str:
+    """Normalize a URL so copies of a page under tracking or mobile URLs compare equal."""
+    try:
+        parts = urlsplit(url.strip())
+    except ValueError:
+        return url
+    host = (parts.hostname or "").lower()
+    for prefix in ("www.", "m.", "amp."):
+        if host.startswith(prefix):
+            host = host[len(prefix):]
+    if parts.port and parts.port not in (80, 443):
+        host = f"{host}:{parts.port}"
+    path = re.sub(r"/+", "/", parts.path)
+    path = re.sub(r"/(amp|index\.html?)?/?$", "", path) or "/"
+    query = sorted(
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if key.lower() not in TRACKING_PARAMS and not key.lower().startswith(TRACKING_PARAM_PREFIXES)
+    )
+    return urlunsplit(("https", host, path, urlencode(query), ""))
+
+
+def minhash(text: str) -> Optional[Tuple[int, ...]]:
+    """MinHash signature of a text's word shingles, or None if it is too short to compare."""
+    words = re.findall(r"[a-z0-9]+", (text or "").lower())
+    if len(words) < DEDUP_MIN_WORDS:
+        return None
+    shingles = {
+        int.from_bytes(hashlib.blake2b(" ".join(words[i:i + SHINGLE_SIZE]).encode("utf-8"), digest_size=8).digest(), "big")
+        for i in range(len(words) - SHINGLE_SIZE + 1)
+    }
+    return tuple(min((a * value + b) % _MERSENNE_PRIME for value in shingles) for a, b in _PERMUTATIONS)
+
+
+def similarity(a: Tuple[int, ...], b: Tuple[int, ...]) -> float:
+    """Estimated Jaccard similarity of the shingle sets behind two signatures."""
+    return sum(x == y for x, y in zip(a, b)) / len(a)
+
+
+def deduplicate(recipes: List[Dict], limit: Optional[int] = None) -> List[Dict]:
+    """Drop search results that repeat an earlier one and keep at most ``limit``.
+
+    Two results are duplicates when their canonical URLs match or the
+    MinHash estimate of their snippet overlap reaches DEDUP_MIN_SIMILARITY. The
+    first (higher ranked) result is kept; it takes the longer of the two
+    snippets and lists the dropped URLs under "duplicate_urls". Surplus
+    results fill the places freed by duplicates.
+    """
+    kept: List[Dict] = []
+    urls: Dict[str, int] = {}
+    fingerprints: List[Optional[Tuple[int, ...]]] = []
+    for recipe in recipes:
+        url = canonical_url(recipe.get("url", ""))
+        fingerprint = minhash(f"{recipe.get('name', '')} {recipe.get('content', '')}")
+        match = urls.get(url)
+        if match is None and fingerprint is not None:
+            match = next(
+                (i for i, other in enumerate(fingerprints)
+                 if other is not None and similarity(fingerprint, other) >= DEDUP_MIN_SIMILARITY),
+                None
+            )
+        if match is not None:
+            original = kept[match]
+            merged = {**original, "duplicate_urls": original.get("duplicate_urls", []) + [recipe.get("url")]}
+            if len(recipe.get("content") or "") > len(original.get("content") or ""):
+                merged["content"] = recipe["content"]
+            kept[match] = merged
+            continue
+        urls[url] = len(kept)
+        fingerprints.append(fingerprint)
+        kept.append(recipe)
+
+    removed = len(recipes) - len(kept)
+    if removed:
+        logger.info("Dropped %s duplicate search results", removed)
+    return kept[:limit] if limit is not None else kept
@@ -0,0 +1,176 @@
+import re
+from typing import Dict, List, Optional, Tuple
+
+from recipe_app.models.recipe_models import RecipeFeature
+
+# Common ingredients, longest phrases first so "olive oil" wins over "oil"
+INGREDIENT_LEXICON = sorted({
+    # Proteins
+    "chicken", "chicken breast", "chicken thighs", "beef", "ground beef", "steak", "pork",
+    "bacon", "ham", "sausage", "lamb", "turkey", "duck", "salmon", "tuna", "cod", "shrimp",
+    "prawns", "tofu", "tempeh", "eggs", "egg", "lentils", "chickpeas", "black beans",
+    "kidney beans", "beans",
+    # Dairy
+    "milk", "butter", "cream", "heavy cream", "sour cream", "yogurt", "cheese", "parmesan",
+    "mozzarella", "cheddar", "feta", "ricotta", "cream cheese",
+    # Grains and starches
+    "flour", "rice", "pasta", "spaghetti", "noodles", "bread", "breadcrumbs", "oats",
+    "quinoa", "couscous", "tortillas", "potatoes", "sweet potatoes", "cornstarch",
+    # Vegetables
+    "onion", "onions", "red onion", "garlic", "shallots", "tomatoes", "tomato",
+    "cherry tomatoes", "tomato paste", "carrots", "carrot", "celery", "spinach", "kale",
+    "broccoli", "cauliflower", "zucchini", "eggplant", "mushrooms", "bell pepper",
+    "bell peppers", "peppers", "jalapeno", "cucumber", "lettuce", "cabbage", "peas", "corn",
+    "avocado", "green beans", "asparagus", "leeks", "scallions", "green onions", "ginger",
+    "pumpkin", "squash", "butternut squash",
+    # Fruit
+    "lemon", "lemon juice", "lime", "lime juice", "apple", "apples", "banana", "bananas",
+    "berries", "blueberries", "strawberries", "raisins",
+    # Pantry
+    "olive oil", "vegetable oil", "sesame oil", "coconut oil", "oil", "vinegar",
+    "balsamic vinegar", "soy sauce", "fish sauce", "honey", "maple syrup", "sugar",
+    "brown sugar", "salt", "black pepper", "pepper", "baking powder", "baking soda",
+    "vanilla", "vanilla extract", "cocoa", "chocolate", "chocolate chips", "coconut milk",
+    "stock", "chicken stock", "vegetable stock", "broth", "chicken broth", "tomato sauce",
+    "mustard", "mayonnaise", "ketchup", "peanut butter", "almonds", "walnuts", "pecans",
+    "peanuts", "cashews", "sesame seeds",
+    # Herbs and spices
+    "basil", "parsley", "cilantro", "coriander", "oregano", "thyme", "rosemary", "sage",
+    "dill", "mint", "bay leaves", "cumin", "paprika", "smoked paprika", "chili powder",
+    "chili flakes", "red pepper flakes", "turmeric", "curry powder", "garam masala",
+    "cinnamon", "nutmeg", "cayenne",
+}, key=len, reverse=True)
+
+# Seasonings that are rarely "key" ingredients unless nothing else is found
+MINOR_INGREDIENTS = {"salt", "pepper", "black pepper", "oil", "water", "sugar"}
+
+UNITS = (
+    r"cups?|c\.|tablespoons?|tbsps?|tbs|tsps?|teaspoons?|grams?|g|kilograms?|kg|ml|"
+    r"millilit(?:er|re)s?|lit(?:er|re)s?|l|ounces?|oz|pounds?|lbs?|cloves?|pinch(?:es)?|"
+    r"cans?|tins?|slices?|sticks?|bunch(?:es)?|handfuls?|sprigs?|packages?|pieces?"
+)
+# "2 cups flour", "1/2 tsp of salt", "200g spinach", "3 large eggs"
+QUANTITY_PATTERN = re.compile(
+    rf"(?:\d+(?:[./]\d+)?|[½¼¾⅓⅔⅛])\s*(?:{UNITS})?\.?\s+(?:of\s+)?"
+    r"(?:(?:large|small|medium|fresh|chopped|diced|minced|sliced|grated|ground)\s+)*"
+    r"([a-z][a-z -]{1,40})",
+    re.IGNORECASE
+)
+
+# Keywords mapped to a normalized cooking style, most specific first
+COOKING_METHODS: List[Tuple[str, str]] = [
+    (r"\bstir[- ]?fr(?:y|ied|ying)\b", "stir-fried"),
+    (r"\bair[- ]?fr(?:y|yer|ied)\b", "air-fried"),
+    (r"\bdeep[- ]?fr(?:y|ied)\b", "deep-fried"),
+    (r"\bslow[- ]?cook(?:er|ed)?\b|\bcrock[- ]?pot\b", "slow-cooked"),
+    (r"\bpressure[- ]?cook(?:er|ed)?\b|\binstant pot\b", "pressure-cooked"),
+    (r"\bno[- ]bake\b", "no-bake"),
+    (r"\bgrill(?:ed|ing)?\b|\bbbq\b|\bbarbecue", "grilled"),
+    (r"\broast(?:ed|ing)?\b", "roasted"),
+    (r"\bbak(?:e|ed|ing)\b|\boven\b|\bcasserole\b", "baked"),
+    (r"\bbrais(?:e|ed|ing)\b", "braised"),
+    (r"\bsteam(?:ed|ing)?\b", "steamed"),
+    (r"\bpoach(?:ed|ing)?\b", "poached"),
+    (r"\bsaut[eé](?:ed|ing)?\b|\bpan[- ]?fr(?:y|ied)\b|\bskillet\b", "pan-fried"),
+    (r"\bfr(?:y|ied|ying)\b", "fried"),
+    (r"\bsimmer(?:ed|ing)?\b|\bstew(?:ed)?\b", "simmered"),
+    (r"\bboil(?:ed|ing)?\b", "boiled"),
+    (r"\bsalad\b|\braw\b", "raw"),
+]
+
+# Site suffixes and filler words commonly found in search result titles
+TITLE_NOISE = re.compile(r"\s*[|\-–—:]\s*[^|\-–—:]*$")
+TITLE_SUFFIX = re.compile(r"\s+recipe(?:s)?\s*$", re.IGNORECASE)
+
+MIN_KEY_INGREDIENTS = 3
+MAX_KEY_INGREDIENTS = 8
+
+
+def _clean_dish_name(title: str) -> str:
+    """Strip site names and a trailing "Recipe" from a search result title."""
+    name = title.strip() or "Unknown Dish"
+    stripped = TITLE_NOISE.sub("", name)
+    # Only drop the suffix when something meaningful is left
+    if len(stripped) >= 4:
+        name = stripped
+    return TITLE_SUFFIX.sub("", name).strip() or name
+
+
+def _match_lexicon(text: str) -> Optional[str]:
+    """Return the longest lexicon ingredient contained in text, if any."""
+    for ingredient in INGREDIENT_LEXICON:
+        if re.search(rf"\b{re.escape(ingredient)}\b", text):
+            return ingredient
+    return None
+
+
+def _find_ingredients(text: str) -> Tuple[List[str], int]:
+    """Find ingredients in text, returning them and how many had a quantity."""
+    lowered = text.lower()
+    found: List[str] = []
+    quantified = 0
+
+    # Quantity/unit phrases are strong evidence of an ingredient list
+    for match in QUANTITY_PATTERN.finditer(lowered):
+        ingredient = _match_lexicon(match.group(1))
+        if ingredient and ingredient not in found:
+            found.append(ingredient)
+            quantified += 1
+
+    # Fall back to lexicon mentions anywhere in the text, in order of appearance
+    mentions = []
+    for ingredient in INGREDIENT_LEXICON:
+        if any(ingredient in other for other in found + [m for _, m in mentions]):
+            continue
+        match = re.search(rf"\b{re.escape(ingredient)}\b", lowered)
+        if match:
+            mentions.append((match.start(), ingredient))
+    found.extend(ingredient for _, ingredient in sorted(mentions))
+
+    key = [ingredient for ingredient in found if ingredient not in MINOR_INGREDIENTS]
+    if len(key) < MIN_KEY_INGREDIENTS:
+        key = found
+    return key[:MAX_KEY_INGREDIENTS], quantified
+
+
+def find_cooking_style(text: str) -> Optional[str]:
+    """Return the first cooking style whose keywords appear in text."""
+    lowered = text.lower()
+    for pattern, style in COOKING_METHODS:
+        if re.search(pattern, lowered):
+            return style
+    return None
+
+
+class HeuristicFeatureExtractor:
+    """Builds recipe features locally from search result content, without an LLM."""
+
+    @staticmethod
+    def extract(recipe: Dict) -> Tuple[RecipeFeature, float]:
+        """Extract features from one recipe, with a confidence between 0 and 1."""
+        title = recipe.get("name", "")
+        content = recipe.get("content", "")
+        ingredients, quantified = _find_ingredients(f"{title}\n{content}")
+        cooking_style = find_cooking_style(f"{title}\n{content}")
+
+        feature = RecipeFeature(
+            dish_name=_clean_dish_name(title),
+            key_ingredients=ingredients,
+            cooking_style=cooking_style
+        )
+
+        # Quantified ingredients suggest we saw the actual ingredient list
+        confidence = 0.0
+        confidence += 0.5 * min(len(ingredients), 5) / 5
+        confidence += 0.3 * min(quantified, 3) / 3
+        confidence += 0.2 if cooking_style else 0.0
+        return feature, round(confidence, 2)
+
+    @staticmethod
+    def extract_all(recipes: List[Dict]) -> Tuple[List[RecipeFeature], float]:
+        """Extract features for every recipe, returning them and the lowest confidence."""
+        if not recipes:
+            return [], 0.0
+        results = [HeuristicFeatureExtractor.extract(recipe) for recipe in recipes]
+        features = [feature for feature, _ in results]
+        return features, min(confidence for _, confidence in results)
@@ -0,0 +1,60 @@
+from typing import Any, Optional
+
+from recipe_app.models.recipe_models import RecipeState
+from recipe_app.services.recipe_services import (
+    QueryTranslator,
+    RecipeRetriever,
+    RecipeKeyFeatures,
+    HumanFeedback,
+    ResultRefiner,
+    Satisfaction
+)
+from recipe_app.services.structured_logging import logged_node
+
+
+def build_graph(checkpointer: Optional[Any] = None):
+    """Compile the recipe graph, pausing before feedback so callers can resume the thread.
+
+    Uses an in-memory checkpointer unless one is given.
+    """
+    # langgraph is only needed once a graph is built
+    from langgraph.graph import StateGraph, START, END
+    from langgraph.checkpoint.memory import MemorySaver
+
+    builder = StateGraph(RecipeState)
+
+    # Add nodes; their log records carry the node name
+    builder.add_node("translate_query", logged_node("translate_query", QueryTranslator.translate))
+    builder.add_node("retrieve_recipes", logged_node("retrieve_recipes", RecipeRetriever.retrieve))
+    builder.add_node("extract_key_features", logged_node("extract_key_features", RecipeKeyFeatures.extract))
+    builder.add_node("human_feedback", logged_node("human_feedback", HumanFeedback.refine))
+    builder.add_node("refine_results", logged_node("refine_results", ResultRefiner.refine))
+
+    # Add edges
+    builder.add_edge(START, "translate_query")
+    builder.add_edge("translate_query", "retrieve_recipes")
+    builder.add_edge("retrieve_recipes", "extract_key_features")
+    builder.add_edge("extract_key_features", "human_feedback")
+
+    # Add conditional edges for feedback loop
+    builder.add_conditional_edges(
+        "human_feedback",
+        Satisfaction.recipe_satisfaction,
+        {
+            "translate_query": "translate_query",
+            "refine_results": "refine_results",
+            END: END
+        }
+    )
+
+    # Search again only for the shortfall left by local refinement
+    builder.add_conditional_edges(
+        "refine_results",
+        ResultRefiner.next_step,
+        {
+            "translate_query": "translate_query",
+            "human_feedback": "human_feedback"
+        }
+    )
+
+    return builder.compile(checkpointer=checkpointer or MemorySaver(), interrupt_before=["human_feedback"])
@@ -0,0 +1,123 @@
+import logging
+from typing import Any, Dict, List, Optional
+
+from langchain_core.messages import BaseMessage, RemoveMessage, SystemMessage
+
+from recipe_app.models.recipe_models import RecipeState
+from recipe_app.config.config import HISTORY_KEEP_TURNS, HISTORY_TOPIC_CHARS
+from recipe_app.config.settings import settings
+from recipe_app.services.constraints import extract_terms
+
+logger = logging.getLogger(__name__)
+
+# Constraint lists kept in the running summary, with their labels in the prompt
+SUMMARY_FIELDS = {"diets": "Diet", "excluded": "Exclude", "required": "Include"}
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate (about four characters per token for English text)."""
+    return len(text) // 4 + 1
+
+
+def message_text(message: BaseMessage) -> str:
+    """Return the text of a message, joining content blocks if needed."""
+    content = message.content
+    if isinstance(content, str):
+        return content
+    return " ".join(block.get("text", "") for block in content if isinstance(block, dict))
+
+
+def split_turns(messages: List[BaseMessage]) -> List[List[BaseMessage]]:
+    """Group messages into turns, each starting at a human message."""
+    turns: List[List[BaseMessage]] = []
+    for message in messages:
+        if message.type == "human" or not turns:
+            turns.append([message])
+        else:
+            turns[-1].append(message)
+    return turns
+
+
+class HistoryPolicy:
+    """Keeps the translator's conversation input bounded.
+
+    The last HISTORY_KEEP_TURNS turns are passed verbatim; older turns are
+    folded into a running summary of constraints (diets, exclusions,
+    inclusions and the latest earlier request) and removed from state. The
+    whole translator input is kept under the history_max_tokens setting.
+    """
+
+    @staticmethod
+    def fold(summary: Optional[Dict[str, Any]], messages: List[BaseMessage]) -> Dict[str, Any]:
+        """Merge the constraints stated in messages into a summary; later turns win."""
+        summary = dict(summary or {})
+        for field in SUMMARY_FIELDS:
+            summary[field] = list(summary.get(field) or [])
+
+        for message in messages:
+            text = message_text(message)
+            terms = extract_terms(text)
+            # An ingredient asked for now overrides an earlier exclusion, and vice versa
+            summary["required"] = [term for term in summary["required"] if term not in terms["excluded"]]
+            summary["excluded"] = [term for term in summary["excluded"] if term not in terms["required"]]
+            for field in SUMMARY_FIELDS:
+                summary[field] = list(dict.fromkeys(summary[field] + terms[field]))
+            if message.type == "human" and text.strip():
+                summary["topic"] = text.strip()[:HISTORY_TOPIC_CHARS]
+        return summary
+
+    @staticmethod
+    def render(summary: Optional[Dict[str, Any]]) -> str:
+        """Render a summary for the system prompt, or "" if it is empty."""
+        if not summary:
+            return ""
+        lines = []
+        if summary.get("topic"):
+            lines.append(f"- Earlier request: {summary['topic']}")
+        for field, label in SUMMARY_FIELDS.items():
+            if summary.get(field):
+                lines.append(f"- {label}: {', '.join(summary[field])}")
+        if not lines:
+            return ""
+        return "Earlier in this conversation (still applies unless the user changed it):\n" + "\n".join(lines)
+
+    @staticmethod
+    def prepare(state: RecipeState, instructions: str) -> List[BaseMessage]:
+        """Return the bounded translator input and trim folded turns from state."""
+        turns = split_turns(list(state.get("messages") or []))
+        max_tokens = settings().history_max_tokens
+        keep = max(HISTORY_KEEP_TURNS, 1)
+        folded_turns, recent = turns[:-keep], turns[-keep:]
+        summary = HistoryPolicy.fold(
+            state.get("history_summary"), [message for turn in folded_turns for message in turn]
+        )
+
+        def system_message() -> SystemMessage:
+            rendered = HistoryPolicy.render(summary)
+            return SystemMessage(content=f"{instructions}\n\n{rendered}" if rendered else instructions)
+
+        def size() -> int:
+            return estimate_tokens(system_message().content) + sum(
+                estimate_tokens(message_text(message)) for turn in recent for message in turn
+            )
+
+        # Fold the oldest kept turns until the input fits; the latest turn always stays
+        while len(recent) > 1 and size() > max_tokens:
+            turn = recent.pop(0)
+            folded_turns.append(turn)
+            summary = HistoryPolicy.fold(summary, turn)
+
+        messages = [message for turn in recent for message in turn]
+        overflow = size() - max_tokens
+        if overflow > 0 and messages:
+            # A single oversized message is cut, keeping its beginning
+            last = messages[-1]
+            text = message_text(last)
+            messages[-1] = last.model_copy(update={"content": text[:max(len(text) - overflow * 4, 0)]})
+
+        folded = [message for turn in folded_turns for message in turn]
+        if folded:
+            state["history_summary"] = summary
+            state["messages"] = [RemoveMessage(id=message.id) for message in folded if message.id]
+            logger.info("Folded %s older messages into the history summary", len(folded))
+        return [system_message()] + messages
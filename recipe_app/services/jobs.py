@@ -0,0 +1,118 @@
+import time
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+from recipe_app.config.settings import settings
+from recipe_app.services.cache import make_key
+
+logger = logging.getLogger(__name__)
+
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+
+def fingerprint(*parts: Any) -> str:
+    """Key of a submission: the same session, step and input give the same key."""
+    return make_key("job", *parts)
+
+
+class Job:
+    """One background run, readable from any thread while it progresses."""
+
+    def __init__(self, key: str, kind: str = ""):
+        self.key = key
+        self.kind = kind
+        self.status = RUNNING
+        self.step: Optional[str] = None
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+        self.started = time.monotonic()
+        self.finished: Optional[float] = None
+        self._done = threading.Event()
+
+    @property
+    def done(self) -> bool:
+        return self._done.is_set()
+
+    def progress(self, step: str) -> None:
+        """Record the step the job is on, for the UI to show."""
+        self.step = step
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Block until the job finishes; returns whether it did."""
+        return self._done.wait(timeout)
+
+    def _finish(self, status: str, result: Any = None, error: Optional[BaseException] = None) -> None:
+        self.result, self.error, self.status = result, error, status
+        self.finished = time.monotonic()
+        self._done.set()
+
+
+class JobRunner:
+    """Process-wide executor for graph runs and background extractions, deduplicated by fingerprint.
+
+    Submitting a key that is running or finished successfully returns the
+    existing job, so a rerun or a second click never starts (or pays for)
+    the same work again. Failed jobs are replaced on the next submission,
+    which lets the user retry. Finished jobs are forgotten after
+    job_ttl_seconds.
+    """
+
+    def __init__(self, workers: Optional[int] = None, ttl: Optional[float] = None):
+        # None follows the job_ttl_seconds setting
+        self._ttl = ttl
+        self._executor = ThreadPoolExecutor(max_workers=workers or settings().job_workers, thread_name_prefix="graph-job")
+        self._jobs: Dict[str, Job] = {}
+        self._lock = threading.Lock()
+
+    def submit(self, key: str, fn: Callable[[Job], Any], kind: str = "") -> Job:
+        """Run ``fn(job)`` in the background unless a job with this key already exists."""
+        with self._lock:
+            self._prune()
+            job = self._jobs.get(key)
+            if job is not None and job.status != FAILED:
+                logger.info("Attached to existing %s %s (%s)", job.kind or 'job', key[-8:], job.status)
+                return job
+            job = self._jobs[key] = Job(key, kind)
+        self._executor.submit(self._run, job, fn)
+        return job
+
+    @staticmethod
+    def _run(job: Job, fn: Callable[[Job], Any]) -> None:
+        try:
+            job._finish(DONE, result=fn(job))
+        except Exception as e:
+            logger.error("Background %s %s failed: %s", job.kind or 'job', job.key[-8:], e)
+            job._finish(FAILED, error=e)
+
+    def get(self, key: Optional[str]) -> Optional[Job]:
+        if key is None:
+            return None
+        with self._lock:
+            return self._jobs.get(key)
+
+    def busy(self, key: Optional[str]) -> bool:
+        """Whether a job with this key is still running."""
+        job = self.get(key)
+        return job is not None and not job.done
+
+    @property
+    def ttl(self) -> float:
+        return self._ttl if self._ttl is not None else settings().job_ttl_seconds
+
+    def _prune(self) -> None:
+        now, ttl = time.monotonic(), self.ttl
+        for key in [key for key, job in self._jobs.items() if job.done and now - job.finished > ttl]:
+            del self._jobs[key]
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            running = sum(1 for job in self._jobs.values() if not job.done)
+            return {"running": running, "finished": len(self._jobs) - running}
+
+
+# Process-wide runner shared by every session
+job_runner = JobRunner()
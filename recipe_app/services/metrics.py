@@ -0,0 +1,57 @@
+import os
+import sys
+import types
+import resource
+from typing import Any, Optional, Set
+
+# Shared or immutable objects that are not owned by any one session
+_NOT_OWNED = (
+    type, types.ModuleType, types.FunctionType, types.BuiltinFunctionType,
+    types.MethodType, types.CodeType, types.FrameType
+)
+MAX_SIZE_OBJECTS = 200000  # Objects visited per measurement, so a huge graph cannot stall a rerun
+
+
+def rss_bytes() -> int:
+    """Current resident set size of this process, in bytes."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        # No /proc (e.g. macOS): fall back to the peak, reported in bytes there
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def deep_size(obj: Any, seen: Optional[Set[int]] = None) -> int:
+    """Approximate memory held by an object and everything it references.
+
+    Follows containers, instance ``__dict__`` and ``__slots__``; classes,
+    modules and functions are shared by the whole process and not counted.
+    Objects already in ``seen`` are skipped, so a shared set measures
+    several objects without counting what they share twice.
+    """
+    seen = set() if seen is None else seen
+    total = 0
+    stack = [obj]
+    while stack and len(seen) < MAX_SIZE_OBJECTS:
+        item = stack.pop()
+        if id(item) in seen or isinstance(item, _NOT_OWNED):
+            continue
+        seen.add(id(item))
+        try:
+            total += sys.getsizeof(item)
+        except TypeError:
+            continue
+        if isinstance(item, (str, bytes, bytearray, int, float, bool)) or item is None:
+            continue
+        if isinstance(item, dict):
+            stack.extend(item.keys())
+            stack.extend(item.values())
+        elif isinstance(item, (list, tuple, set, frozenset)):
+            stack.extend(item)
+        if hasattr(item, "__dict__"):
+            stack.append(vars(item))
+        for slot in getattr(type(item), "__slots__", ()):
+            if isinstance(slot, str) and hasattr(item, slot):
+                stack.append(getattr(item, slot))
+    return total
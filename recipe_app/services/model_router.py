@@ -0,0 +1,132 @@
+import os
+import logging
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional, Type, TYPE_CHECKING
+
+from pydantic import BaseModel, ValidationError
+from langchain_core.exceptions import OutputParserException
+from langchain_core.messages import AIMessage, BaseMessage
+
+from recipe_app.config.config import load_environment
+from recipe_app.config.settings import settings
+from recipe_app.services.cache import get_response_cache, make_key, dumps, loads
+from recipe_app.services.record_replay import record_mode, http_client
+
+if TYPE_CHECKING:
+    from langchain_openai import ChatOpenAI
+
+logger = logging.getLogger(__name__)
+
+# Errors that mean the model answered but not in the requested structure
+STRUCTURED_OUTPUT_ERRORS = (ValidationError, OutputParserException)
+
+@lru_cache(maxsize=32)
+def _cached_llm(model: str, temperature: float, max_tokens: Optional[int],
+                timeout: Optional[float], api_key: Optional[str], mode: str = "off") -> "ChatOpenAI":
+    """Build a chat model once per distinct configuration, API key and record mode."""
+    # Imported on first use; langchain_openai and the openai SDK are slow to import
+    from langchain_openai import ChatOpenAI
+    options = {"http_client": http_client(mode)} if mode != "off" else {}
+    return ChatOpenAI(
+        model=model,
+        temperature=temperature,
+        max_tokens=max_tokens,
+        timeout=timeout,
+        api_key=api_key,
+        **options
+    )
+
+def _cached_response(route: Dict[str, Any], model: str, schema: Optional[Type[BaseModel]],
+                     messages: List[BaseMessage], call: Callable[[], Any]) -> Any:
+    """Return a model response from the LLM response cache, calling the model on a miss.
+
+    Only deterministic (temperature 0) calls are cached. The key covers the model,
+    its parameters, the output schema and the type and content of every message.
+    """
+    # Recording and replaying must reach the provider client, so they skip the cache
+    cache = get_response_cache() if route["temperature"] == 0 and record_mode() == "off" else None
+    if cache is None:
+        return call()
+
+    key = make_key(
+        "llm",
+        model,
+        route["temperature"],
+        route.get("max_tokens"),
+        schema.model_json_schema() if schema else None,
+        [[message.type, message.content] for message in messages]
+    )
+    try:
+        data = cache.get(key)
+        if data is not None:
+            value = loads(data)
+            return schema.model_validate(value) if schema else AIMessage(content=value)
+    except Exception as e:
+        logger.warning("LLM cache read failed: %s", e)
+
+    response = call()
+    try:
+        value = response.model_dump() if schema else response.content
+        cache.set(key, dumps(value), settings().llm_cache_ttl_seconds)
+    except Exception as e:
+        logger.warning("LLM cache write failed: %s", e)
+    return response
+
+class ModelRouter:
+    """Picks the model and call parameters for each graph node from the runtime settings."""
+
+    @staticmethod
+    def route(node: str) -> Dict[str, Any]:
+        """Return the routing entry for a node, or the default route."""
+        return settings().route(node)
+
+    @staticmethod
+    def get_llm(node: str, model: Optional[str] = None, timeout: Optional[float] = None) -> "ChatOpenAI":
+        """Return the chat model for a node, optionally overriding the model name and timeout."""
+        route = ModelRouter.route(node)
+        load_environment()
+        mode = record_mode()
+        # Replays never reach OpenAI, so they run without a key
+        api_key = os.getenv("OPENAI_API_KEY") or ("replay" if mode == "replay" else None)
+        return _cached_llm(
+            model or route["model"],
+            route["temperature"],
+            route.get("max_tokens"),
+            timeout if timeout is not None else route.get("timeout"),
+            api_key,
+            mode
+        )
+
+    @staticmethod
+    def invoke(node: str, messages: List[BaseMessage]):
+        """Invoke the node's model on a list of messages."""
+        route = ModelRouter.route(node)
+        return _cached_response(
+            route, route["model"], None, messages,
+            lambda: ModelRouter.get_llm(node).invoke(messages)
+        )
+
+    @staticmethod
+    def invoke_structured(node: str, schema: Type[BaseModel], messages: List[BaseMessage],
+                          timeout: Optional[float] = None):
+        """Invoke the node's model with structured output, escalating on invalid output.
+
+        If the response does not validate against the schema and the route has an
+        "escalate_to" model, the call is retried once on that model. A timeout
+        overrides the route's for callers with a deadline of their own.
+        """
+        route = ModelRouter.route(node)
+        try:
+            return _cached_response(
+                route, route["model"], schema, messages,
+                lambda: ModelRouter.get_llm(node, timeout=timeout).with_structured_output(schema).invoke(messages)
+            )
+        except STRUCTURED_OUTPUT_ERRORS as e:
+            escalate_to = route.get("escalate_to")
+            if not escalate_to or escalate_to == route["model"]:
+                raise
+            logger.warning("Invalid structured output from %s for %s, escalating to %s: %s", route['model'], node, escalate_to, e)
+            return _cached_response(
+                route, escalate_to, schema, messages,
+                lambda: ModelRouter.get_llm(node, model=escalate_to, timeout=timeout).with_structured_output(schema).invoke(messages)
+            )
@@ -0,0 +1,359 @@
+import os
+import re
+import time
+import codecs
+import socket
+import logging
+import ipaddress
+import threading
+from contextlib import contextmanager
+from html.parser import HTMLParser
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+from urllib.parse import urljoin, urlparse
+
+from recipe_app.config.config import (
+    PAGE_FETCH_ENABLED,
+    PAGE_CACHE_PATH,
+    load_environment
+)
+from recipe_app.config.settings import settings
+from recipe_app.services.cache import CacheBackend, SQLiteCache, make_key, dumps, loads
+from recipe_app.services.record_replay import record_mode
+from recipe_app.services.structured_data import find_recipe_nodes
+
+logger = logging.getLogger(__name__)
+
+USER_AGENT = "RecipeAssistant/1.0 (+https://github.com/MorHananovitz/agent_recipe_streamlit_app)"
+
+# Elements whose text is never part of the recipe
+SKIPPED_TAGS = {"script", "style", "noscript", "svg", "nav", "header", "footer", "form", "iframe", "template"}
+# Elements that start a new line of text
+BLOCK_TAGS = {
+    "p", "div", "br", "li", "ul", "ol", "h1", "h2", "h3", "h4", "h5", "h6",
+    "section", "article", "tr", "table", "blockquote", "pre",
+}
+TEXT_CONTENT_TYPES = ("text/html", "application/xhtml+xml", "text/plain")
+
+
+def page_fetch_enabled() -> bool:
+    """Check the RECIPE_PAGE_FETCH variable, falling back to the config switch."""
+    load_environment()
+    value = os.getenv("RECIPE_PAGE_FETCH")
+    if value is None:
+        return PAGE_FETCH_ENABLED
+    return value.strip().lower() not in {"0", "off", "false", "no"}
+
+
+def resolve_host(host: str) -> List[str]:
+    """Return every address a host name resolves to."""
+    return [info[4][0] for info in socket.getaddrinfo(host, None, proto=socket.IPPROTO_TCP)]
+
+
+def is_public_address(address: str) -> bool:
+    """Whether an IP address is globally routable and not multicast."""
+    try:
+        ip = ipaddress.ip_address(address.split("%")[0])
+    except ValueError:
+        return False
+    return ip.is_global and not ip.is_multicast
+
+
+def is_public_url(url: str, resolve: Callable[[str], List[str]] = resolve_host,
+                  allow: Callable[[str], bool] = is_public_address) -> bool:
+    """Whether a URL is http(s) and its host only resolves to public addresses.
+
+    Loopback, private, link-local and other reserved addresses are refused, so
+    a result page (or a redirect) cannot point the fetcher at internal services.
+    """
+    parsed = urlparse(url)
+    if parsed.scheme not in ("http", "https") or not parsed.hostname:
+        return False
+    try:
+        addresses = resolve(parsed.hostname)
+    except (OSError, UnicodeError, ValueError):
+        return False
+    return bool(addresses) and all(allow(address) for address in addresses)
+
+
+def vetted_transport(limits, resolve: Callable[[str], List[str]] = resolve_host,
+                     allow: Callable[[str], bool] = is_public_address, retries: int = 1):
+    """Return an httpx transport that only connects to addresses it has checked.
+
+    The host is resolved once per connection and the socket is opened to that
+    same address, so a name that re-resolves between the URL check and the
+    connect (DNS rebinding) still cannot reach an internal service. TLS keeps
+    using the host name for SNI and certificate checks.
+    """
+    import httpx
+    import httpcore
+
+    class VettedBackend(httpcore.NetworkBackend):
+        def __init__(self):
+            self._backend = httpcore.SyncBackend()
+
+        def connect_tcp(self, host, port, timeout=None, local_address=None, socket_options=None):
+            addresses = resolve(host)
+            if not addresses or not all(allow(address) for address in addresses):
+                raise PermissionError(f"{host} is not a public address")
+            error: Optional[Exception] = None
+            for address in addresses:
+                try:
+                    return self._backend.connect_tcp(address, port, timeout, local_address, socket_options)
+                except (httpcore.ConnectError, httpcore.ConnectTimeout) as e:
+                    error = e
+            raise error
+
+        def connect_unix_socket(self, path, timeout=None, socket_options=None):
+            raise PermissionError("Unix sockets are not fetched")
+
+        def sleep(self, seconds):
+            self._backend.sleep(seconds)
+
+    transport = httpx.HTTPTransport(limits=limits, retries=retries)
+    # httpx does not take a network backend, so the pool is built here with the same options
+    transport._pool = httpcore.ConnectionPool(
+        ssl_context=httpx.create_ssl_context(),
+        max_connections=limits.max_connections,
+        max_keepalive_connections=limits.max_keepalive_connections,
+        keepalive_expiry=limits.keepalive_expiry,
+        retries=retries,
+        network_backend=VettedBackend()
+    )
+    return transport
+
+
+class HTMLTextExtractor(HTMLParser):
+    """Incremental HTML-to-text converter; feed it chunks as they arrive.
+
+    Stops collecting once ``max_chars`` of text have been gathered. JSON-LD
+    script bodies are kept separately in ``json_ld``.
+    """
+
+    def __init__(self, max_chars: Optional[int] = None):
+        super().__init__(convert_charrefs=True)
+        self.max_chars = max_chars if max_chars is not None else settings().page_text_max_chars
+        self.json_ld: List[str] = []
+        self._parts: List[str] = []
+        self._length = 0
+        self._skip_depth = 0
+        self._json_ld_parts: Optional[List[str]] = None
+
+    @property
+    def full(self) -> bool:
+        return self._length >= self.max_chars
+
+    def handle_starttag(self, tag: str, attrs) -> None:
+        if tag == "script" and "ld+json" in (dict(attrs).get("type") or "").lower():
+            self._json_ld_parts = []
+        if tag in SKIPPED_TAGS:
+            self._skip_depth += 1
+        elif tag in BLOCK_TAGS:
+            self._parts.append("\n")
+
+    def handle_endtag(self, tag: str) -> None:
+        if tag == "script" and self._json_ld_parts is not None:
+            self.json_ld.append("".join(self._json_ld_parts))
+            self._json_ld_parts = None
+        if tag in SKIPPED_TAGS and self._skip_depth:
+            self._skip_depth -= 1
+        elif tag in BLOCK_TAGS:
+            self._parts.append("\n")
+
+    def handle_data(self, data: str) -> None:
+        if self._json_ld_parts is not None:
+            self._json_ld_parts.append(data)
+            return
+        if self._skip_depth or self.full:
+            return
+        text = re.sub(r"[ \t\r\f\v]+", " ", data)
+        if text.strip():
+            self._parts.append(text)
+            self._length += len(text)
+
+    def text(self) -> str:
+        """Return the collected text with blank lines collapsed."""
+        lines = [line.strip() for line in "".join(self._parts).splitlines()]
+        return "\n".join(line for line in lines if line)[:self.max_chars]
+
+
+def _charset(content_type: str) -> str:
+    """Return the charset named in a Content-Type header, defaulting to UTF-8."""
+    match = re.search(r"charset=([\w-]+)", content_type or "", re.I)
+    if match:
+        try:
+            return codecs.lookup(match.group(1)).name
+        except LookupError:
+            pass
+    return "utf-8"
+
+
+class PageFetcher:
+    """Downloads result pages concurrently and keeps their text in a disk cache.
+
+    One pooled HTTP client is shared by all sessions, with at most
+    page_fetch_per_host requests in flight per site. Cached pages younger
+    than page_cache_fresh_seconds are served as is; older ones are
+    revalidated with If-None-Match / If-Modified-Since. Bodies are parsed as
+    they stream in and the download stops at page_max_bytes. Redirects are
+    followed one hop at a time, each to a public address only, and the
+    default transport connects to the address it checked.
+    """
+
+    def __init__(self, cache: Optional[CacheBackend] = None, transport=None,
+                 workers: Optional[int] = None, per_host: Optional[int] = None,
+                 resolve: Callable[[str], List[str]] = resolve_host,
+                 allow: Callable[[str], bool] = is_public_address):
+        import httpx
+        from recipe_app.services.record_replay import wrap_transport
+
+        self.cache = cache if cache is not None else SQLiteCache(PAGE_CACHE_PATH, max_entries=settings().page_cache_max_entries)
+        # None follows the runtime settings
+        self._per_host = per_host
+        self._resolve = resolve
+        self._allow = allow
+        # Replayed pages come from the cassette, never from the network
+        self._check_addresses = record_mode() != "replay"
+        workers = workers or settings().page_fetch_workers
+        limits = httpx.Limits(max_connections=workers * 2, max_keepalive_connections=workers)
+        transport = transport or vetted_transport(limits, resolve, allow)
+        self.client = httpx.Client(
+            transport=wrap_transport(transport),
+            follow_redirects=False,
+            headers={"User-Agent": USER_AGENT, "Accept": "text/html,application/xhtml+xml;q=0.9,*/*;q=0.5"}
+        )
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="page-fetch")
+        self._host_slots: Dict[Tuple[str, int], threading.BoundedSemaphore] = {}
+        self._host_lock = threading.Lock()
+
+    @property
+    def per_host(self) -> int:
+        return self._per_host or settings().page_fetch_per_host
+
+    def _slot(self, url: str) -> threading.BoundedSemaphore:
+        """Return the semaphore limiting concurrent requests to a URL's host."""
+        # Keyed by the limit too, so a changed setting applies to new requests
+        key = (urlparse(url).netloc.lower(), self.per_host)
+        with self._host_lock:
+            if key not in self._host_slots:
+                self._host_slots[key] = threading.BoundedSemaphore(key[1])
+            return self._host_slots[key]
+
+    def _cached(self, key: str) -> Optional[Dict[str, Any]]:
+        try:
+            data = self.cache.get(key)
+            return loads(data) if data is not None else None
+        except Exception as e:
+            logger.warning("Page cache read failed: %s", e)
+            return None
+
+    def _store(self, key: str, page: Dict[str, Any]) -> None:
+        try:
+            self.cache.set(key, dumps(page), settings().page_cache_ttl_seconds)
+        except Exception as e:
+            logger.warning("Page cache write failed: %s", e)
+
+    def fetch(self, url: str) -> Optional[Dict[str, Any]]:
+        """Return {"url", "text", "schema_recipes", "etag", "last_modified", "fetched_at"} for a page, or None."""
+        key = make_key("page", url)
+        cached = self._cached(key)
+        if cached and time.time() - cached["fetched_at"] < settings().page_cache_fresh_seconds:
+            return cached
+
+        headers = {}
+        if cached and cached.get("etag"):
+            headers["If-None-Match"] = cached["etag"]
+        if cached and cached.get("last_modified"):
+            headers["If-Modified-Since"] = cached["last_modified"]
+
+        try:
+            with self._slot(url):
+                with self._get(url, headers) as response:
+                    if response.status_code == 304 and cached:
+                        page = {**cached, "fetched_at": time.time()}
+                        self._store(key, page)
+                        return page
+                    if response.status_code != 200:
+                        logger.info("Skipping page %s: HTTP %s", url, response.status_code)
+                        return cached
+                    content_type = response.headers.get("content-type", "")
+                    if content_type and not content_type.lower().startswith(TEXT_CONTENT_TYPES):
+                        logger.info("Skipping page %s: %s", url, content_type)
+                        return None
+                    text, json_ld = self._read_text(response, _charset(content_type))
+                    page = {
+                        "url": url,
+                        "text": text,
+                        "schema_recipes": find_recipe_nodes(json_ld),
+                        "etag": response.headers.get("etag"),
+                        "last_modified": response.headers.get("last-modified"),
+                        "fetched_at": time.time()
+                    }
+        except Exception as e:
+            logger.info("Could not fetch page %s: %s: %s", url, type(e).__name__, e)
+            return cached
+
+        self._store(key, page)
+        return page
+
+    @contextmanager
+    def _get(self, url: str, headers: Dict[str, str]) -> Iterator[Any]:
+        """Stream a GET request, following redirects only to public addresses."""
+        max_redirects = settings().page_max_redirects
+        for _ in range(max_redirects + 1):
+            if self._check_addresses and not is_public_url(url, self._resolve, self._allow):
+                raise PermissionError(f"{url} is not a public address")
+            with self.client.stream("GET", url, headers=headers, timeout=settings().page_fetch_timeout_seconds) as response:
+                if not response.is_redirect:
+                    yield response
+                    return
+                url = urljoin(url, response.headers["location"])
+                # Validators belong to the first URL
+                headers = {}
+        raise RuntimeError(f"More than {max_redirects} redirects")
+
+    @staticmethod
+    def _read_text(response, charset: str) -> Tuple[str, List[str]]:
+        """Stream a response body into the HTML parser, stopping at the size cap.
+
+        Returns the page text and its JSON-LD blocks.
+        """
+        parser = HTMLTextExtractor()
+        decoder = codecs.getincrementaldecoder(charset)(errors="replace")
+        max_bytes = settings().page_max_bytes
+        received = 0
+        for chunk in response.iter_bytes():
+            chunk = chunk[:max_bytes - received]
+            received += len(chunk)
+            parser.feed(decoder.decode(chunk))
+            # Structured data often comes late in the page, so a full text buffer alone does not stop
+            if received >= max_bytes:
+                break
+        parser.feed(decoder.decode(b"", final=True))
+        parser.close()
+        return parser.text(), parser.json_ld
+
+    def fetch_all(self, urls: List[str], deadline: Optional[float] = None) -> Dict[str, Optional[Dict[str, Any]]]:
+        """Fetch pages concurrently; pages not ready by the deadline come back as None.
+
+        Late downloads keep running and still land in the cache.
+        """
+        futures = {url: self._executor.submit(self.fetch, url) for url in dict.fromkeys(urls)}
+        wait(futures.values(), timeout=deadline or settings().page_fetch_deadline_seconds)
+        pages = {}
+        for url, future in futures.items():
+            pages[url] = future.result() if future.done() and not future.exception() else None
+        return pages
+
+
+_fetcher: Optional[PageFetcher] = None
+_fetcher_lock = threading.Lock()
+
+
+def get_page_fetcher() -> PageFetcher:
+    """Return the process-wide page fetcher."""
+    global _fetcher
+    with _fetcher_lock:
+        if _fetcher is None:
+            _fetcher = PageFetcher()
+        return _fetcher
@@ -1,29 +1,54 @@
 import logging
-from typing import Dict, Any, List
-from langchain.schema import SystemMessage, HumanMessage
-from langchain_openai import ChatOpenAI
-from langchain_community.tools.tavily_search.tool import TavilySearchResults
-from langgraph.graph import END
+import threading
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional, Tuple
+from langchain_core.messages import SystemMessage, HumanMessage
+from langgraph.constants import END
 from recipe_app.models.recipe_models import (
     RecipeState, 
     ResponseRecipeKeyFeatures, 
     HumanSelection,
-    RecipeFeature
+    RecipeFeature,
+    FeatureRecord
 )
 from recipe_app.config.config import (
-    MODEL_NAME, 
-    TEMPERATURE, 
-    MAX_SEARCH_RESULTS,
     SEARCH_INSTRUCTIONS,
     RECIPE_FEATURES_INSTRUCTIONS,
-    TAVILY_API_KEY
+    load_environment
 )
-import streamlit as st
+from recipe_app.config.settings import settings
+from recipe_app.services.constraints import parse_constraints, rank
+from recipe_app.services.budget import TurnBudget
+from recipe_app.services.history import HistoryPolicy
+from recipe_app.services.structured_data import StructuredDataExtractor
+from recipe_app.services.dedup import canonical_url, deduplicate
+from recipe_app.services.feature_heuristics import HeuristicFeatureExtractor
+from recipe_app.services.model_router import ModelRouter
+from recipe_app.services.cache import cached_call
+from recipe_app.services.jobs import FAILED, fingerprint, job_runner
+from recipe_app.services.recipe_store import recipe_store
+from recipe_app.services.record_replay import recorded_call
+from recipe_app.services.batching import MicroBatcher
+from recipe_app.services.page_fetcher import page_fetch_enabled, get_page_fetcher
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Runs LLM extractions so they can be abandoned when they miss their deadline; created on first use
+_extraction_executor: Optional[ThreadPoolExecutor] = None
+_extraction_executor_lock = threading.Lock()
+
+def _get_extraction_executor() -> ThreadPoolExecutor:
+    global _extraction_executor
+    with _extraction_executor_lock:
+        if _extraction_executor is None:
+            _extraction_executor = ThreadPoolExecutor(max_workers=settings().extraction_workers, thread_name_prefix="extract")
+        return _extraction_executor
+
+# Merges extraction requests from concurrent sessions, created on first use when enabled
+_extraction_batcher: Optional[MicroBatcher] = None
+_extraction_batcher_lock = threading.Lock()
+
 class QueryTranslator:
     """Transforms human messages into structured web queries using LLM."""
 
@@ -31,32 +56,49 @@ class QueryTranslator:
     def translate(state: RecipeState) -> RecipeState:
         try:
             logger.info("Starting query translation")
-            llm = ChatOpenAI(model=MODEL_NAME, temperature=TEMPERATURE)
-            messages = state.get("messages", [])
+            # A pending refinement means this is a loop inside the current turn;
+            # otherwise a new search starts with a fresh budget
+            if not state.get("refinement"):
+                TurnBudget.begin_search(state)
+            TurnBudget.begin_cycle(state)
             
-            # Update system message to request just the search query
-            system_message = SystemMessage(content=SEARCH_INSTRUCTIONS + "\nProvide ONLY the search query without any additional text or explanation.")
-            response = llm.invoke([system_message] + messages)
+            # Update system message to request just the search query; older turns are
+            # folded into a constraint summary so the prompt stays bounded
+            messages = HistoryPolicy.prepare(
+                state,
+                SEARCH_INSTRUCTIONS + "\nProvide ONLY the search query without any additional text or explanation."
+            )
+            with TurnBudget.track_tokens(state):
+                response = ModelRouter.invoke("translate_query", messages)
             
             # Extract just the query text, removing any quotes
             query = response.content.strip().strip('"').strip("'")
             state["query"] = query
             
-            logger.info(f"Query translated: {query}")
+            logger.info("Query translated: %s", query)
             return state
         except Exception as e:
-            logger.error(f"Error in query translation: {str(e)}")
+            logger.error("Error in query translation: %s", e)
             raise
 
 class RecipeRetriever:
     """Retrieves recipes using Tavily search."""
 
     @staticmethod
-    def _search_recipes(query: str) -> list:
+    def _search_recipes(query: str, max_results: Optional[int] = None) -> list:
         """Search function that retrieves recipes."""
-        logger.info(f"Performing search for query: {query}")
-        tavily_search = TavilySearchResults(max_results=MAX_SEARCH_RESULTS)
-        search_docs = tavily_search.run(query)
+        max_results = max_results or settings().max_search_results
+        logger.info("Performing search for query: %s", query)
+
+        def search() -> list:
+            # Imported on first search; the Tavily tool pulls in most of langchain_community
+            from langchain_community.tools.tavily_search.tool import TavilySearchResults
+            load_environment()
+            tavily_search = TavilySearchResults(max_results=max_results)
+            return tavily_search.run(query)
+
+        # Recorded or replayed at the provider boundary when RECIPE_RECORD_MODE is set
+        search_docs = recorded_call("tavily", {"query": query, "max_results": max_results}, search)
         return [
             {
                 "name": doc.get("title", "Unknown Dish"),
@@ -66,29 +108,59 @@ class RecipeRetriever:
             for doc in search_docs
         ]
 
+    @staticmethod
+    def _add_pages(recipes: List[Dict]) -> List[Dict]:
+        """Download the result pages concurrently and attach their text and recipe markup."""
+        try:
+            pages = get_page_fetcher().fetch_all([recipe["url"] for recipe in recipes])
+        except Exception as e:
+            logger.warning("Page fetching failed, using search snippets: %s", e)
+            return recipes
+        logger.info("Fetched %s of %s result pages", sum(1 for page in pages.values() if page), len(recipes))
+        enriched = []
+        for recipe in recipes:
+            page = pages.get(recipe["url"])
+            if page:
+                recipe = {**recipe, "page_content": page["text"]}
+                if page.get("schema_recipes"):
+                    recipe["schema_recipes"] = page["schema_recipes"]
+            enriched.append(recipe)
+        return enriched
+
     @staticmethod
     def retrieve(state: RecipeState) -> RecipeState:
         try:
             logger.info("Starting recipe retrieval")
             query = state.get("query", "")
+            current = settings()
+            # A refinement only searches for the shortfall left after local filtering
+            max_results = state.get("search_limit") or current.max_search_results
+            # Ask for a few extra results to replace the duplicates dropped below
+            search_results = max_results + current.dedup_overfetch if current.dedup_enabled else max_results
             
             if not query:
                 logger.error("No query provided")
                 state['recipes'] = []
                 return state
             
-            # Try to use Streamlit caching if available, otherwise just call directly
-            try:
-                formatted_search_recipes = st.cache_data(ttl=3600)(RecipeRetriever._search_recipes)(query)
-            except (NameError, RuntimeError):
-                # Not in Streamlit context, call directly
-                formatted_search_recipes = RecipeRetriever._search_recipes(query)
+            # Shared cache, so every app process benefits from each search
+            formatted_search_recipes = cached_call(
+                "search", RecipeRetriever._search_recipes, query, search_results, ttl=current.cache_ttl_seconds
+            )
+            if current.dedup_enabled:
+                formatted_search_recipes = deduplicate(formatted_search_recipes, limit=max_results)
+            else:
+                formatted_search_recipes = formatted_search_recipes[:max_results]
             
-            state['recipes'] = formatted_search_recipes
-            logger.info(f"Retrieved {len(formatted_search_recipes)} recipes")
+            if page_fetch_enabled():
+                formatted_search_recipes = RecipeRetriever._add_pages(formatted_search_recipes)
+            
+            # Keep recipe bodies in the process store; state only holds references
+            state['recipes'] = [recipe_store.put(recipe) for recipe in formatted_search_recipes]
+            logger.info("Retrieved %s recipes", len(formatted_search_recipes))
             return state
         except Exception as e:
-            logger.error(f"Error in recipe retrieval: {str(e)}")
+            logger.error("Error in recipe retrieval: %s", e)
             state['recipes'] = []
             return state
 
@@ -96,17 +168,91 @@ class RecipeKeyFeatures:
     """Extracts key features from the retrieved recipes."""
 
     @staticmethod
-    def _extract_features(recipes_str: str) -> List[RecipeFeature]:
-        """Extraction function that extracts key features from recipes."""
+    def _extract_features(recipes_str: str, count: int = 0, timeout: Optional[float] = None) -> List[RecipeFeature]:
+        """Extraction function that extracts key features from recipes.
+
+        With extraction_batching on, requests that say how many recipes they hold
+        are merged with those of other sessions into a single LLM call. A
+        timeout bounds the wait, so a worker is not held past its caller's deadline.
+        """
+        if settings().extraction_batching and count:
+            features, tokens = RecipeKeyFeatures._batcher().submit((recipes_str, count)).result(timeout=timeout)
+            TurnBudget.charge_tokens(tokens)
+            return features
+
         logger.info("Performing feature extraction")
-        llm = ChatOpenAI(model=MODEL_NAME, temperature=TEMPERATURE)
-        structured_llm = llm.with_structured_output(ResponseRecipeKeyFeatures)
-        key_features = structured_llm.invoke([
+        key_features = ModelRouter.invoke_structured("extract_key_features", ResponseRecipeKeyFeatures, [
             SystemMessage(content=RECIPE_FEATURES_INSTRUCTIONS),
             HumanMessage(content=recipes_str)
-        ])
+        ], timeout=timeout)
         return key_features.results
 
+    @staticmethod
+    def _batcher() -> MicroBatcher:
+        """Return the process-wide extraction batcher, sized by the current settings."""
+        global _extraction_batcher
+        current = settings()
+        with _extraction_batcher_lock:
+            if _extraction_batcher is None:
+                _extraction_batcher = MicroBatcher(
+                    RecipeKeyFeatures._extract_batch,
+                    window_seconds=current.extraction_batch_window_seconds,
+                    max_batch_size=current.extraction_batch_max_size,
+                    name="extract-batch"
+                )
+            # The batcher reads both on every batch, so a reload applies to the next one
+            _extraction_batcher.window_seconds = current.extraction_batch_window_seconds
+            _extraction_batcher.max_batch_size = current.extraction_batch_max_size
+            return _extraction_batcher
+
+    @staticmethod
+    def _invoke_extraction(node: str, recipes_str: str) -> Tuple[List[RecipeFeature], int]:
+        """Run one extraction call and return its features and token usage."""
+        usage: Dict[str, Any] = {}
+        with TurnBudget.track_tokens(usage):
+            key_features = ModelRouter.invoke_structured(node, ResponseRecipeKeyFeatures, [
+                SystemMessage(content=RECIPE_FEATURES_INSTRUCTIONS),
+                HumanMessage(content=recipes_str)
+            ])
+        return key_features.results, usage.get('tokens_used', 0)
+
+    @staticmethod
+    def _extract_batch(jobs: List[Tuple[str, int]]) -> List[Tuple[List[RecipeFeature], int]]:
+        """Extract features for several requests in one call and split the results.
+
+        Each job is (recipes_str, recipe count); tokens are shared out by
+        recipe count. If the model does not return one entry per recipe, the
+        jobs are extracted one by one instead.
+        """
+        logger.info("Performing batched feature extraction for %s requests", len(jobs))
+        total = sum(count for _, count in jobs)
+        features, tokens = RecipeKeyFeatures._invoke_extraction(
+            "extract_key_features_batch", "\n\n".join(recipes_str for recipes_str, _ in jobs)
+        )
+        if len(jobs) > 1 and len(features) != total:
+            logger.warning("Batched extraction returned %s entries for %s recipes, extracting separately", len(features), total)
+            return [RecipeKeyFeatures._invoke_extraction("extract_key_features", recipes_str) for recipes_str, _ in jobs]
+
+        results = []
+        offset = 0
+        for _, count in jobs:
+            share = tokens * count // total if total else 0
+            results.append((features[offset:offset + count], share))
+            offset += count
+        if len(jobs) == 1:
+            results[0] = (features, tokens)
+        return results
+
+    @staticmethod
+    def _cached_extract_features(recipes_str: str, count: int = 0, timeout: Optional[float] = None) -> List[RecipeFeature]:
+        """Run the LLM extraction through the shared cache."""
+        return cached_call(
+            "extract",
+            lambda text: RecipeKeyFeatures._extract_features(text, count, timeout),
+            recipes_str,
+            ttl=settings().cache_ttl_seconds
+        )
+
     @staticmethod
     def extract(state: RecipeState) -> RecipeState:
         try:
@@ -117,27 +263,114 @@ class RecipeKeyFeatures:
                 state['key_features'] = []
                 return state
             
+            recipes = [recipe_store.resolve(recipe) for recipe in state['recipes']]
+            
+            # Pages with schema.org Recipe markup need no model call
+            structured = [StructuredDataExtractor.extract(recipe) for recipe in recipes]
+            unstructured = [recipe for recipe, feature in zip(recipes, structured) if feature is None]
+            
             # Convert recipes to a string for caching
             formatted_docs = "\n\n".join([
                 f"Recipe: {doc['name']}\nContent: {doc['content']}"
-                for doc in state['recipes']
+                for doc in unstructured
             ])
             
-            # Try to use Streamlit caching if available, otherwise just call directly
-            try:
-                features = st.cache_data(ttl=3600)(RecipeKeyFeatures._extract_features)(formatted_docs)
-            except (NameError, RuntimeError):
-                # Not in Streamlit context, call directly
-                features = RecipeKeyFeatures._extract_features(formatted_docs)
+            # Local extraction is cheap, so it is always ready as a fallback
+            heuristic_features, confidence = HeuristicFeatureExtractor.extract_all(unstructured)
+            current = settings()
+            upgrade = None
+            
+            if not unstructured:
+                logger.info("Using schema.org markup for all recipes")
+                features, source = [], "structured"
+            elif current.heuristic_only_confidence is not None and confidence >= current.heuristic_only_confidence:
+                logger.info("Using local extraction (confidence %s)", confidence)
+                features, source = heuristic_features, "heuristic"
+            elif state.get('early_features'):
+                # Show the local features now; the UI swaps in the LLM result when it is ready
+                logger.info("Using local extraction until the LLM result is ready")
+                features, source = heuristic_features, "heuristic"
+                upgrade = RecipeKeyFeatures._start_upgrade(formatted_docs, [recipe['url'] for recipe in unstructured])
+            else:
+                with TurnBudget.track_tokens(state):
+                    # Copy the context so token tracking sees the worker's LLM calls
+                    future = _get_extraction_executor().submit(
+                        contextvars.copy_context().run,
+                        RecipeKeyFeatures._cached_extract_features,
+                        formatted_docs,
+                        len(unstructured),
+                        current.extraction_timeout_seconds
+                    )
+                    try:
+                        features, source = future.result(timeout=current.extraction_timeout_seconds), "llm"
+                    except Exception as e:
+                        # Queued work is dropped; a running call ends at the same deadline
+                        future.cancel()
+                        logger.warning("LLM extraction failed or timed out, using local extraction: %s", str(e) or type(e).__name__)
+                        features, source = heuristic_features, "heuristic"
             
-            state['key_features'] = features
+            if len(features) != len(unstructured):
+                # Features that do not line up with their recipes would be shown against the wrong ones
+                logger.warning("Extracted %s features for %s recipes without markup, using local extraction", len(features), len(unstructured))
+                features, source = heuristic_features, "heuristic"
+            extracted = iter(features)
+            features = [feature or next(extracted) for feature in structured]
+            
+            state['key_features'] = [FeatureRecord.from_feature(feature) for feature in features]
+            state['feature_source'] = source
+            state['feature_upgrade'] = upgrade
+            if len(state['key_features']) == len(recipes):
+                # Extracted recipes become candidates for "more like this" suggestions
+                from recipe_app.services.recommender import recommender
+                recommender.add_all(recipes, state['key_features'])
+            TurnBudget.end_cycle(state)
+            ResultRefiner.update_pool(state)
+            if state.get("refinement"):
+                ResultRefiner.merge_kept(state)
             logger.info("Feature extraction completed")
             return state
         except Exception as e:
-            logger.error(f"Error in feature extraction: {str(e)}")
-            state['key_features'] = []
+            logger.error("Error in feature extraction: %s", e)
+            try:
+                recipes = [recipe_store.resolve(recipe) for recipe in state.get('recipes', [])]
+                features, _ = HeuristicFeatureExtractor.extract_all(recipes)
+                state['key_features'] = [FeatureRecord.from_feature(feature) for feature in features]
+                state['feature_source'] = "heuristic"
+            except Exception:
+                state['key_features'] = []
+            state['feature_upgrade'] = None
             return state
 
+    @staticmethod
+    def _start_upgrade(recipes_str: str, urls: List[str]) -> Dict[str, Any]:
+        """Run the LLM extraction in the background and return the upgrade the UI polls."""
+        key = fingerprint("extract", recipes_str)
+        # Sessions showing the same recipes share the job, and the result lands in the cache
+        job_runner.submit(key, lambda job: RecipeKeyFeatures._cached_extract_features(recipes_str, len(urls)), "extract")
+        return {"job": key, "urls": urls}
+
+    @staticmethod
+    def upgraded(recipes: List[Dict], key_features: List[FeatureRecord],
+                 upgrade: Dict[str, Any]) -> Optional[Tuple[List[FeatureRecord], str]]:
+        """Return the features and their source once a background extraction has finished.
+
+        Returns None while the job runs. Features are matched to recipes by URL,
+        so results merged or reordered since then keep theirs. If the job failed,
+        expired or does not line up with its recipes, the local features stay.
+        """
+        job = job_runner.get(upgrade['job'])
+        if job is not None and not job.done:
+            return None
+        if job is None or job.status == FAILED or len(job.result) != len(upgrade['urls']):
+            logger.warning("Keeping local features, the LLM extraction did not complete")
+            return key_features, "heuristic"
+        extracted = dict(zip(upgrade['urls'], job.result))
+        features = [
+            FeatureRecord.from_feature(extracted[recipe['url']]) if recipe['url'] in extracted else feature
+            for recipe, feature in zip(recipes, key_features)
+        ]
+        return features, "llm"
+
 class HumanFeedback:
     """Processes user feedback on recipes."""
 
@@ -149,7 +382,7 @@ class HumanFeedback:
             # Get user feedback from state
             user_feedback = state.get("feedback")
             
-            # If no feedback provided, this is the first pass - just set defaults and end
+            # If the thread was resumed without feedback, just set defaults and end
             if not user_feedback:
                 if 'recipes_index' not in state:
                     state['recipes_index'] = -1
@@ -158,8 +391,8 @@ class HumanFeedback:
                 logger.info("No feedback to process - ending current iteration")
                 return state
 
-            # We have feedback - process it
-            llm = ChatOpenAI(model=MODEL_NAME, temperature=TEMPERATURE)
+            # We have feedback - process it as a new turn
+            TurnBudget.begin_turn(state)
             system_message = SystemMessage(content=f"""
             Process the user feedback on the suggested recipes:
             Current recipes: {state.get('key_features', [])}
@@ -171,28 +404,136 @@ class HumanFeedback:
             3. Be strict about recipe selection - only set 'like' if there's clear positive feedback.
             """)
 
-            structured_llm = llm.with_structured_output(HumanSelection)
-            classification = structured_llm.invoke([system_message])
+            with TurnBudget.track_tokens(state):
+                classification = ModelRouter.invoke_structured("human_feedback", HumanSelection, [system_message])
 
             if classification.like is not None:
                 state['recipes_index'] = classification.like
-                logger.info(f"User selected recipe {classification.like}")
+                logger.info("User selected recipe %s", classification.like)
             else:
                 state['recipes_index'] = -1
                 state["messages"] = [HumanMessage(content=classification.dislike)]
-                logger.info(f"User requested modifications: {classification.dislike}")
+                # Only the user's own words become constraints, not the model's paraphrase
+                state['refinement'] = user_feedback
+                logger.info("User requested modifications: %s", classification.dislike)
             
             # Clear feedback after processing to prevent loops
             state["feedback"] = None
             state['feedback_processed'] = True
             return state
         except Exception as e:
-            logger.error(f"Error in feedback processing: {str(e)}")
+            logger.error("Error in feedback processing: %s", e)
             if 'recipes_index' not in state:
                 state['recipes_index'] = -1
             state['feedback_processed'] = True
             return state
 
+class ResultRefiner:
+    """Applies constraint-style feedback to results already fetched in this conversation."""
+
+    @staticmethod
+    def _entries(recipes: List[Dict], features: List) -> List[Dict]:
+        """Pair recipes with their extracted features."""
+        return [
+            {"recipe": recipe, "feature": feature}
+            for recipe, feature in zip(recipes or [], features or [])
+        ]
+
+    @staticmethod
+    def _unique(entries: List[Dict]) -> List[Dict]:
+        """Drop entries whose recipe URL was already seen, keeping the first occurrence."""
+        seen = set()
+        unique = []
+        for entry in entries:
+            url = canonical_url(entry["recipe"].get("url") or "")
+            if url in seen:
+                continue
+            seen.add(url)
+            unique.append(entry)
+        return unique
+
+    @staticmethod
+    def update_pool(state: RecipeState) -> None:
+        """Add the current results to the conversation's recipe pool."""
+        current = ResultRefiner._entries(state.get('recipes'), state.get('key_features'))
+        pool = ResultRefiner._unique(current + list(state.get('recipe_pool') or []))
+        state['recipe_pool'] = pool[:settings().recipe_pool_size]
+
+    @staticmethod
+    def merge_kept(state: RecipeState) -> None:
+        """Combine locally kept results with those fetched for the shortfall."""
+        constraints = parse_constraints(state.get('refinement'))
+        fetched = ResultRefiner._entries(state.get('recipes'), state.get('key_features'))
+        # Only show new results that pass the constraint, unless nothing does
+        merged = ResultRefiner._unique(list(state.get('kept_results') or []) + rank(fetched, constraints))
+        if not merged:
+            merged = fetched
+        merged = merged[:settings().max_search_results]
+
+        state['recipes'] = [entry["recipe"] for entry in merged]
+        state['key_features'] = [entry["feature"] for entry in merged]
+        state['refinement'] = None
+        state['kept_results'] = []
+        state['search_limit'] = 0
+        logger.info("Merged %s results after refinement", len(merged))
+
+    @staticmethod
+    def _stop(state: RecipeState, matches: List[Dict]) -> None:
+        """Finish the refinement with the given matches, or the current results if none."""
+        if matches:
+            matches = matches[:settings().max_search_results]
+            state['recipes'] = [entry["recipe"] for entry in matches]
+            state['key_features'] = [entry["feature"] for entry in matches]
+        state['refinement'] = None
+        state['kept_results'] = []
+        state['search_limit'] = 0
+
+    @staticmethod
+    def refine(state: RecipeState) -> RecipeState:
+        try:
+            logger.info("Refining existing results locally")
+            constraints = parse_constraints(state.get('refinement'))
+
+            if constraints.is_empty():
+                # Not a constraint we can check locally - fall back to a full new search
+                logger.info("No local constraints found - running a new search")
+                state['kept_results'] = []
+                state['search_limit'] = 0
+                if not TurnBudget.allow_cycle(state):
+                    ResultRefiner._stop(state, [])
+                return state
+
+            candidates = ResultRefiner._unique(
+                ResultRefiner._entries(state.get('recipes'), state.get('key_features'))
+                + list(state.get('recipe_pool') or [])
+            )
+            matches = rank(candidates, constraints)
+            max_results = settings().max_search_results
+
+            if len(matches) >= max_results:
+                ResultRefiner._stop(state, matches)
+                logger.info("Refinement satisfied from existing results")
+            elif not TurnBudget.allow_cycle(state):
+                # Out of budget - show what already matches instead of searching again
+                ResultRefiner._stop(state, matches)
+            else:
+                state['kept_results'] = matches
+                state['search_limit'] = max_results - len(matches)
+                logger.info("Kept %s results, searching for %s more", len(matches), state['search_limit'])
+            return state
+        except Exception as e:
+            logger.error("Error in local refinement: %s", e)
+            state['kept_results'] = []
+            state['search_limit'] = 0
+            return state
+
+    @staticmethod
+    def next_step(state: RecipeState) -> str:
+        """Search again only if local refinement left a shortfall."""
+        if state.get('refinement'):
+            return "translate_query"
+        return "human_feedback"
+
 class Satisfaction:
     """Determines if the user is satisfied with the recipe selection."""
 
@@ -204,7 +545,7 @@ class Satisfaction:
             
             # Check if a recipe was selected
             if recipes_index >= 0:
-                logger.info(f"User satisfied with recipe {recipes_index}")
+                logger.info("User satisfied with recipe %s", recipes_index)
                 return END
             
             # Check if we have actual user feedback to process
@@ -212,14 +553,22 @@ class Satisfaction:
             
             # If we have explicit feedback, restart the query
             if has_feedback:
+                if TurnBudget.exhausted(state):
+                    logger.info("Budget exhausted - ending current iteration")
+                    return END
                 logger.info("Processing user feedback - restarting query")
                 return "translate_query"
+
+            # Constraint-style feedback is applied to existing results first
+            if state.get('refinement'):
+                logger.info("Refining results with user feedback")
+                return "refine_results"
             
             # Default: end if no feedback
             logger.info("No feedback - ending current iteration")
             return END
                 
         except Exception as e:
-            logger.error(f"Error in satisfaction check: {str(e)}")
+            logger.error("Error in satisfaction check: %s", e)
             # On error, end current iteration
             return END 
\ No newline at end of file
@@ -0,0 +1,148 @@
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable, Optional, Set
+
+from recipe_app.config.settings import settings
+from recipe_app.services.cache import InMemoryCache, get_cache_backend, make_key, dumps, loads
+
+logger = logging.getLogger(__name__)
+
+# Fields kept in graph and session state; everything else lives in the store
+REFERENCE_FIELDS = ("id", "name", "url")
+
+
+def _shared_backend():
+    """Return the cache backend if it is shared between processes, else None.
+
+    A per-process memory backend would only hold a second copy of each body.
+    """
+    backend = get_cache_backend()
+    return None if isinstance(backend, InMemoryCache) else backend
+
+
+def _from_corpus(rid: str) -> Optional[Dict]:
+    """Read a recipe from the published corpus snapshot, if there is one."""
+    # Imported here so numpy is only loaded once a recipe misses the store
+    from recipe_app.services.corpus import corpus
+    snapshot = corpus.current()
+    return snapshot.get(rid) if snapshot is not None else None
+
+
+def recipe_id(url: str) -> str:
+    """Return a short stable ID for a recipe URL."""
+    return hashlib.sha1(url.encode("utf-8")).hexdigest()[:16]
+
+
+class RecipeStore:
+    """Per-process store of recipe bodies, interned by recipe ID.
+
+    Graph state, checkpoints and session state only hold small references
+    ({"id", "name", "url"}); the body of each recipe is kept once per process.
+    Entries evicted from the process are re-read from the published corpus
+    snapshot, then from the shared cache backend, which is also how other
+    processes resolve references they did not fetch. Recipes a session still
+    shows (favorites, the selected recipe) are pinned so that eviction cannot
+    empty them when there is nowhere to re-read them from.
+    """
+
+    def __init__(self, max_entries: Optional[int] = None):
+        # None follows the recipe_store_max_entries setting
+        self._max_entries = max_entries
+        self._recipes: "OrderedDict[str, Dict]" = OrderedDict()
+        self._pinned: Dict[str, Dict] = {}
+        self._pins: Dict[str, Set[str]] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._recipes)
+
+    @property
+    def max_entries(self) -> int:
+        return self._max_entries if self._max_entries is not None else settings().recipe_store_max_entries
+
+    def put(self, recipe: Dict) -> Dict:
+        """Intern a full recipe and return its reference."""
+        rid = recipe.get("id") or recipe_id(recipe["url"])
+        full = {**recipe, "id": rid}
+        with self._lock:
+            existing = self._recipes.get(rid)
+            is_new = existing is None or existing != full
+            if is_new:
+                self._recipes[rid] = full
+                if rid in self._pinned:
+                    self._pinned[rid] = full
+            self._recipes.move_to_end(rid)
+            while len(self._recipes) > self.max_entries:
+                self._recipes.popitem(last=False)
+        backend = _shared_backend() if is_new else None
+        if backend is not None:
+            try:
+                backend.set(make_key("recipe", rid), dumps(full), settings().recipe_store_ttl_seconds)
+            except Exception as e:
+                logger.warning("Could not share recipe %s: %s", rid, e)
+        return {field: full.get(field) for field in REFERENCE_FIELDS}
+
+    def get(self, rid: str) -> Optional[Dict]:
+        """Return the full recipe for an ID, or None if no process has it any more."""
+        with self._lock:
+            recipe = self._recipes.get(rid)
+            if recipe is not None:
+                self._recipes.move_to_end(rid)
+                return recipe
+            recipe = self._pinned.get(rid)
+            if recipe is not None:
+                return recipe
+        recipe = _from_corpus(rid)
+        if recipe is None:
+            recipe = self._from_backend(rid)
+        if recipe is None:
+            return None
+        with self._lock:
+            self._recipes[rid] = recipe
+            while len(self._recipes) > self.max_entries:
+                self._recipes.popitem(last=False)
+        return recipe
+
+    def pin(self, owner: str, refs: Iterable[Dict]) -> None:
+        """Keep the recipes an owner (e.g. a session) refers to, replacing its earlier pins."""
+        rids = {ref["id"] for ref in refs if ref and ref.get("id")}
+        with self._lock:
+            previous = self._pins.get(owner, set())
+        bodies = {rid: self.get(rid) for rid in rids - previous}
+        with self._lock:
+            previous = self._pins.pop(owner, set())
+            if rids:
+                self._pins[owner] = rids
+            for rid, recipe in bodies.items():
+                if recipe is not None:
+                    self._pinned[rid] = recipe
+            held = set().union(*self._pins.values())
+            for rid in previous - held:
+                self._pinned.pop(rid, None)
+
+    def release(self, owner: str) -> None:
+        """Drop an owner's pins, e.g. when its session has closed."""
+        self.pin(owner, [])
+
+    def _from_backend(self, rid: str) -> Optional[Dict]:
+        backend = _shared_backend()
+        if backend is None:
+            return None
+        try:
+            data = backend.get(make_key("recipe", rid))
+        except Exception as e:
+            logger.warning("Could not read shared recipe %s: %s", rid, e)
+            return None
+        return None if data is None else loads(data)
+
+    def resolve(self, recipe: Dict) -> Dict:
+        """Return the full recipe for a reference (full recipes are returned as is)."""
+        if "content" in recipe or not recipe.get("id"):
+            return recipe
+        return self.get(recipe["id"]) or {**recipe, "content": ""}
+
+
+# Process-wide store shared by every session
+recipe_store = RecipeStore()
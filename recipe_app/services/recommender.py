@@ -0,0 +1,267 @@
+import os
+import re
+import logging
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+from recipe_app.config.config import RECOMMEND_INGREDIENT_WEIGHT
+from recipe_app.config.settings import settings
+from recipe_app.services.recipe_store import REFERENCE_FIELDS, recipe_id
+
+logger = logging.getLogger(__name__)
+
+WORD = re.compile(r"[a-z]{3,}")
+# Words that say nothing about what a dish is like
+STOP_WORDS = {"and", "the", "with", "for", "recipe", "recipes", "easy", "best", "fresh", "style"}
+# Corpus rows added per hold of the query lock
+INDEX_CHUNK = 1000
+
+
+def _field(feature: Any, name: str) -> Any:
+    if isinstance(feature, dict):
+        return feature.get(name)
+    return getattr(feature, name, None)
+
+
+def recipe_terms(recipe: Dict[str, Any], feature: Any = None,
+                 ingredient_weight: float = RECOMMEND_INGREDIENT_WEIGHT) -> Dict[str, float]:
+    """Term frequencies of a recipe: whole ingredients, plus the words of its ingredients, name and style."""
+    terms: Dict[str, float] = {}
+    ingredients = [ingredient.strip().lower() for ingredient in (_field(feature, "key_ingredients") or []) if ingredient]
+    for ingredient in ingredients:
+        terms["i:" + ingredient] = ingredient_weight
+    text = " ".join(ingredients + [_field(feature, "dish_name") or recipe.get("name") or "",
+                                   _field(feature, "cooking_style") or ""])
+    for word in WORD.findall(text.lower()):
+        if word not in STOP_WORDS:
+            terms["w:" + word] = terms.get("w:" + word, 0.0) + 1.0
+    return terms
+
+
+class RecipeRecommender:
+    """"More like this" ranking of known recipes against a user's favorites.
+
+    Recipes are rows of a sparse TF-IDF matrix over ingredient and word
+    terms, kept as CSR arrays (row offsets, column indices, frequencies).
+    Adding a recipe appends a row; re-adding one retires its old row, and
+    retired rows are dropped once they are half the matrix. IDF weights and
+    row norms are recomputed with a few vectorized passes on the next query
+    after a change, and every query is a sparse-dense product over all rows
+    at once, so it takes milliseconds and makes no network call.
+
+    Recipes come from extraction results in this process and from the
+    published corpus snapshot. A query that sees a new generation starts
+    indexing its new segments on a background thread and is answered from
+    the rows indexed so far; segments merged from already indexed ones are
+    skipped.
+    """
+
+    def __init__(self, max_recipes: Optional[int] = None, ingredient_weight: float = RECOMMEND_INGREDIENT_WEIGHT,
+                 use_corpus: bool = True):
+        # None follows the recommend_max_recipes setting
+        self._max_recipes = max_recipes
+        self.ingredient_weight = ingredient_weight
+        self.use_corpus = use_corpus
+        self._terms: Dict[str, int] = {}
+        self._refs: List[Dict[str, Any]] = []
+        self._rows: Dict[str, int] = {}
+        self._signatures: Dict[str, int] = {}
+        self._alive: List[bool] = []
+        # CSR rows added since the last query, merged in by _prepare
+        self._pending_indices: List[int] = []
+        self._pending_tf: List[float] = []
+        self._pending_lengths: List[int] = []
+        self._indptr = np.zeros(1, dtype=np.int64)
+        self._indices = np.zeros(0, dtype=np.int32)
+        self._tf = np.zeros(0, dtype=np.float32)
+        self._weights: Optional[np.ndarray] = None
+        self._row_of = np.zeros(0, dtype=np.int64)
+        self._corpus_segments: set = set()
+        self._corpus_name: Optional[str] = None
+        self._indexer: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        # Serializes corpus indexing; held without the query lock while rows are read
+        self._index_lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    @property
+    def max_recipes(self) -> int:
+        return self._max_recipes if self._max_recipes is not None else settings().recommend_max_recipes
+
+    def add(self, recipe: Dict[str, Any], feature: Any = None) -> None:
+        """Index a recipe (full or reference) with its features; replaces an earlier version."""
+        rid = recipe.get("id") or recipe_id(recipe["url"])
+        terms = recipe_terms(recipe, feature, self.ingredient_weight)
+        with self._lock:
+            self._add_locked(rid, {**{field: recipe.get(field) for field in REFERENCE_FIELDS}, "id": rid}, terms)
+
+    def add_all(self, recipes: Sequence[Dict[str, Any]], features: Sequence[Any]) -> None:
+        """Index search results with the features extracted for them, in the same order."""
+        for recipe, feature in zip(recipes, features):
+            self.add(recipe, feature)
+
+    def _add_locked(self, rid: str, ref: Dict[str, Any], terms: Dict[str, float]) -> None:
+        signature = hash(frozenset(terms.items()))
+        previous = self._rows.get(rid)
+        if previous is not None and self._signatures.get(rid) == signature:
+            # Feedback loops extract the same recipes again
+            return
+        self._signatures[rid] = signature
+        if previous is not None:
+            self._alive[previous] = False
+        self._rows[rid] = len(self._refs)
+        self._refs.append(ref)
+        self._alive.append(True)
+        for term, tf in terms.items():
+            column = self._terms.setdefault(term, len(self._terms))
+            self._pending_indices.append(column)
+            self._pending_tf.append(tf)
+        self._pending_lengths.append(len(terms))
+        self._weights = None
+
+    def _sync_corpus(self) -> None:
+        """Start indexing a newly published corpus generation in the background."""
+        if not self.use_corpus:
+            return
+        from recipe_app.services.corpus import corpus
+        snapshot = corpus.current()
+        if snapshot is None or snapshot.name == self._corpus_name:
+            return
+        self._corpus_name = snapshot.name
+        self._indexer = threading.Thread(target=self.index_corpus, args=(snapshot,), name="recommender-corpus", daemon=True)
+        self._indexer.start()
+
+    def index_corpus(self, snapshot: Any = None) -> int:
+        """Index the rows of corpus segments not seen yet, oldest segment first; returns the rows read.
+
+        Rows are read without the query lock and added in chunks of
+        INDEX_CHUNK. A merged segment whose sources were all indexed holds
+        no new rows and is skipped.
+        """
+        from recipe_app.services.corpus import TEXT_FIELDS, corpus
+        snapshot = snapshot if snapshot is not None else corpus.current()
+        if snapshot is None:
+            return 0
+        read = 0
+        with self._index_lock:
+            with self._lock:
+                self._corpus_name = snapshot.name
+            merged = snapshot.manifest.get("merged", {})
+            terms = None
+            for segment in snapshot.segments:
+                if segment.path in self._corpus_segments:
+                    continue
+                directory, name = os.path.split(segment.path)
+                sources = merged.get(name)
+                if sources and all(os.path.join(directory, source) in self._corpus_segments for source in sources):
+                    self._corpus_segments.add(segment.path)
+                    continue
+                terms = terms if terms is not None else snapshot.vocabulary.terms()
+                rows = []
+                for row, raw in enumerate(segment.ids):
+                    fields = {field: segment.field(row, index) for index, field in enumerate(TEXT_FIELDS)}
+                    feature = {
+                        "dish_name": fields["dish_name"],
+                        "key_ingredients": [terms[int(term_id)] for term_id in segment.ingredient_ids(row)],
+                        "cooking_style": fields["cooking_style"],
+                    }
+                    rid = raw.decode("ascii")
+                    rows.append((rid, {"id": rid, "name": fields["name"], "url": fields["url"]},
+                                 recipe_terms(fields, feature, self.ingredient_weight)))
+                for start in range(0, len(rows), INDEX_CHUNK):
+                    with self._lock:
+                        for rid, ref, row_terms in rows[start:start + INDEX_CHUNK]:
+                            self._add_locked(rid, ref, row_terms)
+                self._corpus_segments.add(segment.path)
+                read += len(rows)
+        if read:
+            logger.info("Indexed %s corpus recipes for recommendations", read)
+        return read
+
+    def _prepare(self) -> None:
+        """Merge new rows, drop retired ones if needed, and recompute TF-IDF weights."""
+        if self._pending_lengths:
+            self._indptr = np.concatenate([self._indptr, self._indptr[-1] + np.cumsum(self._pending_lengths)])
+            self._indices = np.concatenate([self._indices, np.array(self._pending_indices, dtype=np.int32)])
+            self._tf = np.concatenate([self._tf, np.array(self._pending_tf, dtype=np.float32)])
+            self._pending_indices, self._pending_tf, self._pending_lengths = [], [], []
+        if self._weights is not None:
+            return
+        alive = np.array(self._alive, dtype=bool)
+        max_recipes = self.max_recipes
+        if len(self._rows) > max_recipes:
+            # Keep the most recently added recipes
+            for row in np.flatnonzero(alive)[:len(self._rows) - max_recipes]:
+                alive[row] = self._alive[row] = False
+                del self._rows[self._refs[row]["id"]]
+                self._signatures.pop(self._refs[row]["id"], None)
+        if alive.size and alive.sum() * 2 < alive.size:
+            self._compact(alive)
+            alive = np.ones(len(self._refs), dtype=bool)
+        self._row_of = np.repeat(np.arange(len(self._refs)), np.diff(self._indptr))
+        live = alive[self._row_of]
+        df = np.bincount(self._indices[live], minlength=len(self._terms))
+        idf = np.log((1 + alive.sum()) / (1 + df)) + 1
+        weights = self._tf * idf[self._indices] * live
+        norms = np.sqrt(np.bincount(self._row_of, weights ** 2, minlength=len(self._refs)))
+        norms[norms == 0] = 1
+        self._weights = weights / norms[self._row_of]
+
+    def _compact(self, alive: np.ndarray) -> None:
+        keep = np.flatnonzero(alive)
+        lengths = np.diff(self._indptr)[keep]
+        nnz = np.repeat(alive, np.diff(self._indptr))
+        self._indices, self._tf = self._indices[nnz], self._tf[nnz]
+        self._indptr = np.concatenate([[0], np.cumsum(lengths)]).astype(np.int64)
+        self._refs = [self._refs[row] for row in keep]
+        self._alive = [True] * len(keep)
+        self._rows = {ref["id"]: row for row, ref in enumerate(self._refs)}
+
+    def _profiles(self, favorites: Sequence[Iterable[str]]) -> np.ndarray:
+        """One unit-length term vector per user: the sum of their favorites' rows."""
+        profiles = np.zeros((len(favorites), len(self._terms)), dtype=np.float64)
+        for user, ids in enumerate(favorites):
+            rows = [self._rows[rid] for rid in ids if rid in self._rows]
+            if not rows:
+                continue
+            nnz = np.concatenate([np.arange(self._indptr[row], self._indptr[row + 1]) for row in rows])
+            profiles[user] = np.bincount(self._indices[nnz], self._weights[nnz], minlength=len(self._terms))
+        norms = np.linalg.norm(profiles, axis=1, keepdims=True)
+        return profiles / np.where(norms == 0, 1, norms)
+
+    def recommend_many(self, favorites: Sequence[Sequence[Dict[str, Any]]], count: Optional[int] = None) -> List[List[Dict[str, Any]]]:
+        """Top ``count`` recipe references for each user's favorites, scored in one batch."""
+        count = count if count is not None else settings().recommend_count
+        with self._lock:
+            self._sync_corpus()
+            self._prepare()
+            ids = [[favorite.get("id") or recipe_id(favorite["url"]) for favorite in user] for user in favorites]
+            profiles = self._profiles(ids)
+            rows = len(self._refs)
+            # Cosine similarity of every row to every profile: (users x terms) times the sparse
+            # (rows x terms) matrix, summed per row with one bincount over all users
+            contributions = profiles[:, self._indices] * self._weights
+            flat_rows = self._row_of + rows * np.arange(len(favorites))[:, None]
+            scores = np.bincount(flat_rows.ravel(), contributions.ravel(), minlength=rows * len(favorites))
+            scores = scores.reshape(len(favorites), rows)
+
+            results = []
+            for user, user_ids in enumerate(ids):
+                user_scores = scores[user]
+                user_scores[[self._rows[rid] for rid in user_ids if rid in self._rows]] = 0
+                top = np.argpartition(-user_scores, min(count, rows) - 1)[:count] if rows and count > 0 else []
+                ranked = sorted((row for row in top if user_scores[row] > 0), key=lambda row: -user_scores[row])
+                results.append([{**self._refs[row], "score": round(float(user_scores[row]), 4)} for row in ranked])
+            return results
+
+    def recommend(self, favorites: Sequence[Dict[str, Any]], count: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Top ``count`` recipe references similar to one user's favorites."""
+        return self.recommend_many([favorites], count)[0] if favorites else []
+
+
+# Process-wide index shared by every session
+recommender = RecipeRecommender()
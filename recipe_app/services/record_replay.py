@@ -0,0 +1,253 @@
+import os
+import json
+import time
+import base64
+import logging
+import threading
+from typing import Any, Callable, Dict, List, Optional
+
+from recipe_app.config.config import RECORD_MODE, CASSETTE_DIR, REPLAY_LATENCY, load_environment
+from recipe_app.services.cache import make_key
+
+logger = logging.getLogger(__name__)
+
+# RECIPE_RECORD_MODE values: pass traffic through, save it to the cassette, or answer from it
+RECORD_MODES = ("off", "record", "replay")
+
+# Response headers kept in cassettes; the rest may carry account details
+RECORDED_HEADERS = ("content-type", "content-encoding")
+
+
+class CassetteMissError(LookupError):
+    """Raised in replay mode when a request was never recorded."""
+
+
+def record_mode() -> str:
+    """Return the active mode from RECIPE_RECORD_MODE (default RECORD_MODE)."""
+    load_environment()
+    mode = os.getenv("RECIPE_RECORD_MODE", RECORD_MODE).strip().lower()
+    if mode not in RECORD_MODES:
+        raise ValueError(f"Unknown record mode: {mode}")
+    return mode
+
+
+def replay_latency() -> str:
+    """Return "original" to replay with recorded latency, or "zero"."""
+    return os.getenv("RECIPE_REPLAY_LATENCY", REPLAY_LATENCY).strip().lower()
+
+
+def cassette_path() -> str:
+    """Return the cassette file named by RECIPE_CASSETTE."""
+    return os.getenv("RECIPE_CASSETTE", os.path.join(CASSETTE_DIR, "default.json"))
+
+
+class Cassette:
+    """Recorded provider interactions in a JSON file, matched by request key.
+
+    Identical requests are replayed in the order they were recorded; once
+    they run out, the last recording is repeated.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._interactions: Dict[str, List[Dict[str, Any]]] = {}
+        self._played: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                for interaction in json.load(f).get("interactions", []):
+                    self._interactions.setdefault(interaction["key"], []).append(interaction)
+
+    def __len__(self) -> int:
+        return sum(len(recordings) for recordings in self._interactions.values())
+
+    def find(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return the next recording for a key, or None if there is none."""
+        with self._lock:
+            recordings = self._interactions.get(key)
+            if not recordings:
+                return None
+            index = self._played.get(key, 0)
+            self._played[key] = index + 1
+            return recordings[min(index, len(recordings) - 1)]
+
+    def add(self, interaction: Dict[str, Any]) -> None:
+        """Record an interaction and write the cassette."""
+        with self._lock:
+            self._interactions.setdefault(interaction["key"], []).append(interaction)
+            interactions = [item for recordings in self._interactions.values() for item in recordings]
+            directory = os.path.dirname(os.path.abspath(self.path))
+            os.makedirs(directory, exist_ok=True)
+            temp_path = f"{self.path}.tmp"
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump({"version": 1, "interactions": interactions}, f, indent=1)
+            os.replace(temp_path, self.path)
+
+
+_cassettes: Dict[str, Cassette] = {}
+_cassettes_lock = threading.Lock()
+
+
+def get_cassette(path: Optional[str] = None) -> Cassette:
+    """Return the process-wide cassette for a path (default RECIPE_CASSETTE)."""
+    path = path or cassette_path()
+    with _cassettes_lock:
+        if path not in _cassettes:
+            _cassettes[path] = Cassette(path)
+            logger.info("Using cassette %s (%s recorded interactions)", path, len(_cassettes[path]))
+        return _cassettes[path]
+
+
+def use_cassette(name: str) -> str:
+    """Point record/replay at CASSETTE_DIR/<name>.json and return the active mode.
+
+    Unless RECIPE_RECORD_MODE is set, the cassette is replayed, so scripts run
+    offline. A missing cassette raises CassetteMissError rather than falling
+    back to live traffic; RECIPE_RECORD_MODE=record or off reaches the providers.
+    """
+    os.environ.setdefault("RECIPE_CASSETTE", os.path.join(CASSETTE_DIR, f"{name}.json"))
+    if "RECIPE_RECORD_MODE" not in os.environ:
+        if not os.path.exists(os.environ["RECIPE_CASSETTE"]):
+            raise CassetteMissError(
+                f"Cassette {os.environ['RECIPE_CASSETTE']} not found; record it with "
+                "python -m recipe_app.tools.record_cassettes, or set RECIPE_RECORD_MODE=off to call the live APIs"
+            )
+        os.environ["RECIPE_RECORD_MODE"] = "replay"
+    return record_mode()
+
+
+def _wait(interaction: Dict[str, Any]) -> None:
+    """Reproduce the recorded latency of an interaction, if configured."""
+    if replay_latency() == "original":
+        time.sleep(interaction.get("elapsed", 0))
+
+
+def recorded_call(kind: str, request: Dict[str, Any], fn: Callable[[], Any]) -> Any:
+    """Run a provider call through the cassette; the result must be JSON-serializable."""
+    mode = record_mode()
+    if mode == "off":
+        return fn()
+
+    cassette = get_cassette()
+    key = make_key(kind, request)
+    if mode == "replay":
+        interaction = cassette.find(key)
+        if interaction is None:
+            raise CassetteMissError(f"No recorded {kind} response for {request} in {cassette.path}")
+        _wait(interaction)
+        return interaction["response"]
+
+    started = time.perf_counter()
+    result = fn()
+    cassette.add({
+        "key": key,
+        "kind": kind,
+        "request": request,
+        "response": result,
+        "elapsed": round(time.perf_counter() - started, 4)
+    })
+    return result
+
+
+def _http_request_key(method: str, target: str, body: bytes) -> Dict[str, Any]:
+    """Describe an HTTP request for matching; JSON bodies are compared by value.
+
+    For API clients the target is only the path, so recordings survive a
+    change of base URL or proxy.
+    """
+    try:
+        payload: Any = json.loads(body) if body else None
+    except ValueError:
+        payload = base64.b64encode(body).decode("ascii")
+    return {"method": method, "path": target, "body": payload}
+
+
+class CassetteTransport:
+    """httpx transport that records or replays requests through a cassette.
+
+    Pass it to a client as ``httpx.Client(transport=...)``; in record mode real
+    requests go through ``inner`` (an ``httpx.HTTPTransport`` by default).
+    """
+
+    def __init__(self, cassette: Cassette, mode: str, inner=None, match_host: bool = False):
+        self.cassette = cassette
+        self.mode = mode
+        self.inner = inner
+        self.match_host = match_host
+
+    def handle_request(self, request):
+        import httpx
+        request.read()
+        # API calls match on path alone; clients fetching arbitrary sites match on the host too
+        target = str(request.url) if self.match_host else request.url.raw_path.decode("ascii")
+        described = _http_request_key(request.method, target, request.content)
+        key = make_key("http", described)
+
+        if self.mode == "replay":
+            interaction = self.cassette.find(key)
+            if interaction is None:
+                raise CassetteMissError(f"No recorded response for {request.method} {request.url} in {self.cassette.path}")
+            _wait(interaction)
+            response = interaction["response"]
+            return httpx.Response(
+                response["status"],
+                headers=response["headers"],
+                content=base64.b64decode(response["body"]),
+                request=request
+            )
+
+        if self.inner is None:
+            self.inner = httpx.HTTPTransport()
+        started = time.perf_counter()
+        response = self.inner.handle_request(request)
+        if response.is_stream_consumed:
+            # Already-read responses, e.g. from httpx.MockTransport
+            body = response.content
+        else:
+            try:
+                # Raw bytes, so a compressed body is stored with its content-encoding
+                body = b"".join(response.iter_raw())
+            finally:
+                response.close()
+        headers = {name: value for name, value in response.headers.items() if name.lower() in RECORDED_HEADERS}
+        self.cassette.add({
+            "key": key,
+            "kind": "http",
+            "request": described,
+            "response": {
+                "status": response.status_code,
+                "headers": headers,
+                "body": base64.b64encode(body).decode("ascii")
+            },
+            "elapsed": round(time.perf_counter() - started, 4)
+        })
+        return httpx.Response(response.status_code, headers=headers, content=body, request=request)
+
+    def close(self) -> None:
+        if self.inner is not None:
+            self.inner.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+def http_client(mode: str):
+    """Return an httpx client whose traffic goes through the active cassette, or None when off."""
+    if mode == "off":
+        return None
+    import httpx
+    return httpx.Client(transport=CassetteTransport(get_cassette(), mode))
+
+
+def wrap_transport(transport):
+    """Route an httpx transport through the active cassette, matching on full URLs.
+
+    Returns the transport unchanged when record/replay is off.
+    """
+    mode = record_mode()
+    if mode == "off":
+        return transport
+    return CassetteTransport(get_cassette(), mode, inner=transport, match_host=True)
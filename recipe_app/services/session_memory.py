@@ -0,0 +1,296 @@
+import time
+import logging
+import threading
+import weakref
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from recipe_app.config.settings import settings
+from recipe_app.services.jobs import job_runner
+from recipe_app.services.metrics import deep_size, rss_bytes
+from recipe_app.services.recipe_store import recipe_store
+
+logger = logging.getLogger(__name__)
+
+MB = 2 ** 20
+# Session state key of the compiled graph and where its last checkpoints go on eviction
+GRAPH_KEY = "graph"
+SNAPSHOT_KEY = "graph_snapshot"
+# Session state key of the fingerprint of the session's pending graph run
+JOB_KEY = "graph_job"
+# Session state keys holding recipe references the UI renders in full
+FAVORITES_KEY = "favorites"
+CURRENT_RECIPE_KEY = "current_recipe"
+OUTPUT_KEY = "current_output"
+
+
+def recipe_refs(session_state: Any) -> List[Dict]:
+    """Recipe references a session renders: its favorites, selected recipe and results."""
+    refs = list(session_state[FAVORITES_KEY]) if FAVORITES_KEY in session_state else []
+    if CURRENT_RECIPE_KEY in session_state:
+        refs.append(session_state[CURRENT_RECIPE_KEY])
+    if OUTPUT_KEY in session_state and session_state[OUTPUT_KEY]:
+        refs.extend(session_state[OUTPUT_KEY].get("recipes") or [])
+    return refs
+
+
+def snapshot_graph(graph: Any) -> Dict[str, tuple]:
+    """Return the latest checkpoint of every thread in a graph's in-memory checkpointer.
+
+    Earlier checkpoints are dropped; the latest one is all a paused run needs
+    to resume.
+    """
+    saver = graph.checkpointer
+    snapshot = {}
+    for thread_id in list(getattr(saver, "storage", {})):
+        saved = saver.get_tuple({"configurable": {"thread_id": thread_id}})
+        if saved is not None:
+            namespace = saved.config["configurable"].get("checkpoint_ns", "")
+            snapshot[thread_id] = (namespace, saved.checkpoint, saved.metadata, saved.pending_writes or [])
+    return snapshot
+
+
+def restore_graph(graph: Any, snapshot: Dict[str, tuple]) -> Any:
+    """Load checkpoints taken by snapshot_graph into a freshly built graph."""
+    saver = graph.checkpointer
+    for thread_id, (namespace, checkpoint, metadata, pending_writes) in snapshot.items():
+        config = saver.put(
+            {"configurable": {"thread_id": thread_id, "checkpoint_ns": namespace}},
+            checkpoint,
+            metadata,
+            checkpoint["channel_versions"]
+        )
+        writes_by_task: Dict[str, List[tuple]] = {}
+        for task_id, channel, value in pending_writes:
+            writes_by_task.setdefault(task_id, []).append((channel, value))
+        for task_id, writes in writes_by_task.items():
+            saver.put_writes(config, writes, task_id)
+    return graph
+
+
+def ensure_graph(session_state: Any, build: Callable[[], Any]) -> Any:
+    """Return the session's graph, rebuilding it from its snapshot after an eviction."""
+    if GRAPH_KEY not in session_state:
+        graph = build()
+        snapshot = session_state[SNAPSHOT_KEY] if SNAPSHOT_KEY in session_state else None
+        if snapshot:
+            restore_graph(graph, snapshot)
+            del session_state[SNAPSHOT_KEY]
+            logger.info("Rebuilt evicted session graph from its snapshot")
+        session_state[GRAPH_KEY] = graph
+    return session_state[GRAPH_KEY]
+
+
+def evict_graph(session_state: Any) -> bool:
+    """Replace a session's graph with a snapshot of its latest checkpoints."""
+    if GRAPH_KEY not in session_state:
+        return False
+    # A running job still writes checkpoints to this graph
+    if JOB_KEY in session_state and job_runner.busy(session_state[JOB_KEY]):
+        return False
+    session_state[SNAPSHOT_KEY] = snapshot_graph(session_state[GRAPH_KEY])
+    del session_state[GRAPH_KEY]
+    return True
+
+
+class SessionRecord:
+    """What the registry knows about one session.
+
+    With ``is_open`` the record holds the session state and asks it whether
+    the session still exists; without it (e.g. plain mappings) the state is
+    weakly referenced and the session counts as closed once it is collected.
+    """
+
+    def __init__(self, session_state: Any, is_open: Optional[Callable[[], bool]] = None):
+        self.is_open = is_open
+        self._state = session_state if is_open is not None else weakref.ref(session_state)
+        self.last_seen = time.monotonic()
+        self.sizes: Dict[str, int] = {}
+
+    def state(self) -> Any:
+        """The session's state, or None once the session is closed."""
+        if self.is_open is None:
+            return self._state()
+        return self._state if self.is_open() else None
+
+    @property
+    def total(self) -> int:
+        return sum(self.sizes.values())
+
+
+class SessionRegistry:
+    """Per-process accounting of session state, with eviction of heavy objects.
+
+    Every rerun measures the approximate deep size of each key in its
+    session. Sessions idle for session_idle_seconds, and under memory
+    pressure those idle for session_pressure_idle_seconds (least recently
+    used first), have their graph replaced by a snapshot of its latest
+    checkpoints; ensure_graph rebuilds it when the user returns. A session
+    over session_max_mb gets the same treatment on its own rerun, which drops
+    its checkpoint history. The recipes each open session renders are pinned
+    in the recipe store until the session closes. Every memory_log_seconds a
+    rerun logs the registry's stats.
+
+    Budgets left as None follow the settings; a process budget of 0 turns
+    the RSS check off.
+    """
+
+    def __init__(self, budget_bytes: Optional[int] = None, process_budget_bytes: Optional[int] = None,
+                 session_max_bytes: Optional[int] = None):
+        self._budget_bytes = budget_bytes
+        self._process_budget_bytes = process_budget_bytes
+        self._session_max_bytes = session_max_bytes
+        self._sessions: Dict[str, SessionRecord] = {}
+        # Guards the records; sizes are measured and graphs evicted outside it
+        self._lock = threading.Lock()
+        self._enforce_lock = threading.Lock()
+        self._last_check = 0.0
+        self._last_log = 0.0
+        self.evictions = 0
+
+    @property
+    def budget_bytes(self) -> int:
+        return self._budget_bytes if self._budget_bytes is not None else settings().session_memory_budget_mb * MB
+
+    @property
+    def process_budget_bytes(self) -> Optional[int]:
+        if self._process_budget_bytes is not None:
+            return self._process_budget_bytes or None
+        budget_mb = settings().process_memory_budget_mb
+        return budget_mb * MB if budget_mb else None
+
+    @property
+    def session_max_bytes(self) -> int:
+        return self._session_max_bytes if self._session_max_bytes is not None else settings().session_max_mb * MB
+
+    def touch(self, session_id: str, session_state: Any, is_open: Optional[Callable[[], bool]] = None) -> Dict[str, int]:
+        """Record a rerun of a session, measure it and enforce the budgets.
+
+        Call at the start of the rerun, before the session's graph is used.
+        ``is_open`` tells whether the session still exists; see SessionRecord.
+        """
+        sizes = self._measure(session_state)
+        if sum(sizes.values()) > self.session_max_bytes and evict_graph(session_state):
+            logger.info("Compacted session %s (%s MB)", session_id[:8], sum(sizes.values()) // MB)
+            sizes = self._measure(session_state)
+            with self._lock:
+                self.evictions += 1
+        now, current = time.monotonic(), settings()
+        with self._lock:
+            record = self._sessions.get(session_id)
+            if record is None or record.state() is not session_state:
+                record = self._sessions[session_id] = SessionRecord(session_state, is_open)
+            record.last_seen = now
+            record.sizes = sizes
+            check_due = now - self._last_check >= current.session_check_seconds
+            if check_due:
+                self._last_check = now
+            log_due = now - self._last_log >= current.memory_log_seconds
+            if log_due:
+                self._last_log = now
+        recipe_store.pin(session_id, recipe_refs(session_state))
+        if check_due:
+            self._enforce(now, exclude=session_id)
+        if log_due:
+            self.log_stats()
+        return dict(sizes)
+
+    @staticmethod
+    def _measure(session_state: Any) -> Dict[str, int]:
+        """Approximate deep size of each key; objects shared between keys count once."""
+        seen: set = set()
+        state = session_state.filtered_state if hasattr(session_state, "filtered_state") else dict(session_state)
+        return {str(key): deep_size(value, seen) for key, value in state.items()}
+
+    def _enforce(self, now: float, exclude: Optional[str] = None) -> None:
+        """Forget closed sessions and evict idle ones, more eagerly under memory pressure.
+
+        One rerun at a time does this; the others skip it rather than wait.
+        """
+        if not self._enforce_lock.acquire(blocking=False):
+            return
+        try:
+            with self._lock:
+                closed = [sid for sid, record in self._sessions.items() if record.state() is None]
+                for session_id in closed:
+                    del self._sessions[session_id]
+                candidates = sorted(self._sessions.items(), key=lambda item: item[1].last_seen)
+            for session_id in closed:
+                recipe_store.release(session_id)
+
+            # RSS does not drop right after an eviction, so it is read once per check
+            rss = rss_bytes()
+            budget, process_budget, current = self.budget_bytes, self.process_budget_bytes, settings()
+            rss_pressure = process_budget is not None and rss > process_budget
+            for session_id, record in candidates:
+                idle = now - record.last_seen
+                if session_id == exclude or idle < current.session_pressure_idle_seconds:
+                    continue
+                under_pressure = rss_pressure or self._tracked() > budget
+                if idle < current.session_idle_seconds and not under_pressure:
+                    continue
+                session_state = record.state()
+                if session_state is not None and evict_graph(session_state):
+                    sizes = self._measure(session_state)
+                    with self._lock:
+                        record.sizes = sizes
+                        self.evictions += 1
+                    logger.info("Evicted graph of session %s after %ds idle (process RSS %s MB, sessions %s MB)",
+                                session_id[:8], idle, rss // MB, self._tracked() // MB)
+        finally:
+            self._enforce_lock.release()
+
+    def _tracked(self) -> int:
+        with self._lock:
+            return sum(record.total for record in self._sessions.values())
+
+    def stats(self) -> Dict[str, Any]:
+        """Process RSS and tracked session memory, for logs and metrics endpoints."""
+        with self._lock:
+            records = list(self._sessions.items())
+        sessions = {sid[:8]: record.total for sid, record in records if record.state() is not None}
+        return {
+            "rss_bytes": rss_bytes(),
+            "sessions": len(sessions),
+            "session_bytes": sum(sessions.values()),
+            "largest_sessions": dict(sorted(sessions.items(), key=lambda item: -item[1])[:5]),
+            "evictions": self.evictions,
+        }
+
+    def log_stats(self) -> None:
+        """Log process RSS and session memory; the numbers are also a structured field."""
+        stats = self.stats()
+        logger.info("Process RSS %s MB, %s sessions using %s MB, %s graph evictions",
+                    stats["rss_bytes"] // MB, stats["sessions"], stats["session_bytes"] // MB, stats["evictions"],
+                    extra={"memory": stats})
+
+
+# Process-wide registry shared by every session
+session_registry = SessionRegistry()
+
+
+def session_handle(session_id: str, session_state: Any) -> Tuple[Any, Optional[Callable[[], bool]]]:
+    """The state to track for a Streamlit session, and how to tell that it closed.
+
+    Every script run gets a new SafeSessionState wrapper, so the registry
+    tracks the SessionState it wraps and asks the runtime whether the session
+    is still active. Without a runtime (AppTest, bare mode) the wrapper is
+    tracked until it is collected.
+    """
+    from streamlit.runtime import Runtime
+    from streamlit.runtime.state import SafeSessionState
+
+    if not Runtime.exists() or not isinstance(session_state, SafeSessionState):
+        return session_state, None
+    runtime = Runtime.instance()
+    return session_state._state, lambda: runtime.is_active_session(session_id)
+
+
+def track_current_session() -> Optional[Dict[str, int]]:
+    """Register the Streamlit session running this script with the registry."""
+    from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+    ctx = get_script_run_ctx()
+    if ctx is None:
+        return None
+    session_state, is_open = session_handle(ctx.session_id, ctx.session_state)
+    return session_registry.touch(ctx.session_id, session_state, is_open)
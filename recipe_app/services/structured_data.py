@@ -0,0 +1,136 @@
+import re
+import json
+import logging
+from typing import Any, Dict, Iterator, List, Optional
+
+from recipe_app.models.recipe_models import RecipeFeature
+from recipe_app.services.feature_heuristics import (
+    UNITS,
+    MINOR_INGREDIENTS,
+    MIN_KEY_INGREDIENTS,
+    MAX_KEY_INGREDIENTS,
+    find_cooking_style
+)
+
+logger = logging.getLogger(__name__)
+
+# <script type="application/ld+json"> blocks embedded in raw page content
+JSON_LD_SCRIPT = re.compile(
+    r"<script[^>]*type=[\"']application/ld\+json[\"'][^>]*>(.*?)</script>",
+    re.IGNORECASE | re.DOTALL
+)
+
+# schema.org Recipe fields kept from a page; the rest of the markup is dropped
+RECIPE_FIELDS = ("name", "recipeIngredient", "ingredients", "cookingMethod", "recipeCategory", "keywords")
+
+# "2 cups", "1/2 tsp.", "200g", "1 (14 oz) can" at the start of an ingredient line
+LEADING_QUANTITY = re.compile(
+    rf"^(?:(?:\d+(?:[./,]\d+)?|[½¼¾⅓⅔⅛])\s*(?:-\s*\d+\s*)?(?:{UNITS})?\.?\s+)+(?:of\s+)?",
+    re.IGNORECASE
+)
+PREPARATION_WORDS = re.compile(
+    r"^(?:(?:large|small|medium|fresh|freshly|chopped|diced|minced|sliced|grated|ground|"
+    r"finely|roughly|thinly|peeled|boneless|skinless|ripe|cold|warm|softened|melted)\s+)+",
+    re.IGNORECASE
+)
+MAX_INGREDIENT_CHARS = 40
+
+
+def _is_recipe(node: Dict[str, Any]) -> bool:
+    node_type = node.get("@type")
+    types = node_type if isinstance(node_type, list) else [node_type]
+    return any(isinstance(value, str) and value.split("/")[-1] == "Recipe" for value in types)
+
+
+def _walk(data: Any) -> Iterator[Dict[str, Any]]:
+    """Yield every object in parsed JSON-LD, following @graph and nested lists."""
+    if isinstance(data, list):
+        for item in data:
+            yield from _walk(item)
+    elif isinstance(data, dict):
+        yield data
+        for key in ("@graph", "mainEntity", "itemListElement"):
+            if key in data:
+                yield from _walk(data[key])
+
+
+def find_recipe_nodes(blocks: List[str]) -> List[Dict[str, Any]]:
+    """Parse JSON-LD blocks and return their schema.org Recipe objects, trimmed to RECIPE_FIELDS."""
+    recipes = []
+    for block in blocks:
+        try:
+            data = json.loads(block.strip())
+        except ValueError:
+            # Some sites emit trailing commas or several objects; skip what does not parse
+            continue
+        for node in _walk(data):
+            if _is_recipe(node):
+                recipes.append({field: node[field] for field in RECIPE_FIELDS if field in node})
+    return recipes
+
+
+def json_ld_blocks(text: str) -> List[str]:
+    """Return the JSON-LD script bodies found in raw HTML or page content."""
+    return JSON_LD_SCRIPT.findall(text or "")
+
+
+def _text_values(value: Any) -> List[str]:
+    """Flatten a schema.org text field (string, list or {"name"/"text"} objects) into strings."""
+    if isinstance(value, str):
+        return [value]
+    if isinstance(value, dict):
+        return _text_values(value.get("name") or value.get("text") or "")
+    if isinstance(value, list):
+        return [text for item in value for text in _text_values(item)]
+    return []
+
+
+def ingredient_name(line: str) -> str:
+    """Reduce an ingredient line such as "2 cups all-purpose flour, sifted" to "all-purpose flour"."""
+    name = re.sub(r"\([^)]*\)", " ", line.lower())
+    name = re.split(r"[,;]| - | or ", name)[0]
+    name = LEADING_QUANTITY.sub("", name.strip())
+    name = PREPARATION_WORDS.sub("", name.strip())
+    name = re.sub(r"\s+", " ", name).strip(" .*-")
+    return name[:MAX_INGREDIENT_CHARS].strip()
+
+
+def feature_from_schema(node: Dict[str, Any]) -> Optional[RecipeFeature]:
+    """Map a schema.org Recipe onto a RecipeFeature, or None if it lacks usable data."""
+    name = " ".join(_text_values(node.get("name"))).strip()
+    lines = _text_values(node.get("recipeIngredient") or node.get("ingredients"))
+    ingredients = list(dict.fromkeys(filter(None, (ingredient_name(line) for line in lines))))
+    if not name or len(ingredients) < 2:
+        return None
+
+    key = [ingredient for ingredient in ingredients if ingredient not in MINOR_INGREDIENTS]
+    if len(key) < MIN_KEY_INGREDIENTS:
+        key = ingredients
+
+    method_text = " ".join(
+        _text_values(node.get("cookingMethod"))
+        + _text_values(node.get("recipeCategory"))
+        + _text_values(node.get("keywords"))
+        + [name]
+    )
+    return RecipeFeature(
+        dish_name=name,
+        key_ingredients=key[:MAX_KEY_INGREDIENTS],
+        cooking_style=find_cooking_style(method_text)
+    )
+
+
+class StructuredDataExtractor:
+    """Builds recipe features from embedded schema.org Recipe markup, without an LLM."""
+
+    @staticmethod
+    def extract(recipe: Dict) -> Optional[RecipeFeature]:
+        """Return features from a fetched page's markup or markup in the content, if usable."""
+        nodes = list(recipe.get("schema_recipes") or [])
+        if not nodes:
+            nodes = find_recipe_nodes(json_ld_blocks(recipe.get("content", "")))
+        for node in nodes:
+            feature = feature_from_schema(node)
+            if feature is not None:
+                return feature
+        return None
@@ -0,0 +1,216 @@
+import os
+import sys
+import copy
+import json
+import time
+import queue
+import atexit
+import logging
+import threading
+import contextvars
+import logging.handlers
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple
+
+from recipe_app.config.config import (
+    LOG_LEVEL,
+    LOG_FORMAT,
+    LOG_FILE,
+    LOG_QUEUE_SIZE,
+    LOG_SAMPLE_BURST,
+    LOG_SAMPLE_EVERY
+)
+
+# Session and graph node of the code that is logging; copied onto each record
+_session = contextvars.ContextVar("log_session", default=None)
+_node = contextvars.ContextVar("log_node", default=None)
+
+# LogRecord attributes that are not extra fields
+_RECORD_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime"}
+
+_listener: Optional[logging.handlers.QueueListener] = None
+_configure_lock = threading.Lock()
+
+
+@contextmanager
+def log_context(session: Optional[str] = None, node: Optional[str] = None) -> Iterator[None]:
+    """Tag records logged inside the block with a session and/or graph node."""
+    tokens = []
+    if session is not None:
+        tokens.append((_session, _session.set(session)))
+    if node is not None:
+        tokens.append((_node, _node.set(node)))
+    try:
+        yield
+    finally:
+        for var, token in reversed(tokens):
+            var.reset(token)
+
+
+def logged_node(name: str, fn: Callable) -> Callable:
+    """Wrap a graph node so everything it logs carries the node name and session.
+
+    The session is the run's ``session`` configurable, or its thread ID.
+    """
+    def node(state, config):
+        configurable = config.get("configurable", {})
+        with log_context(session=configurable.get("session") or configurable.get("thread_id"), node=name):
+            return fn(state)
+    node.__name__ = name
+    return node
+
+
+class ContextFilter(logging.Filter):
+    """Copy the logging context onto records while still on the calling thread."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.session = _session.get()
+        record.node = _node.get()
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """Keep 1 in N repeats of a busy line, per level.
+
+    Lines are told apart by logger and unformatted message, so calls must
+    use lazy ``%s`` arguments rather than f-strings. Each line keeps its
+    first ``burst`` records per second; kept records past the burst carry
+    ``sample_rate`` so counts can be scaled back up.
+    """
+
+    def __init__(self, every: Dict[str, int] = LOG_SAMPLE_EVERY, burst: int = LOG_SAMPLE_BURST):
+        super().__init__()
+        self.every = {logging.getLevelName(level): n for level, n in every.items() if n and n > 1}
+        self.burst = burst
+        self._lines: Dict[Tuple[str, int, Any], list] = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        every = self.every.get(record.levelno)
+        if every is None:
+            return True
+        second = int(time.monotonic())
+        key = (record.name, record.levelno, record.msg)
+        with self._lock:
+            line = self._lines.get(key)
+            if line is None or line[0] != second:
+                if len(self._lines) > 10000:
+                    self._lines.clear()
+                line = self._lines[key] = [second, 0]
+            line[1] += 1
+            seen = line[1]
+        if seen <= self.burst:
+            return True
+        if (seen - self.burst) % every:
+            return False
+        record.sample_rate = every
+        return True
+
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """Queue handler that never blocks the caller and leaves formatting to the listener."""
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # The listener's handler formats the message; only the traceback is
+        # rendered here, as its frames may not outlive the caller
+        record = copy.copy(record)
+        if record.exc_info and not record.exc_text:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+        record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per record, with its context and any extra fields."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": round(record.created, 3),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "session": getattr(record, "session", None),
+            "node": getattr(record, "node", None),
+            "thread": record.threadName,
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRS and key not in entry:
+                entry[key] = value
+        if record.exc_text:
+            entry["exc"] = record.exc_text
+        return json.dumps({key: value for key, value in entry.items() if value is not None}, default=str)
+
+
+class TextFormatter(logging.Formatter):
+    """Plain text lines, with the session and node when there are any."""
+
+    def __init__(self):
+        super().__init__("%(asctime)s %(levelname)s %(name)s%(context)s: %(message)s")
+
+    def format(self, record: logging.LogRecord) -> str:
+        tags = [value for value in (getattr(record, "session", None), getattr(record, "node", None)) if value]
+        record.context = f" [{' '.join(tags)}]" if tags else ""
+        return super().format(record)
+
+
+def configure_logging(level: Optional[str] = None, fmt: Optional[str] = None,
+                      path: Optional[str] = None, stream: Any = None) -> logging.handlers.QueueListener:
+    """Route the app's logging through a queue to a background writer (once per process).
+
+    Calling it again returns the running listener. Use stop_logging to
+    flush and detach it.
+    """
+    global _listener
+    with _configure_lock:
+        if _listener is not None:
+            return _listener
+        level = (level or os.getenv("RECIPE_LOG_LEVEL", LOG_LEVEL)).upper()
+        fmt = (fmt or os.getenv("RECIPE_LOG_FORMAT", LOG_FORMAT)).strip().lower()
+        path = path or os.getenv("RECIPE_LOG_FILE", LOG_FILE)
+
+        if path:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            sink: logging.Handler = logging.FileHandler(path, encoding="utf-8")
+        else:
+            sink = logging.StreamHandler(stream or sys.stderr)
+        sink.setFormatter(JsonFormatter() if fmt == "json" else TextFormatter())
+
+        handler = DroppingQueueHandler(queue.Queue(LOG_QUEUE_SIZE))
+        handler.addFilter(ContextFilter())
+        handler.addFilter(SamplingFilter())
+        root = logging.getLogger()
+        root.addHandler(handler)
+        root.setLevel(level)
+
+        _listener = logging.handlers.QueueListener(handler.queue, sink, respect_handler_level=True)
+        _listener.handler = handler
+        _listener.start()
+        atexit.register(stop_logging)
+        return _listener
+
+
+def stop_logging() -> None:
+    """Write out queued records and detach the queue handler."""
+    global _listener
+    with _configure_lock:
+        if _listener is None:
+            return
+        listener, _listener = _listener, None
+        logging.getLogger().removeHandler(listener.handler)
+        listener.stop()
+        for sink in listener.handlers:
+            sink.close()
+        if listener.handler.dropped:
+            sys.stderr.write(f"{listener.handler.dropped} log records dropped with a full queue\n")
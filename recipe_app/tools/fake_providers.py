@@ -0,0 +1,191 @@
+"""Offline stand-ins for the OpenAI chat model and the Tavily search tool.
+
+Used by the load test to drive the real app without network access or API
+keys. ``install()`` patches the provider classes that the services import on
+first use, so it must run before the first model call or search; tests use
+``installed()`` so the real classes are put back afterwards.
+
+``openai_transport()`` answers the same calls at the HTTP level instead, so
+the real ``ChatOpenAI`` client and its request/response handling still run.
+"""
+import re
+import json
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator, List, Set
+
+from langchain_core.messages import AIMessage, HumanMessage
+
+# Small offline corpus: (dish name, ingredients, cooking style)
+DISHES = [
+    ("Chicken Alfredo Pasta", ["chicken", "pasta", "cream", "parmesan", "garlic"], "simmered"),
+    ("Chicken Tikka Masala", ["chicken", "yogurt", "tomatoes", "rice", "garam masala"], "simmered"),
+    ("Beef Stir Fry", ["beef", "broccoli", "soy sauce", "ginger", "rice"], "stir-fried"),
+    ("Shakshuka", ["eggs", "tomatoes", "onion", "peppers", "cumin"], "baked"),
+    ("Cheese Omelette", ["eggs", "cheese", "butter", "chives"], "pan-fried"),
+    ("Tomato Basil Soup", ["tomatoes", "basil", "onion", "garlic", "olive oil"], "simmered"),
+    ("Veggie Lasagna", ["pasta", "spinach", "ricotta", "tomatoes", "mozzarella"], "baked"),
+    ("Lentil Curry", ["lentils", "coconut milk", "spinach", "onion", "curry powder"], "simmered"),
+    ("Mushroom Risotto", ["rice", "mushrooms", "parmesan", "white wine", "onion"], "simmered"),
+    ("Chickpea Salad", ["chickpeas", "cucumber", "tomatoes", "lemon", "olive oil"], "raw"),
+    ("Overnight Oats", ["oats", "milk", "honey", "berries"], "no-cook"),
+    ("Salmon Teriyaki", ["salmon", "soy sauce", "honey", "ginger", "rice"], "grilled"),
+    ("Pancakes", ["flour", "eggs", "milk", "butter", "sugar"], "pan-fried"),
+    ("Tofu Stir Fry", ["tofu", "broccoli", "soy sauce", "peppers", "rice"], "stir-fried"),
+]
+
+
+class FakeChatOpenAI:
+    """Answers translation and structured-output calls from the prompt text."""
+
+    latency = 0.0  # Seconds slept per call, set by install()
+    invalid_models: Set[str] = set()  # Models whose structured output fails validation
+
+    def __init__(self, **kwargs: Any):
+        self.kwargs = kwargs
+
+    def invoke(self, messages: List, config: Any = None) -> AIMessage:
+        time.sleep(self.latency)
+        words = re.findall(r"[a-z]+", str(messages[-1].content).lower())
+        return AIMessage(content=" ".join(words[:8] + ["recipe"]))
+
+    def with_structured_output(self, schema: Any, **kwargs: Any) -> "FakeStructuredOutput":
+        return FakeStructuredOutput(schema, valid=self.kwargs.get("model") not in self.invalid_models)
+
+
+class FakeStructuredOutput:
+    """Builds feature-extraction and feedback-classification responses."""
+
+    def __init__(self, schema: Any, valid: bool = True):
+        self.schema = schema
+        self.valid = valid
+
+    def invoke(self, messages: List, config: Any = None) -> Any:
+        time.sleep(FakeChatOpenAI.latency)
+        if not self.valid:
+            # Raises the ValidationError a malformed model answer would
+            self.schema.model_validate(None)
+        text = "\n".join(str(message.content) for message in messages)
+        if self.schema.__name__ == "ResponseRecipeKeyFeatures":
+            results = []
+            for name, content in re.findall(r"Recipe: (.*?)\nContent: (.*?)(?=\n\nRecipe: |\Z)", text, re.S):
+                ingredients = content.split("Ingredients: ")[-1].split(".")[0].split(", ")
+                results.append({"dish_name": name, "key_ingredients": ingredients, "cooking_style": None})
+            return self.schema(results=results)
+        if self.schema.__name__ == "HumanSelection":
+            feedback = re.search(r"User feedback: (.*)", text)
+            feedback = feedback.group(1) if feedback else ""
+            option = re.search(r"\b(?:option|recipe|number)\s*(\d)", feedback.lower())
+            if option and re.search(r"\b(like|love|take|choose|pick)\b", feedback.lower()):
+                return self.schema(like=min(int(option.group(1)) - 1, 2))
+            return self.schema(like=None, dislike=feedback or "User wants different recipes")
+        raise ValueError(f"No fake response for {self.schema.__name__}")
+
+
+class FakeTavilySearchResults:
+    """Returns dishes from the offline corpus ranked by overlap with the query."""
+
+    latency = 0.0  # Seconds slept per search, set by install()
+
+    def __init__(self, max_results: int = 3, **kwargs: Any):
+        self.max_results = max_results
+
+    def run(self, query: str) -> List[dict]:
+        time.sleep(self.latency)
+        words = set(re.findall(r"[a-z]+", query.lower()))
+        ranked = sorted(
+            DISHES,
+            key=lambda dish: -len(words & set(" ".join([dish[0].lower()] + dish[1]).split()))
+        )
+        return [
+            {
+                "title": name,
+                "url": f"https://recipes.example/{name.lower().replace(' ', '-')}",
+                "content": f"A {style} dish. Ingredients: {', '.join(ingredients)}. Serves 4."
+            }
+            for name, ingredients, style in ranked[:self.max_results]
+        ]
+
+
+def openai_completion(body: dict) -> dict:
+    """Build a Chat Completions response for a request body from the fakes above.
+
+    Structured-output requests (JSON schema or a forced tool call) get the
+    fake structured answer for the schema they name.
+    """
+    from recipe_app.models import recipe_models
+
+    messages = [
+        HumanMessage(content=message["content"] if isinstance(message.get("content"), str) else json.dumps(message.get("content")))
+        for message in body["messages"]
+    ]
+    message: dict = {"role": "assistant", "content": None, "refusal": None}
+    tools = body.get("tools") or []
+    response_format = body.get("response_format") or {}
+    if response_format.get("type") == "json_schema" or tools:
+        name = response_format["json_schema"]["name"] if not tools else tools[0]["function"]["name"]
+        answer = FakeStructuredOutput(getattr(recipe_models, name)).invoke(messages).model_dump_json()
+        if tools:
+            message["tool_calls"] = [{
+                "id": "call_0",
+                "type": "function",
+                "function": {"name": name, "arguments": answer}
+            }]
+        else:
+            message["content"] = answer
+        finish_reason = "tool_calls" if tools else "stop"
+    else:
+        message["content"] = FakeChatOpenAI().invoke(messages).content
+        finish_reason = "stop"
+    return {
+        "id": "chatcmpl-offline",
+        "object": "chat.completion",
+        "created": 0,
+        "model": body.get("model", "offline"),
+        "choices": [{"index": 0, "message": message, "finish_reason": finish_reason, "logprobs": None}],
+        "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0}
+    }
+
+
+def openai_transport():
+    """Return an httpx transport that serves /chat/completions from ``openai_completion``."""
+    import httpx
+
+    def handle(request: "httpx.Request") -> "httpx.Response":
+        if not request.url.path.endswith("/chat/completions"):
+            return httpx.Response(404, json={"error": {"message": f"No offline answer for {request.url.path}"}})
+        return httpx.Response(200, json=openai_completion(json.loads(request.content)))
+    return httpx.MockTransport(handle)
+
+
+def install(latency: float = 0.0) -> Callable[[], None]:
+    """Patch the provider classes with the fakes, each call sleeping ``latency`` seconds.
+
+    Returns a function that puts the patched classes back.
+    """
+    import langchain_openai
+    import langchain_community.tools.tavily_search.tool as tavily_tool
+    from recipe_app.services.model_router import _cached_llm
+
+    originals = (langchain_openai.ChatOpenAI, tavily_tool.TavilySearchResults)
+    FakeChatOpenAI.latency = latency
+    FakeTavilySearchResults.latency = latency
+    langchain_openai.ChatOpenAI = FakeChatOpenAI
+    tavily_tool.TavilySearchResults = FakeTavilySearchResults
+    _cached_llm.cache_clear()
+
+    def uninstall() -> None:
+        langchain_openai.ChatOpenAI, tavily_tool.TavilySearchResults = originals
+        # Models built from the fakes must not outlive them
+        _cached_llm.cache_clear()
+    return uninstall
+
+
+@contextmanager
+def installed(latency: float = 0.0) -> Iterator[None]:
+    """Use the fakes inside the block only."""
+    uninstall = install(latency)
+    try:
+        yield
+    finally:
+        uninstall()
@@ -0,0 +1,237 @@
+"""Drive concurrent simulated sessions through the real app against fake providers.
+
+Each session runs ``recipe_app/app.py`` in Streamlit's AppTest and goes
+through search, a constraint feedback round, a selection and saving the
+selection to favorites. For every concurrency level the report shows rerun
+latency percentiles, throughput, CPU time and memory growth per session.
+Usage:
+
+    python -m recipe_app.tools.load_test [--concurrency 1,2,4,8] [--sessions N]
+                                         [--latency-ms MS] [--json PATH]
+
+Providers are replaced by ``recipe_app.tools.fake_providers``, so no API keys
+or network access are needed. ``--latency-ms`` sets the simulated provider
+latency per call.
+"""
+import os
+import sys
+import json
+import math
+import time
+import logging
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from recipe_app.services.metrics import rss_bytes
+from recipe_app.tools import fake_providers
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+APP_FILE = os.path.join(ROOT_DIR, "recipe_app", "app.py")
+
+# Sessions cycle through these searches, so some share cache entries as real users would
+QUERIES = [
+    "I have eggs, flour, tomatoes and cheese",
+    "Quick pasta dinner for 4 people",
+    "Chicken with rice",
+    "Healthy breakfast with oats",
+    "Something with mushrooms",
+    "Spicy lentil dinner",
+]
+FEEDBACK = "Make it vegetarian please"
+SELECTION = "I like option 1"  # Refinement can leave a single result
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of a list of values (0 for an empty list)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = math.ceil(pct / 100 * len(ordered))
+    return ordered[min(max(rank, 1), len(ordered)) - 1]
+
+
+def share_test_runtime() -> Callable[[], None]:
+    """Let concurrent AppTest runs in one process share a runtime.
+
+    AppTest installs a mock Runtime for each run and clears it when the run
+    ends, which breaks runs still in progress on other threads. Once a mock
+    has been installed, it keeps answering while another run has cleared it.
+    Returns a function that restores Streamlit's own lookups.
+    """
+    from streamlit.runtime import Runtime
+
+    originals = (Runtime.__dict__["instance"], Runtime.__dict__["exists"])
+
+    last: Dict[str, Any] = {}
+
+    def instance(cls):
+        if cls._instance is not None:
+            last["runtime"] = cls._instance
+            return cls._instance
+        if "runtime" in last:
+            return last["runtime"]
+        raise RuntimeError("Runtime hasn't been created!")
+
+    def exists(cls) -> bool:
+        return cls._instance is not None or "runtime" in last
+
+    Runtime.instance = classmethod(instance)
+    Runtime.exists = classmethod(exists)
+
+    def restore() -> None:
+        Runtime.instance, Runtime.exists = originals
+    return restore
+
+
+def _button(at, label: str):
+    """Return the first button whose label contains ``label``."""
+    for button in at.button:
+        if label in button.label:
+            return button
+    raise LookupError(f"No '{label}' button on the page")
+
+
+def settle(at, timeout: float = 60, poll: float = 0.02):
+    """Rerun until the session's background graph run has been applied to the page."""
+    from recipe_app.services.session_memory import JOB_KEY
+
+    deadline = time.monotonic() + timeout
+    while JOB_KEY in at.session_state:
+        if time.monotonic() > deadline:
+            raise TimeoutError("Graph run did not finish")
+        time.sleep(poll)
+        at.run()
+
+
+def session_steps(index: int) -> List[Tuple[str, Callable]]:
+    """The reruns one simulated user triggers, as (step name, action on the AppTest)."""
+    query = QUERIES[index % len(QUERIES)]
+
+    def enter_keys(at):
+        at.text_input(key="openai_api_key").input("load-test")
+        at.text_input(key="tavily_api_key").input("load-test")
+        at.run()
+
+    def feedback(text):
+        def step(at):
+            at.text_area(key="feedback_input_0").input(text)
+            _button(at, "Submit Feedback").click().run()
+            settle(at)
+        return step
+
+    return [
+        ("open", lambda at: at.run()),
+        ("keys", enter_keys),
+        ("search", lambda at: settle(at.text_input(key="user_input_0").input(query).run())),
+        ("feedback", feedback(FEEDBACK)),
+        ("select", feedback(SELECTION)),
+        ("favorite", lambda at: _button(at, "Save to Favorites").click().run()),
+    ]
+
+
+def run_session(index: int, timeout: float) -> Dict[str, Any]:
+    """Run one simulated session; returns its AppTest and per-step rerun timings."""
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_file(APP_FILE, default_timeout=timeout)
+    timings: List[Tuple[str, float]] = []
+    error: Optional[str] = None
+    for name, action in session_steps(index):
+        started = time.perf_counter()
+        try:
+            action(at)
+        except Exception as e:
+            error = f"{name}: {type(e).__name__}: {e}"
+            break
+        timings.append((name, time.perf_counter() - started))
+        if at.exception:
+            error = f"{name}: {at.exception[0].message}"
+            break
+    return {"app": at, "timings": timings, "error": error}
+
+
+def run_level(concurrency: int, sessions: int, timeout: float = 60) -> Dict[str, Any]:
+    """Run ``sessions`` sessions, ``concurrency`` at a time, and summarize them."""
+    rss_before = rss_bytes()
+    cpu_before = time.process_time()
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="session") as executor:
+        results = list(executor.map(lambda index: run_session(index, timeout), range(sessions)))
+    wall = time.perf_counter() - started
+    cpu = time.process_time() - cpu_before
+    # Sessions are still referenced here, so their state counts towards memory
+    rss_after = rss_bytes()
+
+    latencies = [seconds for result in results for _, seconds in result["timings"]]
+    by_step: Dict[str, List[float]] = {}
+    for result in results:
+        for name, seconds in result["timings"]:
+            by_step.setdefault(name, []).append(seconds)
+    errors = [result["error"] for result in results if result["error"]]
+
+    return {
+        "concurrency": concurrency,
+        "sessions": sessions,
+        "reruns": len(latencies),
+        "errors": errors,
+        "wall_seconds": round(wall, 3),
+        "throughput_reruns_per_second": round(len(latencies) / wall, 2) if wall else 0.0,
+        "latency_ms": {
+            f"p{pct}": round(percentile(latencies, pct) * 1000, 1) for pct in (50, 90, 95, 99)
+        },
+        "step_p50_ms": {name: round(percentile(values, 50) * 1000, 1) for name, values in by_step.items()},
+        "cpu_seconds_per_session": round(cpu / sessions, 3),
+        "rss_mb_per_session": round((rss_after - rss_before) / sessions / 2 ** 20, 2),
+    }
+
+
+def print_report(levels: List[Dict[str, Any]]) -> None:
+    """Print one row per concurrency level."""
+    print(f"{'conc':>5} {'sess':>5} {'reruns/s':>9} {'p50 ms':>8} {'p90 ms':>8} {'p99 ms':>8}"
+          f" {'cpu s/sess':>11} {'MB/sess':>8} {'errors':>7}")
+    for level in levels:
+        latency = level["latency_ms"]
+        print(f"{level['concurrency']:>5} {level['sessions']:>5} {level['throughput_reruns_per_second']:>9}"
+              f" {latency['p50']:>8} {latency['p90']:>8} {latency['p99']:>8}"
+              f" {level['cpu_seconds_per_session']:>11} {level['rss_mb_per_session']:>8} {len(level['errors']):>7}")
+    for level in levels:
+        for error in level["errors"][:3]:
+            print(f"  [concurrency {level['concurrency']}] {error}")
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Load-test the app with concurrent simulated sessions.")
+    parser.add_argument("--concurrency", default="1,2,4,8", help="Comma-separated concurrency levels")
+    parser.add_argument("--sessions", type=int, default=None, help="Sessions per level (default: 2 x concurrency)")
+    parser.add_argument("--latency-ms", type=float, default=200, help="Simulated provider latency per call")
+    parser.add_argument("--llm-cache", action="store_true", help="Keep the LLM response cache on")
+    parser.add_argument("--timeout", type=float, default=60, help="Seconds allowed per rerun")
+    parser.add_argument("--json", default=None, help="Also write the results to this file")
+    args = parser.parse_args(argv)
+
+    # Repeated prompts would otherwise be answered from disk after the first level
+    if not args.llm_cache:
+        os.environ["RECIPE_LLM_CACHE"] = "off"
+    os.environ.setdefault("RECIPE_RECORD_MODE", "off")
+    # Fake search results point at placeholder URLs
+    os.environ.setdefault("RECIPE_PAGE_FETCH", "off")
+    logging.disable(logging.WARNING)
+    fake_providers.install(latency=args.latency_ms / 1000)
+    share_test_runtime()
+
+    levels = []
+    for concurrency in [int(value) for value in args.concurrency.split(",") if value.strip()]:
+        sessions = args.sessions or 2 * concurrency
+        levels.append(run_level(concurrency, sessions, args.timeout))
+        print(f"concurrency {concurrency}: {sessions} sessions done", file=sys.stderr)
+
+    print_report(levels)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(levels, f, indent=2)
+    return 1 if any(level["errors"] for level in levels) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,191 @@
+"""Fill the translation, search and extraction caches with popular queries.
+
+Each query goes through the same translate → search → extract nodes as a
+first search in the app, a few at a time, so the answers land in the shared
+cache backend, the LLM response cache and the page cache. Usage:
+
+    python -m recipe_app.tools.prewarm [--queries FILE] [--from-log FILE]
+                                       [--top N] [--concurrency N]
+                                       [--min-coverage FRACTION] [--ready-file PATH]
+                                       [--corpus DIR]
+
+``--queries`` reads one user request per line. ``--from-log`` counts the
+"Query translated: ..." lines in an app log and warms the most frequent
+search queries (these skip translation, which already happened). When at
+least ``--min-coverage`` of the queries warmed, ``--ready-file`` is written,
+so a readiness probe can wait for it. ``--corpus`` also publishes the
+recipes and features found as a new generation of the recipe corpus snapshot.
+"""
+import re
+import sys
+import json
+import time
+import logging
+import argparse
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+
+from recipe_app.config.settings import settings
+
+# Logged by QueryTranslator for every search
+TRANSLATED_QUERY_LINE = re.compile(r"Query translated: (.+?)\s*$")
+# Extraction sources whose result came from (and is now cached for) the real extractor
+WARM_FEATURE_SOURCES = {"llm", "structured"}
+
+
+def read_queries(path: str) -> List[str]:
+    """Read one query per line, skipping blanks, comments and repeats."""
+    with open(path, encoding="utf-8") as f:
+        lines = [line.strip() for line in f]
+    return list(dict.fromkeys(line for line in lines if line and not line.startswith("#")))
+
+
+def queries_from_log(path: str, top: Optional[int] = None) -> List[str]:
+    """Return the ``top`` most frequent translated search queries in an app log.
+
+    Reads JSON and text logs; sampled JSON records count ``sample_rate`` times.
+    """
+    counts: Counter = Counter()
+    with open(path, encoding="utf-8", errors="replace") as f:
+        for line in f:
+            weight = 1
+            if line.startswith("{"):
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                line, weight = str(record.get("message", "")), record.get("sample_rate", 1)
+            match = TRANSLATED_QUERY_LINE.search(line)
+            if match:
+                counts[match.group(1)] += weight
+    return [query for query, _ in counts.most_common(top if top is not None else settings().prewarm_top_queries)]
+
+
+def warm_query(query: str, translated: bool = False, writer: Optional[Any] = None) -> Dict[str, Any]:
+    """Run one query through translation, search and extraction; report what got cached.
+
+    Recipes found are also queued on a CorpusWriter, if one is given.
+    """
+    from langchain_core.messages import HumanMessage
+    from recipe_app.services.recipe_services import QueryTranslator, RecipeRetriever, RecipeKeyFeatures
+    from recipe_app.services.recipe_store import recipe_store
+
+    started = time.perf_counter()
+    result: Dict[str, Any] = {
+        "query": query, "translated": translated, "search_query": None,
+        "recipes": 0, "feature_source": None, "error": None
+    }
+    try:
+        state: Dict[str, Any] = {"messages": [HumanMessage(content=query)]}
+        if translated:
+            state["query"] = query
+        else:
+            state = QueryTranslator.translate(state)
+            result["translated"] = bool(state.get("query"))
+        result["search_query"] = state.get("query")
+        state = RecipeRetriever.retrieve(state)
+        result["recipes"] = len(state.get("recipes") or [])
+        if result["recipes"]:
+            state = RecipeKeyFeatures.extract(state)
+            result["feature_source"] = state.get("feature_source")
+            if writer is not None:
+                features = state.get("key_features") or []
+                for index, recipe in enumerate(state["recipes"]):
+                    writer.add(recipe_store.resolve(recipe), features[index] if index < len(features) else None)
+    except Exception as e:
+        result["error"] = f"{type(e).__name__}: {e}"
+    result["seconds"] = round(time.perf_counter() - started, 3)
+    result["warm"] = bool(result["translated"] and result["recipes"] and result["feature_source"] in WARM_FEATURE_SOURCES)
+    return result
+
+
+def prewarm(queries: List[str], concurrency: Optional[int] = None, translated: bool = False,
+            writer: Optional[Any] = None) -> Dict[str, Any]:
+    """Warm the caches for ``queries``, ``concurrency`` at a time, and summarize coverage."""
+    concurrency = concurrency if concurrency is not None else settings().prewarm_concurrency
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max(1, concurrency), thread_name_prefix="prewarm") as executor:
+        results = list(executor.map(lambda query: warm_query(query, translated, writer), queries))
+    warm = sum(1 for result in results if result["warm"])
+    return {
+        "queries": len(queries),
+        "translated": sum(1 for result in results if result["translated"]),
+        "searched": sum(1 for result in results if result["recipes"]),
+        "extracted": sum(1 for result in results if result["feature_source"] in WARM_FEATURE_SOURCES),
+        "warm": warm,
+        "coverage": round(warm / len(queries), 3) if queries else 1.0,
+        "wall_seconds": round(time.perf_counter() - started, 3),
+        "results": results,
+    }
+
+
+def combine(first: Dict[str, Any], second: Dict[str, Any]) -> Dict[str, Any]:
+    """Merge the reports of two pre-warm runs."""
+    totals = ("queries", "translated", "searched", "extracted", "warm", "wall_seconds", "results")
+    combined = {key: first[key] + second[key] for key in totals}
+    combined["coverage"] = round(combined["warm"] / combined["queries"], 3) if combined["queries"] else 1.0
+    return combined
+
+
+def print_report(report: Dict[str, Any]) -> None:
+    """Print per-stage coverage, time spent and the first few failures."""
+    total = report["queries"]
+    print(f"Pre-warmed {report['warm']}/{total} queries ({report['coverage']:.0%}) in {report['wall_seconds']}s")
+    for stage in ("translated", "searched", "extracted"):
+        print(f"  {stage:<10} {report[stage]:>4}/{total}")
+    cold = [result for result in report["results"] if not result["warm"]]
+    for result in cold[:5]:
+        reason = result["error"] or f"{result['recipes']} recipes, features: {result['feature_source']}"
+        print(f"  not warm: {result['query']!r} ({reason})")
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Fill the caches with popular queries.")
+    parser.add_argument("--queries", default=None, help="File with one user request per line")
+    parser.add_argument("--from-log", default=None, help="App log to take the most frequent search queries from")
+    parser.add_argument("--top", type=int, default=None, help="Queries taken from the log (default: prewarm_top_queries)")
+    parser.add_argument("--concurrency", type=int, default=None, help="Queries run at once (default: prewarm_concurrency)")
+    parser.add_argument("--min-coverage", type=float, default=0.0, help="Fraction of queries that must warm")
+    parser.add_argument("--ready-file", default=None, help="Written once the minimum coverage is reached")
+    parser.add_argument("--json", default=None, help="Also write the report to this file")
+    parser.add_argument("--corpus", default=None, help="Publish the recipes found to this corpus directory")
+    args = parser.parse_args(argv)
+
+    if not args.queries and not args.from_log:
+        parser.error("give --queries and/or --from-log")
+    logging.disable(logging.WARNING)
+
+    from recipe_app.services.cache import get_cache_backend, InMemoryCache
+    if isinstance(get_cache_backend(), InMemoryCache):
+        # Only the LLM response and page caches are files; the rest dies with this process
+        print("Warning: the cache backend is in-memory, so search and extraction results "
+              "will not reach the app (set RECIPE_CACHE_BACKEND)", file=sys.stderr)
+
+    writer = None
+    if args.corpus:
+        from recipe_app.services.corpus import CorpusWriter
+        writer = CorpusWriter(args.corpus)
+
+    report = prewarm(read_queries(args.queries), args.concurrency, writer=writer) if args.queries else None
+    if args.from_log:
+        logged = prewarm(queries_from_log(args.from_log, args.top), args.concurrency, translated=True, writer=writer)
+        report = logged if report is None else combine(report, logged)
+
+    print_report(report)
+    if writer is not None and len(writer):
+        recipes = len(writer)
+        print(f"Published {recipes} recipes as corpus generation {writer.commit()}")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    if report["coverage"] < args.min_coverage:
+        return 1
+    if args.ready_file:
+        with open(args.ready_file, "w", encoding="utf-8") as f:
+            f.write(f"{report['warm']}/{report['queries']}\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,89 @@
+"""Record the cassettes replayed by the agent scripts in ``tests/``, offline.
+
+Each script runs in its own process in record mode. Tavily searches are
+answered by ``recipe_app.tools.fake_providers`` and OpenAI requests by its
+HTTP stand-in, so the real ``ChatOpenAI`` client still builds every request
+that lands in the cassette. No API keys or network access are needed.
+Usage:
+
+    python -m recipe_app.tools.record_cassettes [agent_simple agent feedback_loop]
+
+To record real provider traffic instead, run a script with real keys and
+``RECIPE_RECORD_MODE=record``.
+"""
+import io
+import os
+import sys
+import runpy
+import argparse
+import subprocess
+from typing import List
+
+from recipe_app.config.config import CASSETTE_DIR
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+
+# Cassette name -> script that replays it
+SCRIPTS = {
+    "agent_simple": "tests/test_agent_simple.py",
+    "agent": "tests/test_agent.py",
+    "feedback_loop": "tests/test_feedback_loop.py",
+}
+
+# Placeholder keys; the stand-ins never check them and cassettes never store them
+OFFLINE_KEYS = {"OPENAI_API_KEY": "sk-offline", "TAVILY_API_KEY": "tvly-offline"}
+
+
+def run_script(name: str) -> None:
+    """Run one script in this process with the providers answered offline."""
+    import httpx
+    import langchain_community.tools.tavily_search.tool as tavily_tool
+    from recipe_app.services import model_router
+    from recipe_app.services.record_replay import CassetteTransport, get_cassette
+    from recipe_app.tools import fake_providers
+
+    def http_client(mode: str):
+        if mode == "off":
+            return None
+        return httpx.Client(transport=CassetteTransport(get_cassette(), mode, inner=fake_providers.openai_transport()))
+
+    tavily_tool.TavilySearchResults = fake_providers.FakeTavilySearchResults
+    model_router.http_client = http_client
+    # Interactive scripts are answered "no" to their optional follow-up questions
+    sys.stdin = io.StringIO("no\n")
+    sys.argv = [SCRIPTS[name]]
+    runpy.run_path(os.path.join(ROOT_DIR, SCRIPTS[name]), run_name="__main__")
+
+
+def record(name: str) -> int:
+    """Record a cassette from scratch in a child process; returns its exit code."""
+    path = os.path.join(ROOT_DIR, CASSETTE_DIR, f"{name}.json")
+    if os.path.exists(path):
+        os.remove(path)
+    env = {**os.environ, **OFFLINE_KEYS, "RECIPE_RECORD_MODE": "record", "RECIPE_CASSETTE": path}
+    command = [sys.executable, "-m", "recipe_app.tools.record_cassettes", "--run", name]
+    return subprocess.run(command, cwd=ROOT_DIR, env=env, stdout=subprocess.DEVNULL).returncode
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("names", nargs="*", metavar="NAME", help=f"cassettes to record (default: {' '.join(SCRIPTS)})")
+    parser.add_argument("--run", choices=list(SCRIPTS), help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.run:
+        run_script(args.run)
+        return 0
+    unknown = set(args.names) - set(SCRIPTS)
+    if unknown:
+        parser.error(f"unknown cassette: {', '.join(sorted(unknown))}")
+    failed = 0
+    for name in args.names or list(SCRIPTS):
+        code = record(name)
+        print(f"{'✅' if code == 0 else '❌'} {CASSETTE_DIR}/{name}.json")
+        failed += code != 0
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,90 @@
+"""Report import time per module for the app's entry points.
+
+Each target is imported in a fresh interpreter with ``python -X importtime`` so
+results reflect a cold start. Usage:
+
+    python -m recipe_app.tools.startup_profile [module ...] [--top N] [--budget-ms MS]
+
+With ``--budget-ms`` the command exits non-zero when any target's total import
+time exceeds the budget, so it can be used as a regression check.
+"""
+import argparse
+import os
+import re
+import subprocess
+import sys
+from collections import defaultdict
+from typing import Dict, List, Tuple
+
+DEFAULT_TARGETS = [
+    "recipe_app.config.config",
+    "recipe_app.models.recipe_models",
+    "recipe_app.services.recipe_services",
+]
+
+# "import time:  self [us] | cumulative | imported package"
+IMPORT_TIME_LINE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+
+
+def profile_import(module: str) -> List[Tuple[str, int, int, int]]:
+    """Import a module in a fresh interpreter and return (name, self_us, cumulative_us, depth) rows."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        cwd=ROOT_DIR,
+        env={**os.environ, "PYTHONDONTWRITEBYTECODE": "1"}
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{result.stderr[-2000:]}")
+
+    rows = []
+    for line in result.stderr.splitlines():
+        match = IMPORT_TIME_LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            rows.append((name, int(self_us), int(cumulative_us), len(indent) // 2))
+    return rows
+
+
+def summarize(rows: List[Tuple[str, int, int, int]]) -> Tuple[int, Dict[str, int]]:
+    """Return the target's total import time and self time grouped by top-level package.
+
+    Imports done by the interpreter itself (everything up to ``site``) are excluded.
+    """
+    site_rows = [index for index, row in enumerate(rows) if row[0] == "site" and row[3] == 0]
+    if site_rows:
+        rows = rows[site_rows[-1] + 1:]
+    total_us = sum(cumulative_us for _, _, cumulative_us, depth in rows if depth == 0)
+    by_package: Dict[str, int] = defaultdict(int)
+    for name, self_us, _, _ in rows:
+        by_package[name.split(".")[0]] += self_us
+    return total_us, dict(by_package)
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Profile cold-start import time per module.")
+    parser.add_argument("modules", nargs="*", default=DEFAULT_TARGETS, help="Modules to import")
+    parser.add_argument("--top", type=int, default=10, help="Packages to list per module")
+    parser.add_argument("--budget-ms", type=float, default=None, help="Fail if a module's total exceeds this")
+    args = parser.parse_args(argv)
+
+    over_budget = []
+    for module in args.modules:
+        total_us, by_package = summarize(profile_import(module))
+        print(f"{module}: {total_us / 1000:.1f} ms")
+        for package, self_us in sorted(by_package.items(), key=lambda item: item[1], reverse=True)[:args.top]:
+            print(f"    {package:<30} {self_us / 1000:8.1f} ms")
+        if args.budget_ms is not None and total_us / 1000 > args.budget_ms:
+            over_budget.append(module)
+
+    if over_budget:
+        print(f"Over the {args.budget_ms:.0f} ms import budget: {', '.join(over_budget)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,5 +1,6 @@
 import streamlit as st
 from typing import Dict, List
+from recipe_app.services.recipe_store import recipe_store
 
 def apply_custom_css():
     """Apply custom CSS styling with the specified color palette."""
@@ -115,12 +116,17 @@ def apply_custom_css():
 
 def display_recipe_card(recipe: Dict):
     """Display a recipe card with title, ingredients, and instructions."""
+    recipe = recipe_store.resolve(recipe)
     st.markdown(f"## {recipe['name']}")
     st.markdown(f"[View Original Recipe]({recipe['url']})")
     st.markdown("### Recipe Details")
-    st.markdown(recipe['content'])
+    # The fetched page has the complete recipe; the search snippet is the fallback.
+    # Both come from third-party sites, so they are shown as plain text, not Markdown
+    details = recipe.get('page_content') or recipe.get('content')
+    if details:
+        st.text(details)
 
-def display_recipe_features(features: List[Dict]):
+def display_recipe_features(features: List):
     """Display extracted recipe features."""
     st.markdown("### 📋 Recipe Overview")
     for i, feature in enumerate(features, 1):
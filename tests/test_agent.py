@@ -8,45 +8,11 @@ import sys
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 from langchain_core.messages import HumanMessage
-from langgraph.graph import StateGraph, START, END
-from langgraph.checkpoint.memory import MemorySaver
 
-from recipe_app.models.recipe_models import RecipeState
-from recipe_app.services.recipe_services import (
-    QueryTranslator, 
-    RecipeRetriever, 
-    RecipeKeyFeatures, 
-    HumanFeedback,
-    Satisfaction
-)
-
-def initialize_graph():
-    """Initialize the recipe processing graph."""
-    builder = StateGraph(RecipeState)
-
-    # Add nodes
-    builder.add_node("translate_query", QueryTranslator.translate)
-    builder.add_node("retrieve_recipes", RecipeRetriever.retrieve)
-    builder.add_node("extract_key_features", RecipeKeyFeatures.extract)
-    builder.add_node("human_feedback", HumanFeedback.refine)
-
-    # Add edges
-    builder.add_edge(START, "translate_query")
-    builder.add_edge("translate_query", "retrieve_recipes")
-    builder.add_edge("retrieve_recipes", "extract_key_features")
-    builder.add_edge("extract_key_features", "human_feedback")
-
-    # Add conditional edges for feedback loop
-    builder.add_conditional_edges(
-        "human_feedback",
-        Satisfaction.recipe_satisfaction,
-        {
-            "translate_query": "translate_query",
-            END: END
-        }
-    )
-
-    return builder.compile()
+from recipe_app.config.config import load_environment
+from recipe_app.services.recipe_store import recipe_store
+from recipe_app.services.record_replay import CassetteMissError, use_cassette
+from recipe_app.services.graph import build_graph
 
 def print_separator(char="=", length=80):
     """Print a separator line."""
@@ -65,7 +31,7 @@ def print_recipes(state):
     for i, recipe in enumerate(state['recipes'], 1):
         print(f"\n📖 Recipe {i}: {recipe.get('name', 'Unknown')}")
         print(f"   URL: {recipe.get('url', 'N/A')}")
-        print(f"   Content: {recipe.get('content', 'N/A')[:200]}...")
+        print(f"   Content: {recipe_store.resolve(recipe).get('content', 'N/A')[:200]}...")
 
 def print_key_features(state):
     """Print the extracted key features."""
@@ -89,24 +55,33 @@ def main():
     print("🤖 RECIPE AGENT TEST - Terminal Mode")
     print_separator("*")
     
+    # Pick up keys from a .env file, if there is one
+    load_environment()
+    
     # Check for API keys
     openai_key = os.getenv("OPENAI_API_KEY")
     tavily_key = os.getenv("TAVILY_API_KEY")
     
-    if not openai_key:
+    # A recorded cassette is replayed offline, without keys; a missing one is an error
+    try:
+        replaying = use_cassette("agent") == "replay"
+    except CassetteMissError as e:
+        print(f"\n❌ ERROR: {e}")
+        sys.exit(1)
+    
+    if not openai_key and not replaying:
         openai_key = input("\n🔑 Enter your OpenAI API Key: ").strip()
         os.environ["OPENAI_API_KEY"] = openai_key
     
-    if not tavily_key:
+    if not tavily_key and not replaying:
         tavily_key = input("🔑 Enter your Tavily API Key: ").strip()
         os.environ["TAVILY_API_KEY"] = tavily_key
     
-    print("\n✅ API keys configured!")
+    print("\n📼 Replaying recorded API traffic" if replaying else "\n✅ API keys configured!")
     
     # Initialize the graph
     print("\n⚙️  Initializing recipe agent graph...")
-    graph = initialize_graph()
-    memory = MemorySaver()
+    graph = build_graph()
     
     # Test input
     user_input = "I have eggs, flour, tomatoes and cheese - what can I make?"
@@ -147,8 +122,8 @@ def main():
         print("\n✅ Agent workflow completed successfully!")
         print_separator("*")
         
-        # Optional: Test feedback loop
-        test_feedback = input("\n❓ Would you like to test the feedback loop? (yes/no): ").strip().lower()
+        # Optional: Test feedback loop (not part of the recording, so replays skip it)
+        test_feedback = "no" if replaying else input("\n❓ Would you like to test the feedback loop? (yes/no): ").strip().lower()
         
         if test_feedback in ['yes', 'y']:
             feedback = input("\n💬 Enter your feedback (e.g., 'I want something vegetarian'): ").strip()
@@ -156,14 +131,10 @@ def main():
             print(f"\n🔄 Processing feedback: '{feedback}'")
             print_separator()
             
-            # Add feedback to state
-            output["feedback"] = feedback
-            
-            # Run again with feedback
-            output = graph.invoke(
-                output,
-                {"configurable": {"thread_id": "test_1"}}
-            )
+            # Resume the paused thread with the feedback
+            config = {"configurable": {"thread_id": "test_1"}}
+            graph.update_state(config, {"feedback": feedback})
+            output = graph.invoke(None, config)
             
             print_recipes(output)
             print_key_features(output)
@@ -179,5 +150,6 @@ def main():
         return None
 
 if __name__ == "__main__":
-    main()
+    result = main()
+    sys.exit(0 if result else 1)
 
@@ -8,44 +8,11 @@ import sys
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 from langchain_core.messages import HumanMessage
-from langgraph.graph import StateGraph, START, END
 
-from recipe_app.models.recipe_models import RecipeState
-from recipe_app.services.recipe_services import (
-    QueryTranslator, 
-    RecipeRetriever, 
-    RecipeKeyFeatures, 
-    HumanFeedback,
-    Satisfaction
-)
-
-def initialize_graph():
-    """Initialize the recipe processing graph."""
-    builder = StateGraph(RecipeState)
-
-    # Add nodes
-    builder.add_node("translate_query", QueryTranslator.translate)
-    builder.add_node("retrieve_recipes", RecipeRetriever.retrieve)
-    builder.add_node("extract_key_features", RecipeKeyFeatures.extract)
-    builder.add_node("human_feedback", HumanFeedback.refine)
-
-    # Add edges
-    builder.add_edge(START, "translate_query")
-    builder.add_edge("translate_query", "retrieve_recipes")
-    builder.add_edge("retrieve_recipes", "extract_key_features")
-    builder.add_edge("extract_key_features", "human_feedback")
-
-    # Add conditional edges for feedback loop
-    builder.add_conditional_edges(
-        "human_feedback",
-        Satisfaction.recipe_satisfaction,
-        {
-            "translate_query": "translate_query",
-            END: END
-        }
-    )
-
-    return builder.compile()
+from recipe_app.config.config import load_environment
+from recipe_app.services.recipe_store import recipe_store
+from recipe_app.services.record_replay import CassetteMissError, use_cassette
+from recipe_app.services.graph import build_graph
 
 def print_separator(char="=", length=80):
     """Print a separator line."""
@@ -57,11 +24,23 @@ def main():
     print("🤖 RECIPE AGENT TEST - Terminal Mode")
     print_separator("*")
     
+    # Pick up keys from a .env file, if there is one
+    load_environment()
+    
     # Check for API keys from environment
     openai_key = os.getenv("OPENAI_API_KEY")
     tavily_key = os.getenv("TAVILY_API_KEY")
     
-    if not openai_key or not tavily_key:
+    # A recorded cassette is replayed offline, without keys; a missing one is an error
+    try:
+        mode = use_cassette("agent_simple")
+    except CassetteMissError as e:
+        print(f"\n❌ ERROR: {e}")
+        sys.exit(1)
+    
+    if mode == "replay":
+        print("\n📼 Replaying recorded API traffic from tests/cassettes/agent_simple.json")
+    elif not openai_key or not tavily_key:
         print("\n❌ ERROR: API keys not found in environment!")
         print("\nPlease set environment variables:")
         print("  export OPENAI_API_KEY='your-key-here'")
@@ -82,7 +61,7 @@ def main():
     
     # Initialize the graph
     print("\n⚙️  Initializing recipe agent graph...")
-    graph = initialize_graph()
+    graph = build_graph()
     
     # Test input
     user_input = "I have eggs, flour, tomatoes and cheese - what can I make?"
@@ -113,7 +92,7 @@ def main():
         for i, recipe in enumerate(output.get('recipes', []), 1):
             print(f"\n📖 Recipe {i}: {recipe.get('name', 'Unknown')}")
             print(f"   URL: {recipe.get('url', 'N/A')}")
-            print(f"   Preview: {recipe.get('content', 'N/A')[:150]}...")
+            print(f"   Preview: {recipe_store.resolve(recipe).get('content', 'N/A')[:150]}...")
         
         # Print key features
         print_separator()
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""Tests for the headless HTTP API against fake providers."""
+
+import os
+import sys
+import json
+import tempfile
+import threading
+from contextlib import contextmanager
+
+# Add parent directory to path to import recipe_app
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from starlette.testclient import TestClient
+
+import recipe_app.api as api
+import recipe_app.services.recipe_store as recipe_store_module
+from recipe_app.services.cache import InMemoryCache, SQLiteCache, using_cache_backend
+from recipe_app.services.recipe_store import RecipeStore
+from recipe_app.tools import fake_providers
+
+@contextmanager
+def fresh_recipe_store():
+    """Give every module that imported the process-wide recipe store a new, empty one."""
+    original, fresh = recipe_store_module.recipe_store, RecipeStore()
+    modules = [module for module in list(sys.modules.values()) if vars(module).get("recipe_store") is original]
+    for module in modules:
+        module.recipe_store = fresh
+    try:
+        yield fresh
+    finally:
+        for module in modules:
+            module.recipe_store = original
+
+def test_search_feedback_and_selection_across_processes():
+    os.environ["RECIPE_LLM_CACHE"] = "off"
+    os.environ["RECIPE_PAGE_FETCH"] = "off"
+    uninstall = fake_providers.install(latency=0)
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "shared.sqlite3")
+            client = TestClient(api.app)
+            with using_cache_backend(SQLiteCache(path)):
+                assert client.post("/search", json={}).status_code == 400
+                results = client.post("/search", json={"query": "Chicken with rice"}).json()
+                assert results["awaiting_feedback"] and len(results["key_features"]) == 3
+                thread_id = results["thread_id"]
+
+            # Another process: its own graph, backend connection and recipe store; only the file is shared
+            api._graph = None
+            with using_cache_backend(SQLiteCache(path)), fresh_recipe_store() as store:
+                with client.stream("POST", f"/threads/{thread_id}/feedback", json={"feedback": "I like option 2"},
+                                   headers={"Accept": "text/event-stream"}) as response:
+                    assert response.headers["content-type"].startswith("text/event-stream")
+                    events = [block for block in "".join(response.iter_text()).split("\n\n") if block]
+                assert events[0].startswith("event: node")
+                final = json.loads(events[-1].split("data: ", 1)[1])
+                assert not final["awaiting_feedback"]
+                assert final["selected"]["recipe"]["name"] == results["recipes"][1]["name"]
+                # The body was read back from the shared backend
+                assert final["selected"]["recipe"]["content"] and len(store) > 0
+
+                assert client.post(f"/threads/{thread_id}/feedback", json={"feedback": "more"}).status_code == 409
+                assert client.post("/threads/unknown/feedback", json={"feedback": "more"}).status_code == 404
+    finally:
+        uninstall()
+        os.environ.pop("RECIPE_LLM_CACHE", None)
+        os.environ.pop("RECIPE_PAGE_FETCH", None)
+        api._graph = None
+
+def test_favorites_are_kept_per_user():
+    with using_cache_backend(InMemoryCache()):
+        client = TestClient(api.app)
+        recipe = {"name": "Shakshuka", "url": "https://example.com/shakshuka", "content": "Eggs in tomato sauce."}
+        recipe_id = api.recipe_store.put(recipe)["id"]
+
+        assert client.put(f"/users/ana/favorites/{recipe_id}").json()["favorites"][0]["name"] == "Shakshuka"
+        assert client.put(f"/users/ana/favorites/{recipe_id}").json()["favorites"] == [
+            {"id": recipe_id, "name": "Shakshuka", "url": "https://example.com/shakshuka"}
+        ]
+        assert client.get("/users/ben/favorites").json() == {"favorites": []}
+        assert client.get(f"/recipes/{recipe_id}").json()["content"] == "Eggs in tomato sauce."
+        assert client.delete(f"/users/ana/favorites/{recipe_id}").json() == {"favorites": []}
+        assert client.put("/users/ana/favorites/missing").status_code == 404
+
+def test_concurrent_favorite_updates_are_all_kept():
+    with tempfile.TemporaryDirectory() as tmp, using_cache_backend(SQLiteCache(os.path.join(tmp, "shared.sqlite3"))):
+        client = TestClient(api.app)
+        recipe_ids = [
+            api.recipe_store.put({"name": f"Dish {n}", "url": f"https://example.com/dish-{n}", "content": "Steps."})["id"]
+            for n in range(8)
+        ]
+        threads = [threading.Thread(target=client.put, args=(f"/users/cam/favorites/{recipe_id}",)) for recipe_id in recipe_ids]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        favorites = client.get("/users/cam/favorites").json()["favorites"]
+        assert sorted(favorite["id"] for favorite in favorites) == sorted(recipe_ids)
+
+if __name__ == "__main__":
+    test_search_feedback_and_selection_across_processes()
+    test_favorites_are_kept_per_user()
+    test_concurrent_favorite_updates_are_all_kept()
+    print("✅ HTTP API tests passed!")
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""Tests for cross-session micro-batching of feature extraction."""
+
+import os
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# Add parent directory to path to import recipe_app
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from recipe_app.models.recipe_models import RecipeFeature
+from recipe_app.services.batching import MicroBatcher
+from recipe_app.services.recipe_services import RecipeKeyFeatures
+
+def test_concurrent_submissions_share_batches():
+    batches = []
+    lock = threading.Lock()
+
+    def double(items):
+        with lock:
+            batches.append(list(items))
+        return [item * 2 for item in items]
+
+    batcher = MicroBatcher(double, window_seconds=0.2, max_batch_size=3)
+    with ThreadPoolExecutor(max_workers=6) as executor:
+        futures = list(executor.map(batcher.submit, range(6)))
+    assert [future.result(timeout=5) for future in futures] == [0, 2, 4, 6, 8, 10]
+    assert sorted(len(batch) for batch in batches) == [3, 3]
+
+def test_batch_errors_reach_every_caller():
+    def fail(items):
+        raise RuntimeError("rate limited")
+
+    batcher = MicroBatcher(fail, window_seconds=0.01, max_batch_size=4)
+    future = batcher.submit("recipes")
+    try:
+        future.result(timeout=5)
+        assert False, "expected the batch error"
+    except RuntimeError as e:
+        assert "rate limited" in str(e)
+
+def test_batched_extraction_splits_results_by_recipe_count():
+    calls = []
+
+    def invoke(node, recipes_str):
+        calls.append(node)
+        names = [line[len("Recipe: "):] for line in recipes_str.splitlines() if line.startswith("Recipe: ")]
+        return [RecipeFeature(dish_name=name) for name in names], 30
+
+    original = RecipeKeyFeatures._invoke_extraction
+    RecipeKeyFeatures._invoke_extraction = staticmethod(invoke)
+    try:
+        results = RecipeKeyFeatures._extract_batch([
+            ("Recipe: A\nContent: a\n\nRecipe: B\nContent: b", 2),
+            ("Recipe: C\nContent: c", 1)
+        ])
+    finally:
+        RecipeKeyFeatures._invoke_extraction = original
+
+    assert calls == ["extract_key_features_batch"]
+    assert [[feature.dish_name for feature in features] for features, _ in results] == [["A", "B"], ["C"]]
+    assert [tokens for _, tokens in results] == [20, 10]
+
+if __name__ == "__main__":
+    test_concurrent_submissions_share_batches()
+    test_batch_errors_reach_every_caller()
+    test_batched_extraction_splits_results_by_recipe_count()
+    print("✅ Batching tests passed!")
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""Tests for the per-search feedback loop budget."""
+
+import os
+import sys
+import time
+
+# Add parent directory to path to import recipe_app
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from langgraph.constants import END
+
+from recipe_app.config.settings import settings, settings_manager
+from recipe_app.models.recipe_models import FeatureRecord
+from recipe_app.services.budget import TurnBudget
+from recipe_app.services.recipe_services import ResultRefiner, Satisfaction
+
+def test_exhausted_reports_the_first_limit_reached():
+    settings_manager.override(settings().model_copy(update={
+        "max_feedback_loops": 2, "conversation_token_budget": 1000, "turn_deadline_seconds": 30
+    }))
+    try:
+        fresh = {"turn_started_at": time.time(), "cycle_tokens": 100, "cycle_seconds": 5}
+        assert TurnBudget.exhausted(fresh) is None
+        assert TurnBudget.exhausted({**fresh, "loop_iterations": 2}) == "iterations"
+        assert TurnBudget.exhausted({**fresh, "tokens_used": 950}) == "tokens"
+        assert TurnBudget.exhausted({**fresh, "turn_started_at": time.time() - 28}) == "deadline"
+
+        state = dict(fresh)
+        assert TurnBudget.allow_cycle(state) and TurnBudget.allow_cycle(state)
+        assert not TurnBudget.allow_cycle(state) and state["budget_exhausted"] == "iterations"
+        assert state["loop_iterations"] == 2
+    finally:
+        settings_manager.override(None)
+
+def test_each_new_search_starts_with_a_fresh_budget():
+    state = {"loop_iterations": 3, "tokens_used": 10 ** 6, "budget_exhausted": "tokens", "cycle_tokens": 100}
+    assert TurnBudget.exhausted(state)
+    TurnBudget.begin_search(state)
+    assert TurnBudget.exhausted(state) is None and state["budget_exhausted"] is None
+    # Feedback rounds of the same search keep counting
+    state["loop_iterations"] = 1
+    TurnBudget.begin_turn(state)
+    assert state["loop_iterations"] == 1
+
+def test_refinement_stops_with_local_matches_when_the_budget_is_spent():
+    match = {"recipe": {"name": "Veggie Curry", "url": "https://example.com/curry", "content": ""},
+             "feature": FeatureRecord("Veggie Curry", ("spinach", "rice"))}
+    beef = {"recipe": {"name": "Beef Stew", "url": "https://example.com/stew", "content": ""},
+            "feature": FeatureRecord("Beef Stew", ("beef",))}
+    state = {
+        "recipes": [beef["recipe"]], "key_features": [beef["feature"]], "recipe_pool": [match],
+        "refinement": "make it vegetarian", "loop_iterations": settings().max_feedback_loops,
+    }
+    state = ResultRefiner.refine(state)
+    assert state["budget_exhausted"] == "iterations"
+    assert ResultRefiner.next_step(state) == "human_feedback"
+    assert [feature.dish_name for feature in state["key_features"]] == ["Veggie Curry"]
+
+    # Feedback that would start another search ends the run instead
+    assert Satisfaction.recipe_satisfaction({"feedback": "more", "loop_iterations": 99}) == END
+
+if __name__ == "__main__":
+    test_exhausted_reports_the_first_limit_reached()
+    test_each_new_search_starts_with_a_fresh_budget()
+    test_refinement_stops_with_local_matches_when_the_budget_is_spent()
+    print("✅ Budget tests passed!")
@@ -0,0 +1,288 @@
+#!/usr/bin/env python3
+"""Tests for the shared cache backends."""
+
+import os
+import sys
+import time
+import socket
+import socketserver
+import tempfile
+import threading
+
+# Add parent directory to path to import recipe_app
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from recipe_app.models.recipe_models import RecipeFeature
+from recipe_app.services.cache import (
+    InMemoryCache,
+    SQLiteCache,
+    RedisCache,
+    CachedError,
+    bypass_response_cache,
+    cached_call,
+    dumps,
+    loads,
+    make_key,
+    using_cache_backend,
+    using_response_cache
+)
+from recipe_app.models.recipe_models import ResponseRecipeKeyFeatures
+from recipe_app.services.model_router import ModelRouter, _cached_response
+from langchain_core.messages import AIMessage, HumanMessage
+
+FEATURES = [
+    RecipeFeature(dish_name="Shakshuka", key_ingredients=["eggs", "tomatoes"], cooking_style="simmered"),
+    RecipeFeature(dish_name="Pancakes", key_ingredients=["flour", "milk"])
+]
+
+class RespStandIn(socketserver.ThreadingTCPServer):
+    """Local stand-in for a Redis server supporting GET, SET [PX], DEL, SELECT and WATCH/MULTI/EXEC."""
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self):
+        self.store = {}
+        self.versions = {}
+        self.lock = threading.Lock()
+        # Command on which the next connection is closed without a reply
+        self.drop_on = None
+        super().__init__(("127.0.0.1", 0), RespHandler)
+
+class RespHandler(socketserver.StreamRequestHandler):
+    def read_command(self):
+        header = self.rfile.readline()
+        if not header:
+            return None
+        parts = []
+        for _ in range(int(header[1:-2])):
+            length = int(self.rfile.readline()[1:-2])
+            parts.append(self.rfile.read(length + 2)[:-2])
+        return parts
+
+    def handle(self):
+        server, store = self.server, self.server.store
+        watched, queued = {}, None
+        while True:
+            parts = self.read_command()
+            if parts is None:
+                return
+            command = parts[0].upper()
+            if command == server.drop_on:
+                server.drop_on = None
+                return
+            if command == b"WATCH":
+                watched[parts[1]] = server.versions.get(parts[1], 0)
+                self.wfile.write(b"+OK\r\n")
+            elif command == b"UNWATCH":
+                watched = {}
+                self.wfile.write(b"+OK\r\n")
+            elif command == b"MULTI":
+                queued = []
+                self.wfile.write(b"+OK\r\n")
+            elif queued is not None and command != b"EXEC":
+                queued.append(parts)
+                self.wfile.write(b"+QUEUED\r\n")
+            elif command == b"EXEC":
+                with server.lock:
+                    if any(server.versions.get(key, 0) != version for key, version in watched.items()):
+                        self.wfile.write(b"*-1\r\n")
+                    else:
+                        for queued_parts in queued:
+                            self.set(queued_parts)
+                        self.wfile.write(b"*%d\r\n" % len(queued) + b"+OK\r\n" * len(queued))
+                watched, queued = {}, None
+            elif command == b"SET":
+                with server.lock:
+                    self.set(parts)
+                self.wfile.write(b"+OK\r\n")
+            elif command == b"GET":
+                value, expires_at = store.get(parts[1], (None, None))
+                if value is None or (expires_at and expires_at <= time.time()):
+                    self.wfile.write(b"$-1\r\n")
+                else:
+                    self.wfile.write(b"$%d\r\n%s\r\n" % (len(value), value))
+            elif command == b"DEL":
+                self.wfile.write(b":%d\r\n" % (1 if store.pop(parts[1], None) else 0))
+            else:
+                self.wfile.write(b"+OK\r\n")
+
+    def set(self, parts):
+        expires_at = time.time() + int(parts[4]) / 1000 if len(parts) > 3 else None
+        self.server.store[parts[1]] = (parts[2], expires_at)
+        self.server.versions[parts[1]] = self.server.versions.get(parts[1], 0) + 1
+
+def append(item):
+    """An update that adds an item to a JSON list."""
+    return lambda data: dumps((loads(data) if data is not None else []) + [item])
+
+def check_backend(backend):
+    backend.set("features", dumps(FEATURES))
+    assert loads(backend.get("features")) == FEATURES
+    backend.set("short", b"x", ttl=0.05)
+    time.sleep(0.1)
+    assert backend.get("short") is None
+    backend.delete("features")
+    assert backend.get("features") is None
+
+    # Concurrent read-modify-write updates are all kept
+    threads = [threading.Thread(target=lambda n=n: [backend.update("list", append(n * 10 + i)) for i in range(10)])
+               for n in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert sorted(loads(backend.get("list"))) == list(range(40))
+    assert backend.update("list", lambda data: None) == backend.get("list")
+
+def test_serialization_round_trips_features():
+    value = {"recipes": [{"name": "Shakshuka", "url": "https://example.com"}], "features": FEATURES}
+    assert loads(dumps(value)) == value
+
+def test_in_memory_backend():
+    check_backend(InMemoryCache())
+
+def test_in_memory_backend_evicts_least_recently_used():
+    backend = InMemoryCache(max_entries=2)
+    backend.set("a", b"1")
+    backend.set("b", b"2")
+    backend.get("a")
+    backend.set("c", b"3")
+    assert backend.get("b") is None and backend.get("a") == b"1"
+
+def test_sqlite_backend_is_shared_between_instances():
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "cache.sqlite3")
+        check_backend(SQLiteCache(path))
+        SQLiteCache(path).set("shared", dumps(FEATURES))
+        assert loads(SQLiteCache(path).get("shared")) == FEATURES
+
+def test_redis_backend_against_stand_in():
+    server = RespStandIn()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        host, port = server.server_address
+        backend = RedisCache(f"redis://{host}:{port}/0")
+        check_backend(backend)
+        # A dropped connection is closed and replaced on the next command
+        dropped = backend._local.sock
+        dropped.shutdown(socket.SHUT_RDWR)
+        assert backend.get("missing") is None
+        assert dropped.fileno() == -1 and backend._local.sock is not dropped
+    finally:
+        server.shutdown()
+
+def test_redis_update_restarts_from_watch_when_the_connection_drops():
+    server = RespStandIn()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        host, port = server.server_address
+        backend, other = RedisCache(f"redis://{host}:{port}/0"), RedisCache(f"redis://{host}:{port}/0")
+        backend.set("list", dumps([0]))
+        calls = []
+
+        def add_one(data):
+            if not calls:
+                # Another client writes after our WATCH, then our connection drops before MULTI
+                other.update("list", append(2))
+                server.drop_on = b"MULTI"
+            calls.append(data)
+            return append(1)(data)
+
+        backend.update("list", add_one)
+        # Resending MULTI on a new connection would have run without the WATCH and lost the 2
+        assert sorted(loads(backend.get("list"))) == [0, 1, 2] and len(calls) == 2
+    finally:
+        server.shutdown()
+
+def test_cached_call_hits_after_first_call():
+    with using_cache_backend(InMemoryCache()):
+        calls = []
+
+        def extract(text):
+            calls.append(text)
+            return FEATURES
+
+        assert cached_call("extract", extract, "recipes") == FEATURES
+        assert cached_call("extract", extract, "recipes") == FEATURES
+        assert calls == ["recipes"]
+
+def test_stale_entries_are_served_during_one_background_refresh():
+    with using_cache_backend(InMemoryCache()):
+        calls = []
+        release = threading.Event()
+
+        def search(query):
+            calls.append(query)
+            if len(calls) > 1:
+                release.wait(2)
+            return [f"result {len(calls)}"]
+
+        assert cached_call("search", search, "pasta", ttl=0.05) == ["result 1"]
+        time.sleep(0.1)
+        # Stale: answered at once from the old entry, with a single refresh in flight
+        assert cached_call("search", search, "pasta", ttl=0.05) == ["result 1"]
+        assert cached_call("search", search, "pasta", ttl=0.05) == ["result 1"]
+        release.set()
+        for _ in range(100):
+            if cached_call("search", search, "pasta", ttl=10) == ["result 2"]:
+                break
+            time.sleep(0.01)
+        assert calls == ["pasta", "pasta"]
+        assert cached_call("search", search, "pasta", ttl=10) == ["result 2"]
+
+def test_empty_results_and_errors_are_cached_briefly():
+    with using_cache_backend(InMemoryCache()) as backend:
+        calls = []
+
+        def failing(query):
+            calls.append(query)
+            raise ConnectionError("provider down")
+
+        for _ in range(2):
+            try:
+                cached_call("search", failing, "soup", ttl=3600)
+                assert False, "expected an error"
+            except (ConnectionError, CachedError) as e:
+                assert "provider down" in str(e)
+        assert calls == ["soup"]
+
+        assert cached_call("search", lambda query: [], "nothing", ttl=3600) == []
+        _, expires_at = backend._entries[make_key("search", "nothing")]
+        assert expires_at - time.time() <= 300
+
+def test_llm_responses_are_cached_by_prompt():
+    with using_response_cache(InMemoryCache()):
+        route = ModelRouter.route("extract_key_features")
+        calls = []
+
+        def call():
+            calls.append(1)
+            return ResponseRecipeKeyFeatures(results=FEATURES)
+
+        messages = [HumanMessage(content="Recipe: Shakshuka", id="a")]
+        first = _cached_response(route, route["model"], ResponseRecipeKeyFeatures, messages, call)
+        # Message IDs differ between runs and must not affect the key
+        second = _cached_response(route, route["model"], ResponseRecipeKeyFeatures,
+                                  [HumanMessage(content="Recipe: Shakshuka", id="b")], call)
+        assert first == second and len(calls) == 1
+
+        _cached_response(route, "another-model", ResponseRecipeKeyFeatures, messages, call)
+        with bypass_response_cache():
+            _cached_response(route, route["model"], ResponseRecipeKeyFeatures, messages, call)
+        assert len(calls) == 3
+
+        text = _cached_response(route, route["model"], None, messages, lambda: AIMessage(content="pasta recipe"))
+        assert _cached_response(route, route["model"], None, messages, call).content == text.content
+
+if __name__ == "__main__":
+    test_serialization_round_trips_features()
+    test_in_memory_backend()
+    test_in_memory_backend_evicts_least_recently_used()
+    test_sqlite_backend_is_shared_between_instances()
+    test_redis_backend_against_stand_in()
+    test_redis_update_restarts_from_watch_when_the_connection_drops()
+    test_cached_call_hits_after_first_call()
+    test_stale_entries_are_served_during_one_background_refresh()
+    test_empty_results_and_errors_are_cached_briefly()
+    test_llm_responses_are_cached_by_prompt()
+    print("✅ Cache backend tests passed!")
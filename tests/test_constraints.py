@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""Tests for constraint parsing and local refinement of existing results."""
+
+import os
+import sys
+
+# Add parent directory to path to import recipe_app
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from recipe_app.config.settings import settings
+from recipe_app.models.recipe_models import FeatureRecord
+from recipe_app.services.constraints import parse_constraints, rank
+from recipe_app.services.recipe_services import ResultRefiner
+
+def entry(name, *ingredients, content=""):
+    recipe = {"name": name, "url": f"https://example.com/{name.replace(' ', '-')}", "content": content}
+    return {"recipe": recipe, "feature": FeatureRecord(name, ingredients)}
+
+def test_only_ingredients_become_constraints():
+    for text in ("no thanks, I want soup", "can you add more flavor", "something with a twist", "use your judgement"):
+        assert parse_constraints(text).is_empty(), text
+
+    assert parse_constraints("use fresh tomatoes").required == ["tomatoes"]
+    assert parse_constraints("no onions, garlic or leeks, I want it mild").excluded == ["onions", "garlic", "leeks"]
+    constraints = parse_constraints("make it vegetarian, with coconut milk")
+    assert constraints.diets == ["vegetarian"] and "chicken" in constraints.excluded
+    assert constraints.required == ["coconut milk"]
+    assert "butter" in parse_constraints("dairy-free please").excluded
+
+def test_rank_filters_exclusions_and_prefers_key_ingredients():
+    entries = [
+        entry("Mushroom Soup", "mushrooms", "cream", content="serve with spinach"),
+        entry("Spinach Curry", "spinach", "tomato"),
+        entry("Chicken Salad", "chicken", "spinach"),
+        entry("Plain Rice"),
+    ]
+    ranked = rank(entries, parse_constraints("no chicken, with spinach"))
+    # Exclusions only pass entries with extracted ingredients; key ingredients rank first
+    assert [e["feature"].dish_name for e in ranked] == ["Spinach Curry", "Mushroom Soup"]
+    # Plurals match either way
+    assert [e["feature"].dish_name for e in rank(entries, parse_constraints("use tomatoes"))] == ["Spinach Curry"]
+
+def test_refine_uses_existing_results_or_searches_for_the_shortfall():
+    count = settings().max_search_results
+    pool = [entry(f"Veggie Dish {n}", "spinach", "rice") for n in range(count)] + [entry("Beef Stew", "beef")]
+    state = {
+        "recipes": [e["recipe"] for e in pool[-1:]],
+        "key_features": [e["feature"] for e in pool[-1:]],
+        "recipe_pool": pool[:-1],
+        "refinement": "make it vegetarian",
+    }
+    state = ResultRefiner.refine(state)
+    assert ResultRefiner.next_step(state) == "human_feedback"
+    assert [f.dish_name for f in state["key_features"]] == [f"Veggie Dish {n}" for n in range(count)]
+
+    state = {"recipes": [pool[0]["recipe"]], "key_features": [pool[0]["feature"]], "refinement": "no beef"}
+    state = ResultRefiner.refine(state)
+    assert ResultRefiner.next_step(state) == "translate_query"
+    assert len(state["kept_results"]) == 1 and state["search_limit"] == count - 1
+
+    # Ordinary words are not constraints, so the feedback goes to a new search
+    state = ResultRefiner.refine({"recipes": [], "key_features": [], "refinement": "no thanks, something else"})
+    assert state["kept_results"] == [] and state["search_limit"] == 0
+
+if __name__ == "__main__":
+    test_only_ingredients_become_constraints()
+    test_rank_filters_exclusions_and_prefers_key_ingredients()
+    test_refine_uses_existing_results_or_searches_for_the_shortfall()
+    print("✅ Constraint tests passed!")
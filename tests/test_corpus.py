@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""Tests for the memory-mapped recipe corpus snapshot."""
+
+import os
+import sys
+import tempfile
+
+import numpy as np
+
+# Add parent directory to path to import recipe_app
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from recipe_app.models.recipe_models import FeatureRecord
+from recipe_app.services.corpus import Corpus, CorpusWriter
+from recipe_app.services.recipe_store import RecipeStore, recipe_id
+
+def recipe(n, content=None):
+    return {"name": f"Recipe {n}", "url": f"https://example.com/{n}", "content": content or f"Steps for {n} ✓"}
+
+def test_written_recipes_are_read_back_memory_mapped():
+    with tempfile.TemporaryDirectory() as tmp:
+        writer = CorpusWriter(tmp)
+        writer.add(recipe(1), FeatureRecord("Pasta", ("Garlic", "olive oil"), "boiled"))
+        writer.add(recipe(2), {"dish_name": "Salad", "key_ingredients": ["garlic", "lettuce"]})
+        writer.add(recipe(3))
+        assert writer.commit() == 1
+
+        snapshot = Corpus(tmp, check_seconds=0).current()
+        assert len(snapshot) == 3 and isinstance(snapshot.segments[0].ids, np.memmap)
+        rid = recipe_id(recipe(1)["url"])
+        assert snapshot.get(rid) == {"id": rid, **recipe(1)}
+        assert snapshot.feature(rid) == FeatureRecord("Pasta", ("garlic", "olive oil"), "boiled")
+        # Ingredients share vocabulary IDs across recipes
+        assert snapshot.feature(recipe_id(recipe(2)["url"])).key_ingredients == ("garlic", "lettuce")
+        assert len(snapshot.vocabulary) == 3 and snapshot.vocabulary.id("lettuce") == 2
+        assert snapshot.feature(recipe_id(recipe(3)["url"])) is None
+        assert snapshot.get(recipe_id("https://example.com/missing")) is None
+        # IDs from requests may be anything; they are simply not found
+        for bad in ("café", "recipe/../1", "", "0" * 17):
+            assert snapshot.get(bad) is None and snapshot.feature(bad) is None
+
+def test_readers_swap_to_new_generations_and_segments_are_merged():
+    with tempfile.TemporaryDirectory() as tmp:
+        reader = Corpus(tmp, check_seconds=0)
+        assert reader.current() is None
+        writer = CorpusWriter(tmp, max_segments=2, keep_generations=1)
+        for n in range(4):
+            writer.add(recipe(n), {"dish_name": f"Dish {n}", "key_ingredients": [f"item {n}"]})
+            writer.commit()
+            old = reader.current()
+            assert old.generation == n + 1 and len(old) == n + 1
+
+        # A newer row replaces the older one with the same ID
+        writer.add(recipe(0, content="Updated"))
+        writer.commit()
+        snapshot = reader.current()
+        assert snapshot is not old and len(snapshot) == 4
+        assert snapshot.get(recipe_id(recipe(0)["url"]))["content"] == "Updated"
+        assert len(snapshot.segments) <= 2
+        assert snapshot.feature(recipe_id(recipe(2)["url"])).key_ingredients == ("item 2",)
+
+        writer.commit(compact=True)
+        snapshot = reader.current()
+        assert len(snapshot.segments) == 1 and len(snapshot) == 4
+        # Only the kept generation and the files it uses remain
+        assert sorted(name for name in os.listdir(tmp) if name.startswith(("gen-", "seg-"))) == \
+            [snapshot.name] + snapshot.manifest["segments"]
+
+def test_recipe_store_falls_back_to_the_corpus():
+    with tempfile.TemporaryDirectory() as tmp:
+        writer = CorpusWriter(tmp)
+        rid = writer.add(recipe(7))
+        writer.commit()
+        os.environ["RECIPE_CORPUS_DIR"] = tmp
+        try:
+            from recipe_app.services.corpus import corpus
+            corpus._last_check = None
+            store = RecipeStore()
+            assert store.get(rid)["content"] == recipe(7)["content"]
+            assert len(store) == 1
+            assert store.get("пирог") is None
+        finally:
+            os.environ.pop("RECIPE_CORPUS_DIR", None)
+            corpus._last_check = None
+            corpus._snapshot = None
+
+if __name__ == "__main__":
+    test_written_recipes_are_read_back_memory_mapped()
+    test_readers_swap_to_new_generations_and_segments_are_merged()
+    test_recipe_store_falls_back_to_the_corpus()
+    print("✅ Corpus tests passed!")
@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+"""Tests for near-duplicate search result detection."""
+
+import os
+import sys
+
+# Add parent directory to path to import recipe_app
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from recipe_app.services.dedup import canonical_url, deduplicate, minhash, similarity
+
+SNIPPET = (
+    "This easy shakshuka simmers eggs in a spiced tomato and pepper sauce with cumin, "
+    "paprika and garlic, then finishes with feta and fresh parsley. Ready in 30 minutes."
+)
+
+def test_tracking_and_mobile_urls_are_canonicalized():
+    assert canonical_url("http://www.example.com/shakshuka/?utm_source=x&fbclid=y#top") == "https://example.com/shakshuka"
+    assert canonical_url("https://m.example.com/shakshuka/amp") == "https://example.com/shakshuka"
+    assert canonical_url("https://example.com/search?b=2&a=1") == "https://example.com/search?a=1&b=2"
+
+def test_minhash_is_close_for_copies_and_skips_short_text():
+    copy = SNIPPET.replace("Ready in 30 minutes.", "Ready in about 30 minutes!")
+    other = "Fluffy buttermilk pancakes with maple syrup, melted butter and blueberries, cooked on a hot griddle until golden."
+    assert similarity(minhash(SNIPPET), minhash(copy)) >= 0.7
+    assert similarity(minhash(SNIPPET), minhash(other)) < 0.2
+    assert minhash("Easy shakshuka") is None
+
+def test_duplicates_are_merged_and_surplus_backfills():
+    results = [
+        {"name": "Shakshuka", "url": "https://example.com/shakshuka", "content": SNIPPET},
+        {"name": "Shakshuka", "url": "https://www.example.com/shakshuka?utm_medium=social", "content": "Eggs."},
+        {"name": "Shakshuka", "url": "https://syndicated.example/shakshuka-copy", "content": SNIPPET + " Enjoy"},
+        {"name": "Pancakes", "url": "https://example.com/pancakes", "content": "Flour, eggs and milk."},
+        {"name": "Omelette", "url": "https://example.com/omelette", "content": "Eggs and cheese."},
+    ]
+    recipes = deduplicate(results, limit=2)
+    assert [recipe["name"] for recipe in recipes] == ["Shakshuka", "Pancakes"]
+    assert recipes[0]["url"] == "https://example.com/shakshuka"
+    assert recipes[0]["content"] == SNIPPET + " Enjoy"
+    assert len(recipes[0]["duplicate_urls"]) == 2
+
+if __name__ == "__main__":
+    test_tracking_and_mobile_urls_are_canonicalized()
+    test_minhash_is_close_for_copies_and_skips_short_text()
+    test_duplicates_are_merged_and_surplus_backfills()
+    print("✅ Deduplication tests passed!")
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""Tests for the local heuristic feature extractor."""
+
+import os
+import sys
+import threading
+
+# Add parent directory to path to import recipe_app
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from recipe_app.config.settings import settings, settings_manager
+from recipe_app.models.recipe_models import RecipeFeature
+from recipe_app.services.feature_heuristics import HeuristicFeatureExtractor
+from recipe_app.services.jobs import job_runner
+from recipe_app.services.recipe_services import RecipeKeyFeatures
+
+SHAKSHUKA = {
+    "name": "Easy Shakshuka Recipe - Cookie and Kate",
+    "url": "https://example.com/shakshuka",
+    "content": (
+        "Ingredients: 2 tablespoons olive oil, 1 medium onion, 3 cloves garlic, "
+        "1 tsp cumin, 6 large eggs, 1/2 cup feta. Simmer the sauce, then bake until set."
+    )
+}
+
+def test_extracts_quantified_ingredients_and_style():
+    feature, confidence = HeuristicFeatureExtractor.extract(SHAKSHUKA)
+    assert feature.dish_name == "Easy Shakshuka"
+    assert feature.key_ingredients[:4] == ["olive oil", "onion", "garlic", "cumin"]
+    assert "eggs" in feature.key_ingredients
+    assert feature.cooking_style == "baked"
+    assert confidence == 1.0
+
+def test_low_confidence_without_ingredients():
+    feature, confidence = HeuristicFeatureExtractor.extract({"name": "Dinner ideas", "content": "Great ideas."})
+    assert feature.key_ingredients == []
+    assert confidence == 0.0
+
+def test_extract_all_reports_lowest_confidence():
+    features, confidence = HeuristicFeatureExtractor.extract_all([
+        SHAKSHUKA,
+        {"name": "Pancakes | Allrecipes", "content": "Fluffy pancakes with flour, milk, eggs and butter."}
+    ])
+    assert [feature.dish_name for feature in features] == ["Easy Shakshuka", "Pancakes"]
+    assert features[1].key_ingredients == ["flour", "milk", "eggs", "butter"]
+    assert confidence == 0.4
+
+PANCAKES = {"name": "Pancakes", "url": "https://example.com/pancakes", "content": "Flour, milk and eggs."}
+
+def test_local_features_render_first_and_upgrade_in_the_background():
+    release = threading.Event()
+    calls = []
+
+    def extract_features(recipes_str, count=0, timeout=None):
+        calls.append(timeout)
+        release.wait(5)
+        return [RecipeFeature(dish_name="Shakshuka", key_ingredients=["eggs", "tomatoes"]),
+                RecipeFeature(dish_name="Fluffy Pancakes", key_ingredients=["flour", "milk"])]
+
+    original = RecipeKeyFeatures._cached_extract_features
+    RecipeKeyFeatures._cached_extract_features = staticmethod(extract_features)
+    settings_manager.override(settings().model_copy(update={"heuristic_only_confidence": None}))
+    try:
+        state = RecipeKeyFeatures.extract({"recipes": [SHAKSHUKA, PANCAKES], "early_features": True})
+        assert state["feature_source"] == "heuristic"
+        assert [feature.dish_name for feature in state["key_features"]] == ["Easy Shakshuka", "Pancakes"]
+        upgrade = state["feature_upgrade"]
+        assert RecipeKeyFeatures.upgraded(state["recipes"], state["key_features"], upgrade) is None
+
+        release.set()
+        assert job_runner.get(upgrade["job"]).wait(5)
+        # Results reordered since the search keep their own features
+        recipes, features = state["recipes"][::-1], state["key_features"][::-1]
+        features, source = RecipeKeyFeatures.upgraded(recipes, features, upgrade)
+        assert source == "llm" and [feature.dish_name for feature in features] == ["Fluffy Pancakes", "Shakshuka"]
+        assert calls == [None]
+    finally:
+        RecipeKeyFeatures._cached_extract_features = original
+        settings_manager.override(None)
+
+def test_llm_extraction_is_bounded_by_the_deadline():
+    calls = []
+
+    def extract_features(recipes_str, count=0, timeout=None):
+        calls.append(timeout)
+        raise TimeoutError()
+
+    original = RecipeKeyFeatures._cached_extract_features
+    RecipeKeyFeatures._cached_extract_features = staticmethod(extract_features)
+    settings_manager.override(settings().model_copy(update={"heuristic_only_confidence": None}))
+    try:
+        state = RecipeKeyFeatures.extract({"recipes": [SHAKSHUKA]})
+        assert state["feature_source"] == "heuristic" and state["feature_upgrade"] is None
+        # The call itself gives up at the deadline instead of holding a worker
+        assert calls == [settings().extraction_timeout_seconds]
+    finally:
+        RecipeKeyFeatures._cached_extract_features = original
+        settings_manager.override(None)
+
+if __name__ == "__main__":
+    test_extracts_quantified_ingredients_and_style()
+    test_low_confidence_without_ingredients()
+    test_extract_all_reports_lowest_confidence()
+    test_local_features_render_first_and_upgrade_in_the_background()
+    test_llm_extraction_is_bounded_by_the_deadline()
+    print("✅ Heuristic extractor tests passed!")
@@ -8,44 +8,11 @@ import sys
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 from langchain_core.messages import HumanMessage
-from langgraph.graph import StateGraph, START, END
 
-from recipe_app.models.recipe_models import RecipeState
-from recipe_app.services.recipe_services import (
-    QueryTranslator, 
-    RecipeRetriever, 
-    RecipeKeyFeatures, 
-    HumanFeedback,
-    Satisfaction
-)
-
-def initialize_graph():
-    """Initialize the recipe processing graph."""
-    builder = StateGraph(RecipeState)
-
-    # Add nodes
-    builder.add_node("translate_query", QueryTranslator.translate)
-    builder.add_node("retrieve_recipes", RecipeRetriever.retrieve)
-    builder.add_node("extract_key_features", RecipeKeyFeatures.extract)
-    builder.add_node("human_feedback", HumanFeedback.refine)
-
-    # Add edges
-    builder.add_edge(START, "translate_query")
-    builder.add_edge("translate_query", "retrieve_recipes")
-    builder.add_edge("retrieve_recipes", "extract_key_features")
-    builder.add_edge("extract_key_features", "human_feedback")
-
-    # Add conditional edges for feedback loop
-    builder.add_conditional_edges(
-        "human_feedback",
-        Satisfaction.recipe_satisfaction,
-        {
-            "translate_query": "translate_query",
-            END: END
-        }
-    )
-
-    return builder.compile()
+from recipe_app.config.config import load_environment
+from recipe_app.services.recipe_store import recipe_store
+from recipe_app.services.record_replay import CassetteMissError, use_cassette
+from recipe_app.services.graph import build_graph
 
 def print_separator(char="=", length=80):
     """Print a separator line."""
@@ -60,7 +27,7 @@ def print_recipes(recipes):
     for i, recipe in enumerate(recipes, 1):
         print(f"\n📖 Recipe {i}: {recipe.get('name', 'Unknown')}")
         print(f"   URL: {recipe.get('url', 'N/A')}")
-        print(f"   Preview: {recipe.get('content', 'N/A')[:150]}...")
+        print(f"   Preview: {recipe_store.resolve(recipe).get('content', 'N/A')[:150]}...")
 
 def print_key_features(features):
     """Print the extracted key features."""
@@ -80,22 +47,34 @@ def main():
     print("🤖 RECIPE AGENT - FEEDBACK LOOP TEST")
     print_separator("*")
     
+    # Pick up keys from a .env file, if there is one
+    load_environment()
+    
     # Check for API keys from environment
     openai_key = os.getenv("OPENAI_API_KEY")
     tavily_key = os.getenv("TAVILY_API_KEY")
     
-    if not openai_key or not tavily_key:
+    # A recorded cassette is replayed offline, without keys; a missing one is an error
+    try:
+        mode = use_cassette("feedback_loop")
+    except CassetteMissError as e:
+        print(f"\n❌ ERROR: {e}")
+        sys.exit(1)
+    
+    if mode == "replay":
+        print("\n📼 Replaying recorded API traffic from tests/cassettes/feedback_loop.json")
+    elif not openai_key or not tavily_key:
         print("\n❌ ERROR: API keys not found in environment!")
         print("\nPlease run:")
         print("  export OPENAI_API_KEY='your-key'")
         print("  export TAVILY_API_KEY='your-key'")
         sys.exit(1)
-    
-    print("\n✅ API keys configured!")
+    else:
+        print("\n✅ API keys configured!")
     
     # Initialize the graph
     print("\n⚙️  Initializing recipe agent graph...")
-    graph = initialize_graph()
+    graph = build_graph()
     
     # Test input
     user_input = "I have eggs, flour, tomatoes and cheese - what can I make?"
@@ -110,9 +89,10 @@ def main():
     
     try:
         # First iteration - get initial recipes
+        config = {"configurable": {"thread_id": "feedback_test"}}
         state = graph.invoke(
             {"messages": [input_message]},
-            {"configurable": {"thread_id": "feedback_test"}}
+            config
         )
         
         print(f"\n✓ Translated Query: '{state.get('query', 'N/A')}'")
@@ -136,14 +116,9 @@ def main():
         feedback1 = "I want something vegetarian and healthier"
         print(f"\n💬 Feedback: '{feedback1}'")
         
-        # Add feedback to state
-        state["feedback"] = feedback1
-        
-        # Run again with feedback
-        state = graph.invoke(
-            state,
-            {"configurable": {"thread_id": "feedback_test"}}
-        )
+        # Resume the paused thread with the feedback
+        graph.update_state(config, {"feedback": feedback1})
+        state = graph.invoke(None, config)
         
         print(f"\n✓ New Query: '{state.get('query', 'N/A')}'")
         print(f"✓ Recipes Found: {len(state.get('recipes', []))}")
@@ -166,14 +141,9 @@ def main():
         feedback2 = "I like option 1, that sounds perfect!"
         print(f"\n💬 Feedback: '{feedback2}'")
         
-        # Add feedback to state
-        state["feedback"] = feedback2
-        
-        # Run again with selection feedback
-        state = graph.invoke(
-            state,
-            {"configurable": {"thread_id": "feedback_test"}}
-        )
+        # Resume the paused thread with the selection feedback
+        graph.update_state(config, {"feedback": feedback2})
+        state = graph.invoke(None, config)
         
         selected_index = state.get('recipes_index', -1)
         print(f"\n✓ Selected Recipe Index: {selected_index}")
@@ -185,7 +155,7 @@ def main():
             selected_recipe = state.get('recipes', [])[selected_index]
             print(f"\n📖 {selected_recipe.get('name', 'Unknown')}")
             print(f"   URL: {selected_recipe.get('url', 'N/A')}")
-            print(f"   Content: {selected_recipe.get('content', 'N/A')[:300]}...")
+            print(f"   Content: {recipe_store.resolve(selected_recipe).get('content', 'N/A')[:300]}...")
             
             selected_feature = state.get('key_features', [])[selected_index]
             print(f"\n✨ Dish: {selected_feature.dish_name}")
@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""Tests for the bounded conversation history policy."""
+
+import os
+import sys
+
+# Add parent directory to path to import recipe_app
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from langchain_core.messages import HumanMessage, RemoveMessage
+
+from recipe_app.config.config import HISTORY_KEEP_TURNS
+from recipe_app.config.settings import settings
+from recipe_app.services.history import HistoryPolicy, estimate_tokens
+
+def conversation(*texts):
+    return [HumanMessage(content=text, id=str(index)) for index, text in enumerate(texts)]
+
+def test_short_history_is_passed_verbatim():
+    state = {"messages": conversation("vegetarian pasta")}
+    messages = HistoryPolicy.prepare(state, "Write a query.")
+    assert [message.content for message in messages[1:]] == ["vegetarian pasta"]
+    assert "history_summary" not in state
+
+def test_older_turns_are_folded_into_constraints():
+    texts = ["chicken dinner", "no dairy please", "make it vegetarian"] + ["something else"] * HISTORY_KEEP_TURNS
+    state = {"messages": conversation(*texts)}
+    messages = HistoryPolicy.prepare(state, "Write a query.")
+
+    assert len(messages) == HISTORY_KEEP_TURNS + 1
+    summary = state["history_summary"]
+    assert summary["diets"] == ["vegetarian"] and summary["excluded"] == ["dairy"]
+    assert "Exclude: dairy" in messages[0].content
+    assert all(isinstance(message, RemoveMessage) for message in state["messages"])
+    assert [message.id for message in state["messages"]] == ["0", "1", "2"]
+
+def test_later_turns_override_earlier_constraints():
+    summary = HistoryPolicy.fold(None, conversation("no mushrooms"))
+    summary = HistoryPolicy.fold(summary, conversation("actually add mushrooms"))
+    assert summary["excluded"] == [] and summary["required"] == ["mushrooms"]
+
+def test_translator_input_respects_token_cap():
+    max_tokens = settings().history_max_tokens
+    state = {"messages": conversation("pasta " * max_tokens, "quick soup")}
+    messages = HistoryPolicy.prepare(state, "Write a query.")
+    assert messages[-1].content == "quick soup"
+    assert sum(estimate_tokens(message.content) for message in messages) <= max_tokens
+
+if __name__ == "__main__":
+    test_short_history_is_passed_verbatim()
+    test_older_turns_are_folded_into_constraints()
+    test_later_turns_override_earlier_constraints()
+    test_translator_input_respects_token_cap()
+    print("✅ History policy tests passed!")
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""Tests for background graph jobs and their deduplication."""
+
+import os
+import sys
+import threading
+
+# Add parent directory to path to import recipe_app
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from recipe_app.services.jobs import DONE, FAILED, JobRunner, fingerprint
+from recipe_app.services.session_memory import GRAPH_KEY, JOB_KEY, evict_graph, job_runner
+
+def test_duplicate_submissions_run_once():
+    runner = JobRunner(workers=2)
+    release = threading.Event()
+    calls = []
+
+    def work(job):
+        calls.append(job.key)
+        job.progress("retrieve_recipes")
+        release.wait(5)
+        return "recipes"
+
+    key = fingerprint("session", "search", 0, "chicken with rice")
+    first = runner.submit(key, work, "search")
+    second = runner.submit(key, work, "search")
+    assert second is first and runner.busy(key)
+    release.set()
+    assert first.wait(5) and first.status == DONE and first.result == "recipes"
+    # A finished job still answers for its fingerprint
+    assert runner.submit(key, work, "search") is first
+    assert calls == [key] and first.step == "retrieve_recipes"
+    assert fingerprint("session", "search", 1, "chicken with rice") != key
+
+def test_failed_jobs_can_be_retried():
+    runner = JobRunner(workers=1)
+    attempts = []
+
+    def flaky(job):
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise RuntimeError("provider down")
+        return "ok"
+
+    failed = runner.submit("job:retry", flaky)
+    assert failed.wait(5) and failed.status == FAILED and "provider down" in str(failed.error)
+    retried = runner.submit("job:retry", flaky)
+    assert retried is not failed and retried.wait(5) and retried.result == "ok"
+
+def test_finished_jobs_expire():
+    runner = JobRunner(workers=1, ttl=0)
+    job = runner.submit("job:old", lambda job: 1)
+    assert job.wait(5)
+    runner.submit("job:new", lambda job: 2).wait(5)
+    assert runner.get("job:old") is None
+
+def test_graph_is_not_evicted_while_its_job_runs():
+    release = threading.Event()
+    job_runner.submit("job:evict", lambda job: release.wait(5))
+    session_state = {GRAPH_KEY: object(), JOB_KEY: "job:evict"}
+    try:
+        assert not evict_graph(session_state) and GRAPH_KEY in session_state
+    finally:
+        release.set()
+    assert job_runner.get("job:evict").wait(5)
+
+if __name__ == "__main__":
+    test_duplicate_submissions_run_once()
+    test_failed_jobs_can_be_retried()
+    test_finished_jobs_expire()
+    test_graph_is_not_evicted_while_its_job_runs()
+    print("✅ Background job tests passed!")
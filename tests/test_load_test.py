@@ -0,0 +1,38 @@
+#!/usr/bin/env python3
+"""Smoke test for the concurrent-session load test harness."""
+
+import os
+import sys
+
+# Add parent directory to path to import recipe_app
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from recipe_app.tools import fake_providers
+from recipe_app.tools.load_test import run_level, session_steps, share_test_runtime, percentile
+
+def test_percentile_uses_nearest_rank():
+    values = [float(value) for value in range(1, 101)]
+    assert percentile(values, 50) == 50.0 and percentile(values, 99) == 99.0
+    assert percentile([], 50) == 0.0
+
+def test_concurrent_sessions_complete_the_scenario():
+    os.environ["RECIPE_LLM_CACHE"] = "off"
+    os.environ["RECIPE_PAGE_FETCH"] = "off"
+    uninstall, restore_runtime = fake_providers.install(latency=0), share_test_runtime()
+    try:
+        level = run_level(concurrency=2, sessions=2)
+    finally:
+        restore_runtime()
+        uninstall()
+        os.environ.pop("RECIPE_LLM_CACHE", None)
+        os.environ.pop("RECIPE_PAGE_FETCH", None)
+
+    assert level["errors"] == []
+    assert level["reruns"] == 2 * len(session_steps(0))
+    assert set(level["step_p50_ms"]) == {name for name, _ in session_steps(0)}
+    assert level["throughput_reruns_per_second"] > 0
+
+if __name__ == "__main__":
+    test_percentile_uses_nearest_rank()
+    test_concurrent_sessions_complete_the_scenario()
+    print("✅ Load test harness tests passed!")
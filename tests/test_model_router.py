@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""Tests for per-node model routing and escalation on invalid structured output."""
+
+import os
+import sys
+
+# Add parent directory to path to import recipe_app
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from langchain_core.messages import HumanMessage
+
+from recipe_app.config.settings import ModelRoute, settings, settings_manager
+from recipe_app.models.recipe_models import HumanSelection
+from recipe_app.services.model_router import ModelRouter
+from recipe_app.tools import fake_providers
+from recipe_app.tools.fake_providers import FakeChatOpenAI
+
+ROUTES = {
+    "translate_query": ModelRoute(model="fast-model", temperature=0, max_tokens=50, timeout=10),
+    "human_feedback": ModelRoute(model="fast-model", temperature=0, timeout=10, escalate_to="strong-model"),
+}
+
+def routed_settings():
+    return settings().model_copy(update={
+        "model_routes": ROUTES,
+        "default_model_route": ModelRoute(model="default-model", temperature=0.5),
+    })
+
+def test_each_node_gets_its_own_model_and_parameters():
+    settings_manager.override(routed_settings())
+    try:
+        with fake_providers.installed():
+            llm = ModelRouter.get_llm("translate_query")
+            assert llm.kwargs["model"] == "fast-model"
+            assert llm.kwargs["max_tokens"] == 50 and llm.kwargs["timeout"] == 10
+            # A caller's own deadline replaces the route's timeout
+            assert ModelRouter.get_llm("translate_query", timeout=3).kwargs["timeout"] == 3
+            # Nodes without a route use the default one
+            llm = ModelRouter.get_llm("unrouted_node")
+            assert llm.kwargs["model"] == "default-model" and llm.kwargs["temperature"] == 0.5
+    finally:
+        settings_manager.override(None)
+
+def test_invalid_structured_output_escalates_once():
+    os.environ["RECIPE_LLM_CACHE"] = "off"
+    settings_manager.override(routed_settings())
+    messages = [HumanMessage(content="User feedback: I like option 2")]
+    try:
+        with fake_providers.installed():
+            FakeChatOpenAI.invalid_models = {"fast-model"}
+            assert ModelRouter.invoke_structured("human_feedback", HumanSelection, messages).like == 1
+
+            # Routes without escalate_to raise the validation error
+            FakeChatOpenAI.invalid_models = {"fast-model", "default-model"}
+            try:
+                ModelRouter.invoke_structured("translate_query", HumanSelection, messages)
+            except ValueError:
+                pass
+            else:
+                raise AssertionError("Invalid output should not pass without escalation")
+    finally:
+        FakeChatOpenAI.invalid_models = set()
+        settings_manager.override(None)
+        os.environ.pop("RECIPE_LLM_CACHE", None)
+
+if __name__ == "__main__":
+    test_each_node_gets_its_own_model_and_parameters()
+    test_invalid_structured_output_escalates_once()
+    print("✅ Model router tests passed!")
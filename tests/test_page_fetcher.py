@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""Tests for concurrent page fetching against a local HTTP server."""
+
+import os
+import sys
+import time
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Add parent directory to path to import recipe_app
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from recipe_app.config.settings import settings, settings_manager
+from recipe_app.services.cache import InMemoryCache
+from recipe_app.services.page_fetcher import PageFetcher, HTMLTextExtractor, is_public_url
+
+RECIPE_PAGE = b"""<html><head><style>body { color: red }</style><script>var x = 1;</script></head>
+<body><nav>Home | Recipes</nav><h1>Shakshuka</h1><ul><li>4 eggs</li><li>1 can tomatoes</li></ul>
+<p>Simmer the sauce, then poach the eggs.</p><footer>Copyright</footer></body></html>"""
+
+class PageHandler(BaseHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        server = self.server
+        with server.lock:
+            server.requests.append((self.path, self.headers.get("If-None-Match")))
+            server.active += 1
+            server.max_active = max(server.max_active, server.active)
+        try:
+            if self.path.startswith("/slow"):
+                time.sleep(0.1)
+            if self.path == "/recipe" and self.headers.get("If-None-Match") == '"v1"':
+                self.send_response(304)
+                self.end_headers()
+                return
+            if self.path == "/image":
+                body, content_type = b"\x89PNG", "image/png"
+            elif self.path == "/big":
+                body, content_type = b"<p>" + b"word " * 200000 + b"</p>", "text/html"
+            else:
+                body, content_type = RECIPE_PAGE, "text/html; charset=utf-8"
+            self.send_response(200)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.send_header("ETag", '"v1"')
+            self.end_headers()
+            self.wfile.write(body)
+        finally:
+            with server.lock:
+                server.active -= 1
+
+def anywhere(address):
+    """Accepts every address, so the local server stands in for a site."""
+    return True
+
+def start_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), PageHandler)
+    server.daemon_threads = True
+    server.lock = threading.Lock()
+    server.requests, server.active, server.max_active = [], 0, 0
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+def test_html_is_reduced_to_recipe_text():
+    parser = HTMLTextExtractor()
+    for index in range(0, len(RECIPE_PAGE), 7):
+        parser.feed(RECIPE_PAGE[index:index + 7].decode())
+    text = parser.text()
+    assert "Shakshuka" in text and "4 eggs" in text and "poach the eggs" in text
+    assert "var x" not in text and "color" not in text and "Home" not in text and "Copyright" not in text
+
+def test_pages_are_revalidated_with_etags():
+    server, base = start_server()
+    settings_manager.override(settings().model_copy(update={"page_cache_fresh_seconds": 0}))
+    try:
+        fetcher = PageFetcher(cache=InMemoryCache(), allow=anywhere)
+        first = fetcher.fetch(f"{base}/recipe")
+        second = fetcher.fetch(f"{base}/recipe")
+        assert first["text"] == second["text"] and "Shakshuka" in second["text"]
+        assert server.requests == [("/recipe", None), ("/recipe", '"v1"')]
+    finally:
+        settings_manager.override(None)
+        server.shutdown()
+
+def test_fresh_pages_come_from_the_cache():
+    server, base = start_server()
+    try:
+        fetcher = PageFetcher(cache=InMemoryCache(), allow=anywhere)
+        fetcher.fetch(f"{base}/recipe")
+        fetcher.fetch(f"{base}/recipe")
+        assert len(server.requests) == 1
+    finally:
+        server.shutdown()
+
+def test_concurrent_fetches_respect_the_per_host_limit():
+    server, base = start_server()
+    try:
+        fetcher = PageFetcher(cache=InMemoryCache(), workers=6, per_host=2, allow=anywhere)
+        urls = [f"{base}/slow/{index}" for index in range(6)]
+        pages = fetcher.fetch_all(urls)
+        assert all(pages[url] and "Shakshuka" in pages[url]["text"] for url in urls)
+        assert server.max_active == 2
+    finally:
+        server.shutdown()
+
+def test_size_cap_and_non_html_pages():
+    server, base = start_server()
+    settings_manager.override(settings().model_copy(update={"page_max_bytes": 10000}))
+    try:
+        fetcher = PageFetcher(cache=InMemoryCache(), allow=anywhere)
+        assert len(fetcher.fetch(f"{base}/big")["text"]) <= 10000
+        assert fetcher.fetch(f"{base}/image") is None
+        assert fetcher.fetch("http://127.0.0.1:9/unreachable") is None
+    finally:
+        settings_manager.override(None)
+        server.shutdown()
+
+def test_only_public_addresses_are_fetched_on_every_hop():
+    import httpx
+
+    addresses = {"recipes.test": "93.184.216.34", "intranet.test": "10.0.0.5", "metadata.test": "169.254.169.254"}
+    requested = []
+
+    def handler(request):
+        requested.append(str(request.url))
+        if request.url.path == "/moved":
+            return httpx.Response(301, headers={"Location": "/recipe"})
+        if request.url.path == "/internal":
+            return httpx.Response(302, headers={"Location": "http://intranet.test/admin"})
+        return httpx.Response(200, headers={"Content-Type": "text/html"}, content=RECIPE_PAGE)
+
+    resolve = lambda host: [addresses[host]]
+    assert is_public_url("https://recipes.test/x", resolve)
+    assert not is_public_url("http://127.0.0.1/", lambda host: [host])
+    assert not is_public_url("http://[::1]/", lambda host: [host])
+    assert not is_public_url("file:///etc/passwd", resolve)
+
+    fetcher = PageFetcher(cache=InMemoryCache(), transport=httpx.MockTransport(handler), resolve=resolve)
+    assert "Shakshuka" in fetcher.fetch("http://recipes.test/moved")["text"]
+    assert requested == ["http://recipes.test/moved", "http://recipes.test/recipe"]
+
+    requested.clear()
+    assert fetcher.fetch("http://recipes.test/internal") is None
+    assert fetcher.fetch("http://metadata.test/latest/meta-data") is None
+    assert requested == ["http://recipes.test/internal"]
+
+def test_connections_go_to_the_checked_address():
+    server, base = start_server()
+    port = server.server_address[1]
+    lookups = []
+
+    def rebinding(host):
+        # Public for the URL check, loopback by the time the socket is opened
+        lookups.append(host)
+        return ["93.184.216.34"] if len(lookups) == 1 else ["127.0.0.1"]
+
+    try:
+        fetcher = PageFetcher(cache=InMemoryCache(), resolve=rebinding)
+        assert fetcher.fetch(f"http://rebind.test:{port}/recipe") is None
+        assert lookups == ["rebind.test", "rebind.test"]
+        assert server.requests == []
+
+        # The socket goes to the resolved address while the request keeps its host name
+        fetcher = PageFetcher(cache=InMemoryCache(), resolve=lambda host: ["127.0.0.1"], allow=anywhere)
+        assert "Shakshuka" in fetcher.fetch(f"http://site.test:{port}/recipe")["text"]
+        assert server.requests == [("/recipe", None)]
+    finally:
+        server.shutdown()
+
+if __name__ == "__main__":
+    test_html_is_reduced_to_recipe_text()
+    test_pages_are_revalidated_with_etags()
+    test_fresh_pages_come_from_the_cache()
+    test_concurrent_fetches_respect_the_per_host_limit()
+    test_size_cap_and_non_html_pages()
+    test_only_public_addresses_are_fetched_on_every_hop()
+    test_connections_go_to_the_checked_address()
+    print("✅ Page fetcher tests passed!")
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""Tests for the cache pre-warming command against fake providers."""
+
+import os
+import sys
+import logging
+import tempfile
+
+# Add parent directory to path to import recipe_app
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from recipe_app.config.config import MAX_SEARCH_RESULTS, DEDUP_OVERFETCH
+from recipe_app.services.cache import get_cache_backend, make_key
+from recipe_app.tools import fake_providers
+from recipe_app.tools.prewarm import main, prewarm, queries_from_log
+
+def test_queries_from_log_are_ranked_by_frequency():
+    lines = [
+        "INFO:recipe_app.services.recipe_services:Query translated: vegetarian lasagna recipe",
+        "INFO:recipe_app.services.recipe_services:Starting recipe retrieval",
+        "INFO:recipe_app.services.recipe_services:Query translated: chicken curry recipe",
+        "INFO:recipe_app.services.recipe_services:Query translated: chicken curry recipe",
+        '{"level": "INFO", "message": "Query translated: vegetarian lasagna recipe", "sample_rate": 10}',
+    ]
+    with tempfile.NamedTemporaryFile("w", suffix=".log", delete=False) as f:
+        f.write("\n".join(lines))
+    try:
+        assert queries_from_log(f.name) == ["vegetarian lasagna recipe", "chicken curry recipe"]
+        assert queries_from_log(f.name, top=1) == ["vegetarian lasagna recipe"]
+    finally:
+        os.unlink(f.name)
+
+def test_prewarm_fills_the_search_cache_and_reports_coverage():
+    os.environ["RECIPE_LLM_CACHE"] = "off"
+    os.environ["RECIPE_PAGE_FETCH"] = "off"
+    uninstall = fake_providers.install(latency=0)
+    try:
+        report = prewarm(["Chicken with rice", "Something with mushrooms"], concurrency=2)
+        with tempfile.TemporaryDirectory() as tmp:
+            queries, ready = os.path.join(tmp, "queries.txt"), os.path.join(tmp, "ready")
+            with open(queries, "w") as f:
+                f.write("# popular\nChicken with rice\n\nChicken with rice\n")
+            assert main(["--queries", queries, "--min-coverage", "1", "--ready-file", ready]) == 0
+            assert os.path.exists(ready)
+    finally:
+        uninstall()
+        os.environ.pop("RECIPE_LLM_CACHE", None)
+        os.environ.pop("RECIPE_PAGE_FETCH", None)
+        logging.disable(logging.NOTSET)
+
+    assert report["queries"] == 2 and report["warm"] == 2 and report["coverage"] == 1.0
+    assert all(result["feature_source"] == "llm" for result in report["results"])
+    search_query = report["results"][0]["search_query"]
+    assert search_query
+    assert get_cache_backend().get(make_key("search", search_query, MAX_SEARCH_RESULTS + DEDUP_OVERFETCH)) is not None
+
+if __name__ == "__main__":
+    test_queries_from_log_are_ranked_by_frequency()
+    test_prewarm_fills_the_search_cache_and_reports_coverage()
+    print("✅ Pre-warm tests passed!")
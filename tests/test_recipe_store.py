@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""Tests for the per-process recipe store and the recipes sessions pin in it."""
+
+import os
+import sys
+
+# Add parent directory to path to import recipe_app
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from recipe_app.services.cache import InMemoryCache, using_cache_backend
+from recipe_app.services.recipe_store import RecipeStore, recipe_id
+from recipe_app.services.session_memory import SessionRegistry
+
+def recipe(n):
+    return {"name": f"Store Recipe {n}", "url": f"https://store.example/{n}", "content": f"Steps for {n}."}
+
+class SessionState(dict):
+    """Stands in for Streamlit's per-session state (a mapping that can be weakly referenced)."""
+
+def test_put_returns_a_reference_that_resolves_to_the_body():
+    store = RecipeStore(max_entries=4)
+    ref = store.put(recipe(1))
+    assert ref == {"id": recipe_id(recipe(1)["url"]), "name": "Store Recipe 1", "url": "https://store.example/1"}
+    assert store.get(ref["id"])["content"] == "Steps for 1."
+    assert store.resolve(ref)["content"] == "Steps for 1."
+    # Full recipes and references without an ID are returned as they are
+    assert store.resolve(recipe(2)) == recipe(2)
+    assert store.resolve({"name": "Loose", "url": "https://store.example/loose"}) == {"name": "Loose", "url": "https://store.example/loose"}
+    assert store.get("0" * 16) is None
+
+def test_least_recently_used_bodies_are_evicted():
+    with using_cache_backend(InMemoryCache()):
+        store = RecipeStore(max_entries=2)
+        first, second = store.put(recipe(1)), store.put(recipe(2))
+        store.get(first["id"])
+        third = store.put(recipe(3))
+        assert len(store) == 2 and store.get(second["id"]) is None
+        # With nowhere to re-read the body from, the card would be empty
+        assert store.resolve(second)["content"] == ""
+        assert store.get(first["id"]) and store.get(third["id"])
+
+def test_pinned_bodies_survive_eviction_until_released():
+    with using_cache_backend(InMemoryCache()):
+        store = RecipeStore(max_entries=1)
+        favorite = store.put(recipe(1))
+        store.pin("session-a", [favorite])
+        current = store.put(recipe(2))
+        store.pin("session-b", [favorite, current])
+        for n in range(3, 6):
+            store.put(recipe(n))
+        assert store.resolve(favorite)["content"] == "Steps for 1."
+        assert store.resolve(current)["content"] == "Steps for 2."
+
+        # Pins are replaced, and a body stays while any owner still holds it
+        store.pin("session-b", [favorite])
+        assert store.get(current["id"]) is None
+        store.release("session-a")
+        assert store.get(favorite["id"]) is not None
+        store.release("session-b")
+        assert store.get(favorite["id"]) is None
+
+def test_sessions_pin_what_they_render_until_they_close():
+    from recipe_app.services.recipe_store import recipe_store
+    with using_cache_backend(InMemoryCache()):
+        favorite, shown = recipe_store.put(recipe(10)), recipe_store.put(recipe(11))
+        registry = SessionRegistry(budget_bytes=10 ** 9, process_budget_bytes=0)
+        session = SessionState(favorites=[favorite], current_output={"recipes": [shown]})
+        registry.touch("pinning-session", session)
+        assert recipe_store._pins["pinning-session"] == {favorite["id"], shown["id"]}
+
+        del session
+        registry._last_check = 0
+        registry.touch("other-session", SessionState())
+        assert "pinning-session" not in recipe_store._pins
+        recipe_store.release("other-session")
+
+if __name__ == "__main__":
+    test_put_returns_a_reference_that_resolves_to_the_body()
+    test_least_recently_used_bodies_are_evicted()
+    test_pinned_bodies_survive_eviction_until_released()
+    test_sessions_pin_what_they_render_until_they_close()
+    print("✅ Recipe store tests passed!")
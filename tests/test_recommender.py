@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""Tests for "more like this" recommendations from favorites."""
+
+import os
+import sys
+import tempfile
+
+# Add parent directory to path to import recipe_app
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from recipe_app.models.recipe_models import FeatureRecord
+from recipe_app.services.corpus import Corpus, CorpusWriter
+from recipe_app.services.recommender import RecipeRecommender
+
+DISHES = {
+    "carbonara": ("Spaghetti Carbonara", ("spaghetti", "eggs", "pancetta", "parmesan"), "boiled"),
+    "cacio": ("Cacio e Pepe", ("spaghetti", "pecorino", "black pepper"), "boiled"),
+    "amatriciana": ("Pasta Amatriciana", ("bucatini", "guanciale", "tomatoes", "pecorino"), "simmered"),
+    "curry": ("Chicken Curry", ("chicken", "coconut milk", "curry paste", "rice"), "simmered"),
+    "tikka": ("Chicken Tikka", ("chicken", "yogurt", "garam masala"), "grilled"),
+    "brownies": ("Fudgy Brownies", ("chocolate", "butter", "sugar", "eggs"), "baked"),
+}
+
+def recipe(key):
+    return {"id": key, "name": DISHES[key][0], "url": f"https://example.com/{key}"}
+
+def indexed(**kwargs):
+    recommender = RecipeRecommender(use_corpus=False, **kwargs)
+    for key, (name, ingredients, style) in DISHES.items():
+        recommender.add(recipe(key), FeatureRecord(name, ingredients, style))
+    return recommender
+
+def test_similar_recipes_rank_first_and_favorites_are_excluded():
+    recommender = indexed()
+    suggestions = recommender.recommend([recipe("carbonara")], count=3)
+    assert [s["id"] for s in suggestions][:1] == ["cacio"]
+    assert "carbonara" not in [s["id"] for s in suggestions]
+    assert suggestions == sorted(suggestions, key=lambda s: -s["score"])
+
+    # Users are scored in one batch; unrelated recipes are not suggested at all
+    chicken, unknown = recommender.recommend_many([[recipe("curry")], [{"id": "missing", "name": "?", "url": "x"}]], count=5)
+    assert chicken[0]["id"] == "tikka" and "brownies" not in [s["id"] for s in chicken]
+    assert unknown == []
+
+def test_new_and_changed_recipes_are_picked_up_incrementally():
+    recommender = indexed(max_recipes=6)
+    assert recommender.recommend([recipe("tikka")], count=1)[0]["id"] == "curry"
+
+    recommender.add({"id": "korma", "name": "Chicken Korma", "url": "https://example.com/korma"},
+                    {"dish_name": "Chicken Korma", "key_ingredients": ["chicken", "yogurt", "garam masala", "cream"]})
+    assert recommender.recommend([recipe("tikka")], count=1)[0]["id"] == "korma"
+    # The oldest recipe made room for the new one
+    assert len(recommender) == 6 and "carbonara" not in [s["id"] for s in recommender.recommend([recipe("cacio")])]
+
+    # A re-added recipe replaces its old row
+    recommender.add(recipe("brownies"), FeatureRecord("Chicken Brownies", ("chicken", "yogurt", "garam masala")))
+    assert len(recommender) == 6
+    assert "brownies" in [s["id"] for s in recommender.recommend([recipe("tikka")], count=2)]
+
+def corpus_recipe(n):
+    return ({"name": f"Dish {n}", "url": f"https://example.com/{n}", "content": ""},
+            {"dish_name": f"Dish {n}", "key_ingredients": [f"spice {n % 50}", f"vegetable {n % 30}", "salt"]})
+
+def test_corpus_recipes_are_indexed_in_the_background():
+    with tempfile.TemporaryDirectory() as tmp:
+        writer = CorpusWriter(tmp)
+        writer.add_all(corpus_recipe(n) for n in range(2000))
+        writer.commit()
+        os.environ["RECIPE_CORPUS_DIR"] = tmp
+        from recipe_app.services.corpus import corpus
+        try:
+            corpus._last_check = None
+            recommender = RecipeRecommender()
+            favorites = [{"url": "https://example.com/0"}, {"url": "https://example.com/1"}]
+            # The first query only starts indexing the new generation
+            recommender.recommend(favorites, count=5)
+            recommender._indexer.join(timeout=30)
+            suggestions = recommender.recommend(favorites, count=5)
+            assert len(recommender) == 2000 and len(suggestions) == 5
+            # Suggestions share the favorites' rarer ingredients, not just the salt
+            assert all(int(s["name"].split()[1]) % 50 in (0, 1) for s in suggestions)
+        finally:
+            os.environ.pop("RECIPE_CORPUS_DIR", None)
+            corpus._last_check = None
+            corpus._snapshot = None
+
+def test_merged_corpus_segments_are_not_indexed_again():
+    with tempfile.TemporaryDirectory() as tmp:
+        writer = CorpusWriter(tmp, max_segments=2)
+        reader = Corpus(tmp, check_seconds=0)
+        recommender = RecipeRecommender()
+        for n in range(2):
+            writer.add(*corpus_recipe(n))
+            writer.commit()
+        assert recommender.index_corpus(reader.current()) == 2
+
+        # A third segment merges the first two; only the new row is read
+        writer.add(*corpus_recipe(2))
+        writer.commit()
+        assert len(reader.current().segments) == 2
+        assert recommender.index_corpus(reader.current()) == 1
+        writer.commit(compact=True)
+        assert recommender.index_corpus(reader.current()) == 0
+        assert len(recommender) == 3
+
+        # A reader that did not see the merged segment's sources reads it in full
+        assert RecipeRecommender().index_corpus(reader.current()) == 3
+
+if __name__ == "__main__":
+    test_similar_recipes_rank_first_and_favorites_are_excluded()
+    test_new_and_changed_recipes_are_picked_up_incrementally()
+    test_corpus_recipes_are_indexed_in_the_background()
+    test_merged_corpus_segments_are_not_indexed_again()
+    print("✅ Recommender tests passed!")
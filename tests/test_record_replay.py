@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""Tests for recording and replaying provider traffic."""
+
+import os
+import re
+import sys
+import json
+import tempfile
+import subprocess
+
+# Add parent directory to path to import recipe_app
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import httpx
+
+from recipe_app.services.record_replay import Cassette, CassetteTransport, CassetteMissError, recorded_call, use_cassette
+from recipe_app.tools.record_cassettes import SCRIPTS
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+def completion(request):
+    prompt = json.loads(request.content)["messages"][-1]["content"]
+    return httpx.Response(200, json={"answer": prompt.upper()})
+
+def test_http_traffic_replays_without_network():
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "cassette.json")
+        recorder = httpx.Client(transport=CassetteTransport(Cassette(path), "record", httpx.MockTransport(completion)))
+        body = {"model": "gpt-4o-mini", "messages": [{"role": "user", "content": "pasta"}]}
+        assert recorder.post("https://api.openai.com/v1/chat/completions", json=body).json() == {"answer": "PASTA"}
+
+        # Same path and body on another host still match
+        player = httpx.Client(transport=CassetteTransport(Cassette(path), "replay"))
+        assert player.post("http://proxy.local/v1/chat/completions", json=body).json() == {"answer": "PASTA"}
+
+        body["messages"][0]["content"] = "soup"
+        try:
+            player.post("https://api.openai.com/v1/chat/completions", json=body)
+            assert False, "expected a cassette miss"
+        except CassetteMissError:
+            pass
+
+def test_function_calls_replay_in_recorded_order():
+    with tempfile.TemporaryDirectory() as directory:
+        os.environ["RECIPE_CASSETTE"] = os.path.join(directory, "tavily.json")
+        os.environ["RECIPE_REPLAY_LATENCY"] = "zero"
+        try:
+            os.environ["RECIPE_RECORD_MODE"] = "record"
+            request = {"query": "pasta", "max_results": 3}
+            assert recorded_call("tavily", request, lambda: [{"url": "a"}]) == [{"url": "a"}]
+            assert recorded_call("tavily", request, lambda: [{"url": "b"}]) == [{"url": "b"}]
+
+            os.environ["RECIPE_RECORD_MODE"] = "replay"
+            replayed = [recorded_call("tavily", request, lambda: None) for _ in range(3)]
+            assert replayed == [[{"url": "a"}], [{"url": "b"}], [{"url": "b"}]]
+        finally:
+            for name in ("RECIPE_CASSETTE", "RECIPE_REPLAY_LATENCY", "RECIPE_RECORD_MODE"):
+                os.environ.pop(name, None)
+
+def test_missing_cassettes_do_not_fall_back_to_live_traffic():
+    with tempfile.TemporaryDirectory() as directory:
+        os.environ["RECIPE_CASSETTE"] = os.path.join(directory, "missing.json")
+        try:
+            try:
+                use_cassette("missing")
+                assert False, "expected a cassette miss"
+            except CassetteMissError:
+                pass
+            assert "RECIPE_RECORD_MODE" not in os.environ
+        finally:
+            os.environ.pop("RECIPE_CASSETTE", None)
+
+def test_agent_scripts_replay_their_committed_cassettes():
+    env = {name: value for name, value in os.environ.items()
+           if name not in ("OPENAI_API_KEY", "TAVILY_API_KEY", "RECIPE_RECORD_MODE", "RECIPE_CASSETTE")}
+    env["RECIPE_REPLAY_LATENCY"] = "zero"
+    for name, script in SCRIPTS.items():
+        with open(os.path.join(ROOT_DIR, "tests", "cassettes", f"{name}.json"), encoding="utf-8") as f:
+            cassette = f.read()
+        # Cassettes are committed, so they must not carry keys or auth headers
+        assert not re.search(r"\b(sk|tvly)-\w{8,}|bearer|authorization", cassette, re.I)
+        result = subprocess.run([sys.executable, script], cwd=ROOT_DIR, env=env, stdin=subprocess.DEVNULL,
+                                capture_output=True, text=True, timeout=300)
+        assert result.returncode == 0, f"{script} failed:\n{result.stdout[-2000:]}\n{result.stderr[-2000:]}"
+        assert "Replaying recorded API traffic" in result.stdout
+
+if __name__ == "__main__":
+    test_http_traffic_replays_without_network()
+    test_function_calls_replay_in_recorded_order()
+    test_missing_cassettes_do_not_fall_back_to_live_traffic()
+    test_agent_scripts_replay_their_committed_cassettes()
+    print("✅ Record/replay tests passed!")
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""Tests for per-session memory accounting and idle-session eviction."""
+
+import os
+import sys
+import logging
+
+# Add parent directory to path to import recipe_app
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from langchain_core.messages import HumanMessage
+
+from recipe_app.app import GRAPH_CONFIG, initialize_graph
+from recipe_app.services.metrics import deep_size, rss_bytes
+from recipe_app.services.cache import InMemoryCache, using_cache_backend
+from recipe_app.services.recipe_store import recipe_store
+from recipe_app.services.session_memory import SNAPSHOT_KEY, SessionRegistry, ensure_graph, logger, session_handle
+from recipe_app.tools import fake_providers
+
+class SessionState(dict):
+    """Stands in for Streamlit's per-session state (a mapping that can be weakly referenced)."""
+
+def test_deep_size_counts_nested_objects_once():
+    text = "x" * 10000
+    assert deep_size({"a": [text]}) > 10000
+    seen = set()
+    first = deep_size([text], seen)
+    assert deep_size([text], seen) < first - 10000
+    assert rss_bytes() > 0
+
+def test_idle_session_graph_is_evicted_and_rebuilt_transparently():
+    os.environ["RECIPE_LLM_CACHE"] = "off"
+    os.environ["RECIPE_PAGE_FETCH"] = "off"
+    uninstall = fake_providers.install(latency=0)
+    try:
+        registry = SessionRegistry(budget_bytes=10 ** 9, process_budget_bytes=0)
+        idle, active = SessionState(), SessionState()
+        graph = ensure_graph(idle, initialize_graph)
+        graph.invoke({"messages": [HumanMessage(content="Chicken with rice")]}, GRAPH_CONFIG)
+        sizes = registry.touch("idle-session", idle)
+        assert sizes["graph"] > 0
+
+        # Idle for longer than SESSION_IDLE_SECONDS when another session reruns
+        registry._sessions["idle-session"].last_seen -= 3600
+        registry._last_check = 0
+        registry.touch("active-session", active)
+        assert "graph" not in idle and SNAPSHOT_KEY in idle
+        assert registry.stats()["evictions"] == 1
+
+        # The user returns: the paused run resumes from the snapshot
+        graph = ensure_graph(idle, initialize_graph)
+        assert SNAPSHOT_KEY not in idle
+        assert graph.get_state(GRAPH_CONFIG).next == ("human_feedback",)
+        graph.update_state(GRAPH_CONFIG, {"feedback": "I like option 1"})
+        output = graph.invoke(None, GRAPH_CONFIG)
+        assert output["recipes_index"] == 0 and not graph.get_state(GRAPH_CONFIG).next
+    finally:
+        uninstall()
+        os.environ.pop("RECIPE_LLM_CACHE", None)
+        os.environ.pop("RECIPE_PAGE_FETCH", None)
+
+def test_oversized_session_drops_its_checkpoint_history():
+    registry = SessionRegistry(budget_bytes=10 ** 9, process_budget_bytes=0, session_max_bytes=1)
+    session = SessionState()
+    ensure_graph(session, initialize_graph)
+    registry.touch("big-session", session)
+    assert "graph" not in session and SNAPSHOT_KEY in session
+
+class FakeRuntime:
+    """Answers is_active_session like Streamlit's runtime."""
+
+    def __init__(self):
+        self.active = set()
+
+    def is_active_session(self, session_id):
+        return session_id in self.active
+
+def test_streamlit_sessions_are_tracked_across_script_runs():
+    from streamlit.runtime import Runtime
+    from streamlit.runtime.state import SafeSessionState
+    from streamlit.runtime.state.session_state import SessionState as StreamlitSessionState
+
+    runtime, original = FakeRuntime(), Runtime._instance
+    runtime.active.add("streamlit-session")
+    Runtime._instance = runtime
+    try:
+        with using_cache_backend(InMemoryCache()):
+            registry = SessionRegistry(budget_bytes=10 ** 9, process_budget_bytes=0)
+            state = StreamlitSessionState()
+            favorite = recipe_store.put({"name": "Kept", "url": "https://example.com/kept", "content": "Steps."})
+
+            def script_run():
+                # Streamlit wraps the session's state in a new SafeSessionState for every run
+                wrapper = SafeSessionState(state, yield_callback=lambda: None)
+                wrapper["favorites"] = [favorite]
+                ensure_graph(wrapper, initialize_graph)
+                registry.touch("streamlit-session", *session_handle("streamlit-session", wrapper))
+
+            script_run()
+            record = registry._sessions["streamlit-session"]
+            script_run()
+            assert registry._sessions["streamlit-session"] is record
+
+            # Idle, but still open: the graph is evicted and the favorites stay pinned
+            record.last_seen -= 3600
+            registry._last_check = 0
+            registry.touch("other-session", SessionState())
+            assert "graph" not in state and SNAPSHOT_KEY in state
+            assert favorite["id"] in recipe_store._pins["streamlit-session"]
+
+            # Closed by the runtime: forgotten and unpinned
+            runtime.active.clear()
+            registry._last_check = 0
+            registry.touch("other-session", SessionState())
+            assert "streamlit-session" not in registry._sessions
+            assert "streamlit-session" not in recipe_store._pins
+            recipe_store.release("other-session")
+    finally:
+        Runtime._instance = original
+
+class Records(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.records = []
+
+    def emit(self, record):
+        self.records.append(record)
+
+def test_memory_stats_are_logged_periodically():
+    registry = SessionRegistry(budget_bytes=10 ** 9, process_budget_bytes=0)
+    handler, level = Records(), logger.level
+    logger.addHandler(handler)
+    logger.setLevel(logging.INFO)
+    try:
+        session = SessionState(favorites=[])
+        registry.touch("logged-session", session)
+        registry.touch("logged-session", session)
+    finally:
+        logger.removeHandler(handler)
+        logger.setLevel(level)
+    logged = [record for record in handler.records if hasattr(record, "memory")]
+    assert len(logged) == 1
+    assert logged[0].memory["rss_bytes"] > 0 and logged[0].memory["sessions"] == 1
+
+if __name__ == "__main__":
+    test_deep_size_counts_nested_objects_once()
+    test_idle_session_graph_is_evicted_and_rebuilt_transparently()
+    test_oversized_session_drops_its_checkpoint_history()
+    test_streamlit_sessions_are_tracked_across_script_runs()
+    test_memory_stats_are_logged_periodically()
+    print("✅ Session memory tests passed!")
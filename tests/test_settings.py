@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""Tests for runtime settings: validation, overrides and hot reload."""
+
+import os
+import sys
+import json
+import logging
+import tempfile
+
+# Add parent directory to path to import recipe_app
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from recipe_app.config.config import MAX_SEARCH_RESULTS, MODEL_NAME, FAST_MODEL_NAME
+from recipe_app.config.settings import Settings, SettingsError, SettingsManager, load_settings, settings_manager
+from recipe_app.services.model_router import ModelRouter
+
+def write(path, data, mtime):
+    with open(path, "w") as f:
+        f.write(data if isinstance(data, str) else json.dumps(data))
+    # Set the time explicitly; writes within one clock tick can share an mtime
+    os.utime(path, (mtime, mtime))
+
+def test_file_and_environment_override_the_defaults():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "settings.toml")
+        with open(path, "w") as f:
+            f.write('max_search_results = 5\ncache_ttl_seconds = 60\n\n[model_routes.translate_query]\nmodel = "gpt-4o"\n')
+        loaded = load_settings(path, environ={"RECIPE_MAX_SEARCH_RESULTS": "4", "RECIPE_HOME": "ignored"})
+
+    assert loaded.max_search_results == 4 and loaded.cache_ttl_seconds == 60
+    # A partial route keeps the node's other parameters and the other nodes' routes
+    assert loaded.route("translate_query")["model"] == "gpt-4o"
+    assert loaded.route("translate_query")["max_tokens"] == 50
+    assert loaded.route("human_feedback")["escalate_to"] == MODEL_NAME
+    assert Settings().max_search_results == MAX_SEARCH_RESULTS
+
+def test_invalid_settings_are_rejected_with_every_problem():
+    try:
+        load_settings(environ={"RECIPE_MAX_SEARCH_RESULTS": "0", "RECIPE_PAGE_FETCH_TIMEOUT_SECONDS": "slow"})
+    except SettingsError as e:
+        assert "max_search_results" in str(e) and "page_fetch_timeout_seconds" in str(e)
+    else:
+        raise AssertionError("invalid settings were accepted")
+
+    try:
+        load_settings(environ={"RECIPE_PAGE_FETCH_TIMEOUT_SECONDS": "10", "RECIPE_PAGE_FETCH_DEADLINE_SECONDS": "5"})
+    except SettingsError as e:
+        assert "page_fetch_deadline_seconds" in str(e)
+    else:
+        raise AssertionError("inconsistent deadlines were accepted")
+
+def test_changed_files_are_reloaded_and_bad_ones_ignored():
+    changes = []
+    logging.disable(logging.ERROR)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "settings.json")
+        write(path, {"max_search_results": 3}, 1000)
+        manager = SettingsManager(path, check_seconds=0)
+        manager.subscribe(lambda old, new: changes.append((old.max_search_results, new.max_search_results)))
+        try:
+            assert manager.get().max_search_results == 3
+
+            write(path, {"max_search_results": 6, "job_workers": 2}, 2000)
+            assert manager.get().max_search_results == 6 and changes == [(3, 6)]
+
+            write(path, {"max_search_results": -1}, 3000)
+            assert manager.get().max_search_results == 6 and len(changes) == 1
+
+            write(path, "{not json", 4000)
+            assert manager.get().max_search_results == 6
+        finally:
+            logging.disable(logging.NOTSET)
+
+def test_model_routes_follow_the_current_settings():
+    assert ModelRouter.route("translate_query")["model"] == FAST_MODEL_NAME
+    settings_manager.override(load_settings(environ={"RECIPE_MODEL_ROUTES": '{"translate_query": {"model": "gpt-4o"}}'}))
+    try:
+        assert ModelRouter.route("translate_query")["model"] == "gpt-4o"
+        assert ModelRouter.route("unknown_node")["model"] == MODEL_NAME
+    finally:
+        settings_manager.override(None)
+    assert ModelRouter.route("translate_query")["model"] == FAST_MODEL_NAME
+
+def test_process_wide_limits_follow_the_current_settings():
+    from recipe_app.services.jobs import JobRunner
+    from recipe_app.services.recipe_store import RecipeStore
+    from recipe_app.services.session_memory import MB, SessionRegistry
+
+    from recipe_app.services.checkpointer import CacheCheckpointSaver
+    from recipe_app.services.corpus import Corpus
+    from recipe_app.services.page_fetcher import HTMLTextExtractor
+
+    store, runner, registry = RecipeStore(), JobRunner(workers=1), SessionRegistry()
+    saver, reader = CacheCheckpointSaver(), Corpus()
+    settings_manager.override(load_settings(environ={
+        "RECIPE_RECIPE_STORE_MAX_ENTRIES": "3", "RECIPE_JOB_TTL_SECONDS": "5",
+        "RECIPE_SESSION_MEMORY_BUDGET_MB": "64", "RECIPE_PROCESS_MEMORY_BUDGET_MB": "null",
+        "RECIPE_CHECKPOINT_TTL_SECONDS": "60", "RECIPE_CORPUS_CHECK_SECONDS": "1", "RECIPE_PAGE_TEXT_MAX_CHARS": "100"
+    }))
+    try:
+        assert store.max_entries == 3 and runner.ttl == 5
+        assert registry.budget_bytes == 64 * MB and registry.process_budget_bytes is None
+        assert saver.ttl == 60 and reader.check_seconds == 1 and HTMLTextExtractor().max_chars == 100
+    finally:
+        settings_manager.override(None)
+    assert SessionRegistry(process_budget_bytes=0).process_budget_bytes is None
+    # Values given explicitly win, zero included
+    assert CacheCheckpointSaver(ttl=0).ttl == 0 and JobRunner(workers=1, ttl=0).ttl == 0
+
+if __name__ == "__main__":
+    test_file_and_environment_override_the_defaults()
+    test_invalid_settings_are_rejected_with_every_problem()
+    test_changed_files_are_reloaded_and_bad_ones_ignored()
+    test_model_routes_follow_the_current_settings()
+    test_process_wide_limits_follow_the_current_settings()
+    print("✅ Settings tests passed!")
@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+"""Regression checks for cold-start import time."""
+
+import os
+import subprocess
+import sys
+
+import pytest
+
+# Add parent directory to path to import recipe_app
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from recipe_app.tools.startup_profile import ROOT_DIR, profile_import, summarize
+
+# Generous budget: a cold import of the services module is ~0.3s once providers are lazy
+IMPORT_BUDGET_MS = 1500
+
+# Provider modules that must only load on first use
+HEAVY_MODULES = ["streamlit", "langchain_openai", "openai", "langchain_community", "langgraph.graph", "dotenv"]
+
+def test_services_import_does_not_load_providers():
+    code = (
+        "import sys, recipe_app.services.recipe_services; "
+        f"print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+    )
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, cwd=ROOT_DIR)
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip() == ""
+
+def test_services_import_time_within_budget():
+    # Wall-clock budgets depend on the machine, so this only runs when asked for
+    if not os.getenv("RECIPE_TIMING_TESTS"):
+        pytest.skip("set RECIPE_TIMING_TESTS=1 to check import time")
+    total_us, _ = summarize(profile_import("recipe_app.services.recipe_services"))
+    assert total_us / 1000 < IMPORT_BUDGET_MS
+
+if __name__ == "__main__":
+    os.environ.setdefault("RECIPE_TIMING_TESTS", "1")
+    test_services_import_does_not_load_providers()
+    test_services_import_time_within_budget()
+    print("✅ Startup time checks passed!")
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""Tests for building recipe features from schema.org Recipe markup."""
+
+import os
+import sys
+import json
+
+# Add parent directory to path to import recipe_app
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from recipe_app.config.settings import settings, settings_manager
+from recipe_app.models.recipe_models import RecipeFeature
+from recipe_app.services.page_fetcher import HTMLTextExtractor
+from recipe_app.services.recipe_services import RecipeKeyFeatures
+from recipe_app.services.structured_data import (
+    StructuredDataExtractor,
+    find_recipe_nodes,
+    ingredient_name
+)
+
+SHAKSHUKA_LD = json.dumps({
+    "@context": "https://schema.org",
+    "@graph": [
+        {"@type": "WebSite", "name": "Cookie and Kate"},
+        {
+            "@type": ["Recipe"],
+            "name": "Shakshuka",
+            "recipeIngredient": [
+                "2 tablespoons olive oil",
+                "1 large onion, chopped",
+                "1 (28 oz) can crushed tomatoes",
+                "6 large eggs",
+                "1/2 teaspoon salt"
+            ],
+            "recipeCategory": "Breakfast",
+            "cookingMethod": "Baked",
+            "recipeInstructions": [{"@type": "HowToStep", "text": "Simmer, then bake."}]
+        }
+    ]
+})
+
+def test_recipe_nodes_are_found_in_graph_and_trimmed():
+    nodes = find_recipe_nodes([SHAKSHUKA_LD, "{not json"])
+    assert len(nodes) == 1
+    assert nodes[0]["name"] == "Shakshuka"
+    assert "recipeInstructions" not in nodes[0]
+
+def test_ingredient_lines_are_reduced_to_names():
+    assert ingredient_name("2 cups all-purpose flour, sifted") == "all-purpose flour"
+    assert ingredient_name("1 (28 oz) can crushed tomatoes") == "crushed tomatoes"
+    assert ingredient_name("3 large eggs") == "eggs"
+
+def test_page_parser_keeps_json_ld_out_of_the_text():
+    parser = HTMLTextExtractor()
+    parser.feed(f'<html><head><script type="application/ld+json">{SHAKSHUKA_LD}</script></head>'
+                f'<body><h1>Shakshuka</h1></body></html>')
+    parser.close()
+    assert parser.text() == "Shakshuka"
+    assert find_recipe_nodes(parser.json_ld)[0]["name"] == "Shakshuka"
+
+def test_feature_from_markup():
+    feature = StructuredDataExtractor.extract({"name": "Shakshuka", "content": "", "schema_recipes": find_recipe_nodes([SHAKSHUKA_LD])})
+    assert feature.dish_name == "Shakshuka"
+    assert feature.key_ingredients == ["olive oil", "onion", "crushed tomatoes", "eggs"]
+    assert feature.cooking_style == "baked"
+    assert StructuredDataExtractor.extract({"name": "Pancakes", "content": "Flour and eggs."}) is None
+
+def test_llm_only_sees_recipes_without_markup():
+    calls = []
+
+    def extract_features(recipes_str, count=0, timeout=None):
+        calls.append((recipes_str, count))
+        return [RecipeFeature(dish_name="Pancakes", key_ingredients=["flour", "eggs"])]
+
+    recipes = [
+        {"name": "Shakshuka", "url": "https://example.com/shakshuka", "content": "",
+         "schema_recipes": find_recipe_nodes([SHAKSHUKA_LD])},
+        {"name": "Pancakes", "url": "https://example.com/pancakes", "content": "Flour and eggs."}
+    ]
+    original = RecipeKeyFeatures._cached_extract_features
+    RecipeKeyFeatures._cached_extract_features = staticmethod(extract_features)
+    settings_manager.override(settings().model_copy(update={"heuristic_only_confidence": None}))
+    try:
+        state = RecipeKeyFeatures.extract({"recipes": recipes})
+        assert [feature.dish_name for feature in state["key_features"]] == ["Shakshuka", "Pancakes"]
+        assert state["feature_source"] == "llm"
+        assert calls == [("Recipe: Pancakes\nContent: Flour and eggs.", 1)]
+
+        calls.clear()
+        state = RecipeKeyFeatures.extract({"recipes": recipes[:1]})
+        assert state["feature_source"] == "structured"
+        assert calls == []
+    finally:
+        RecipeKeyFeatures._cached_extract_features = original
+        settings_manager.override(None)
+
+def test_miscounted_llm_features_fall_back_to_local_extraction():
+    def extract_features(recipes_str, count=0, timeout=None):
+        return [RecipeFeature(dish_name="Pancakes", key_ingredients=["flour"]),
+                RecipeFeature(dish_name="Waffles", key_ingredients=["flour"])]
+
+    recipes = [
+        {"name": "Shakshuka", "url": "https://example.com/shakshuka", "content": "",
+         "schema_recipes": find_recipe_nodes([SHAKSHUKA_LD])},
+        {"name": "Pancakes", "url": "https://example.com/pancakes", "content": "Fluffy pancakes with flour, milk and eggs."}
+    ]
+    original = RecipeKeyFeatures._cached_extract_features
+    RecipeKeyFeatures._cached_extract_features = staticmethod(extract_features)
+    settings_manager.override(settings().model_copy(update={"heuristic_only_confidence": None}))
+    try:
+        state = RecipeKeyFeatures.extract({"recipes": recipes})
+        # Markup keeps its slot and the other recipe gets its local features
+        assert [feature.dish_name for feature in state["key_features"]] == ["Shakshuka", "Pancakes"]
+        assert state["key_features"][1].key_ingredients == ("flour", "milk", "eggs")
+        assert state["feature_source"] == "heuristic"
+    finally:
+        RecipeKeyFeatures._cached_extract_features = original
+        settings_manager.override(None)
+
+if __name__ == "__main__":
+    test_recipe_nodes_are_found_in_graph_and_trimmed()
+    test_ingredient_lines_are_reduced_to_names()
+    test_page_parser_keeps_json_ld_out_of_the_text()
+    test_feature_from_markup()
+    test_llm_only_sees_recipes_without_markup()
+    test_miscounted_llm_features_fall_back_to_local_extraction()
+    print("✅ Structured data tests passed!")
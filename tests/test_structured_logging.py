@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""Tests for queued, structured app logging."""
+
+import io
+import os
+import sys
+import json
+import queue
+import logging
+
+# Add parent directory to path to import recipe_app
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from recipe_app.services.structured_logging import (
+    DroppingQueueHandler,
+    SamplingFilter,
+    configure_logging,
+    log_context,
+    logged_node,
+    stop_logging
+)
+
+def test_records_are_written_as_json_with_their_context():
+    stream = io.StringIO()
+    logger = logging.getLogger("recipe_app.tests.logging")
+    root_level = logging.getLogger().level
+    # Replace any writer an earlier app run in this process installed
+    stop_logging()
+    configure_logging(level="INFO", fmt="json", stream=stream)
+    try:
+        node = logged_node("retrieve_recipes", lambda state: logger.info("Retrieved %s recipes", state["count"]))
+        with log_context(session="session-1"):
+            node({"count": 3}, {"configurable": {"thread_id": "1"}})
+        node({"count": 2}, {"configurable": {"thread_id": "thread-7"}})
+        logger.debug("Not written at INFO")
+    finally:
+        stop_logging()
+        logging.getLogger().setLevel(root_level)
+
+    records = [json.loads(line) for line in stream.getvalue().splitlines()]
+    assert [record["message"] for record in records] == ["Retrieved 3 recipes", "Retrieved 2 recipes"]
+    # The innermost context wins: the run's thread ID tags the node's records
+    assert [record["session"] for record in records] == ["1", "thread-7"]
+    assert all(record["node"] == "retrieve_recipes" and record["level"] == "INFO" for record in records)
+
+def test_busy_lines_are_sampled_per_level():
+    sampler = SamplingFilter(every={"INFO": 10}, burst=5)
+
+    def record(level, msg):
+        return logging.LogRecord("recipe_app", level, __file__, 1, msg, ("x",), None)
+
+    kept = [r for r in (record(logging.INFO, "Query translated: %s") for _ in range(45)) if sampler.filter(r)]
+    assert len(kept) == 5 + 4
+    assert all(getattr(r, "sample_rate", 1) == 10 for r in kept[5:])
+    # Other lines and warnings are counted separately and never sampled
+    assert sampler.filter(record(logging.INFO, "Retrieved %s recipes"))
+    assert all(sampler.filter(record(logging.WARNING, "Query translated: %s")) for _ in range(45))
+
+def test_a_full_queue_drops_records_instead_of_blocking():
+    handler = DroppingQueueHandler(queue.Queue(2))
+    for _ in range(5):
+        handler.handle(logging.LogRecord("recipe_app", logging.INFO, __file__, 1, "line %s", (1,), None))
+    assert handler.queue.qsize() == 2 and handler.dropped == 3
+
+if __name__ == "__main__":
+    test_records_are_written_as_json_with_their_context()
+    test_busy_lines_are_sampled_per_level()
+    test_a_full_queue_drops_records_instead_of_blocking()
+    print("✅ Structured logging tests passed!")